@@ -1,9 +1,12 @@
+URL_SEC_API_BASE = "https://apps.sec.cl/INTONLINEv1/ClientesAfectados"
 URL_SEC_GET_POR_FECHA = "https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetPorFecha"
 URL_SEC_GET_HORA_SERVER = (
     "https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetHoraServer"
 )
 
 URL_SEC_PRINCIPAL = "https://www.sec.cl/interrupciones-en-linea/?view_full_site=t"
+URL_SEC_HOME = "https://www.sec.cl/"
+URL_SEC_APP = "https://apps.sec.cl/INTONLINEv1/index.aspx"
 STATUS_CODE = 200
 METHOD_POST = "POST"
 METHOD_GET = "GET"
@@ -0,0 +1,573 @@
+"""Async scraping engine for the SEC historical API.
+
+Multiplexes many in-flight ``GetPorFecha`` fetches over a small number of
+warmed ``playwright.async_api`` pages. A single semaphore bounds the total
+number of requests in flight across all pages. In ``http_mode`` the pages
+only obtain the session: fetches go through ``SECHttpSession`` and fall
+back to the browser when a challenge reappears.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set, Tuple
+
+from playwright.async_api import async_playwright
+
+from config import URL_SEC_APP, URL_SEC_HOME
+from core.concurrency_controller import AdaptiveConcurrencyController
+from core.http_fetcher import ChallengeDetected, SECHttpSession
+from core.lean_navigation import (
+    apply_lean_profile_async,
+    has_valid_session,
+    warm_page_async,
+)
+from core.retry_handler import RetryBudget, RetryHandler, RetryRule
+from core.session_store import SessionStore, is_session_rejected
+from core.sec_fetch import (
+    EXTRA_HEADERS,
+    FETCH_SEC_DATA_BATCH_SCRIPT,
+    FETCH_HORA_SERVER_SCRIPT,
+    FETCH_SEC_DATA_SCRIPT,
+    USER_AGENTS,
+    ServerClock,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PointFailed(Exception):
+    """A point came back with an error; carries its result for retries."""
+
+    def __init__(self, point: dict):
+        super().__init__(str(point.get("error")))
+        self.point = point
+
+
+class AsyncSECEngine:
+    """Pool of warmed async pages serving concurrent historical fetches.
+
+    Usage:
+        async with AsyncSECEngine(num_pages=4, max_concurrent=50) as engine:
+            result = await engine.scrape_point(2017, 1, 1, 0)
+
+    Attributes:
+        num_pages: Number of warmed pages (one browser context each)
+        max_concurrent: Maximum fetches in flight across all pages
+        semaphore: The single semaphore (or adaptive controller) bounding
+            concurrency
+    """
+
+    def __init__(
+        self,
+        num_pages: int = 4,
+        max_concurrent: int = 50,
+        headless: bool = True,
+        attempts: int = 3,
+        batch_concurrency: int = 10,
+        fetch_timeout: float = 60.0,
+        home_delay: float = 2.0,
+        app_delay: float = 10.0,
+        server_time_interval: Optional[float] = None,
+        http_mode: bool = False,
+        controller: Optional[AdaptiveConcurrencyController] = None,
+        retry: Optional[RetryHandler] = None,
+        lean: bool = True,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """Initialize the engine (the browser is launched by ``start``).
+
+        Args:
+            num_pages: Number of warmed pages to multiplex fetches over
+            max_concurrent: Max fetches in flight (default: 50)
+            headless: Run Chromium headless
+            attempts: Attempts per point before reporting a failure
+            batch_concurrency: Parallel fetches inside one batched evaluate
+            fetch_timeout: Seconds before a single fetch is abandoned (a
+                batched evaluate gets this per round of its in-page workers)
+            home_delay: Seconds to wait after loading the sec.cl home
+            app_delay: Seconds to wait after loading the INTONLINE app
+            server_time_interval: Seconds between GetHoraServer syncs
+                (default: once per session)
+            http_mode: Fetch through a browserless HTTP session using the
+                pages' cookies, falling back to the browser on challenges
+            controller: Adaptive concurrency controller used instead of a
+                fixed semaphore
+            retry: Retry policy for single points (default: ``attempts``
+                attempts with full jitter, longer waits after timeouts and a
+                run-wide retry budget)
+            lean: Use the lean navigation profile: block heavy resources,
+                wait for readiness instead of ``home_delay``/``app_delay``
+                and reuse a live page's session when recycling
+            session_store: On-disk session state used to seed the first page,
+                refreshed after it warms up
+                (default: ``SessionStore.from_env()``)
+        """
+        self.num_pages = num_pages
+        self.max_concurrent = max_concurrent
+        self.headless = headless
+        self.attempts = attempts
+        self.batch_concurrency = batch_concurrency
+        self.fetch_timeout = fetch_timeout
+        self.home_delay = home_delay
+        self.app_delay = app_delay
+        self.lean = lean
+        self.session_store = session_store or SessionStore.from_env()
+
+        self.retry = retry or RetryHandler(
+            max_attempts=attempts,
+            base_delay=1.0,
+            max_delay=30.0,
+            jitter=True,
+            rules={asyncio.TimeoutError: RetryRule(base_delay=5.0)},
+            budget=RetryBudget(),
+            logger=logger,
+        )
+
+        self.controller = controller
+        self.semaphore = controller or asyncio.Semaphore(max_concurrent)
+        self._start_lock = asyncio.Lock()
+        self._batch_lock = asyncio.Lock()
+        self._clock_lock = asyncio.Lock()
+        self.clock = ServerClock(refresh_interval=server_time_interval)
+
+        self.http_mode = http_mode
+        self.http: Optional[SECHttpSession] = None
+        self._http_lock = asyncio.Lock()
+        # Requests en vuelo por sesión: una sesión retirada se cierra
+        # recién cuando su último request termina
+        self._http_users: Dict[SECHttpSession, int] = {}
+        self._retired_http: Set[SECHttpSession] = set()
+
+        self._playwright = None
+        self._browser = None
+        self._pages: List = []
+        self._page_locks: List[asyncio.Lock] = []
+        self._cycle = itertools.cycle(range(num_pages))
+
+    @property
+    def started(self) -> bool:
+        return bool(self._pages)
+
+    async def start(self):
+        """Launch Chromium and warm every page concurrently."""
+        async with self._start_lock:
+            if self.started:
+                return
+
+            logger.info(f"🌐 Lanzando motor async ({self.num_pages} páginas)...")
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless
+            )
+
+            if self.lean:
+                # La primera página obtiene la sesión; el resto la reutiliza
+                first = await self._warm_page()
+                rest = await asyncio.gather(
+                    *(
+                        self._warm_page(seed_page=first)
+                        for _ in range(self.num_pages - 1)
+                    )
+                )
+                self._pages = [first, *rest]
+            else:
+                self._pages = list(
+                    await asyncio.gather(
+                        *(self._warm_page() for _ in range(self.num_pages))
+                    )
+                )
+            self._page_locks = [asyncio.Lock() for _ in range(self.num_pages)]
+            if self.http_mode:
+                self.http = await SECHttpSession.from_page(
+                    self._pages[0], max_connections=self.max_concurrent
+                )
+            logger.info("✓ Motor async listo")
+
+    async def _warm_page(self, seed_page=None):
+        """Create a context and park its page on the INTONLINE app.
+
+        Args:
+            seed_page: Live page whose session cookies (and user agent) the
+                new context reuses, so the homepage hop can be skipped
+        """
+        seed_cookies: List[dict] = []
+        user_agent = random.choice(USER_AGENTS)
+        state = None
+        if self.lean and seed_page is not None:
+            try:
+                seed_cookies = await seed_page.context.cookies()
+                user_agent = await seed_page.evaluate("() => navigator.userAgent")
+            except Exception:
+                seed_cookies = []
+        elif self.session_store is not None:
+            state = self.session_store.load()
+            if state is not None:
+                user_agent = self.session_store.user_agent or user_agent
+
+        context = await self._browser.new_context(
+            user_agent=user_agent,
+            viewport={"width": 1920, "height": 1080},
+            locale="es-CL",
+            timezone_id="America/Santiago",
+            storage_state=state,
+        )
+        try:
+            page = await context.new_page()
+            await page.set_extra_http_headers(EXTRA_HEADERS)
+
+            if self.lean:
+                await apply_lean_profile_async(context)
+                if seed_cookies:
+                    await context.add_cookies(seed_cookies)
+                skip_home = has_valid_session(await context.cookies())
+                await warm_page_async(page, skip_home=skip_home)
+            else:
+                await page.goto(
+                    URL_SEC_HOME, wait_until="domcontentloaded", timeout=60000
+                )
+                await asyncio.sleep(self.home_delay)
+                await page.goto(URL_SEC_APP, wait_until="commit", timeout=90000)
+                await asyncio.sleep(self.app_delay)
+        except Exception:
+            await context.close()
+            if state is not None:
+                # La sesión restaurada no pasó el calentamiento
+                self.session_store.clear()
+            raise
+
+        if self.session_store is not None and seed_page is None:
+            try:
+                self.session_store.save(await context.storage_state(), user_agent)
+            except Exception as e:
+                logger.warning(f"  ⚠️ No se pudo guardar la sesión: {e}")
+        return page
+
+    async def _recycle_page(self, slot: int, broken_page):
+        """Replace a broken page, unless another task already did it."""
+        async with self._page_locks[slot]:
+            if self._pages[slot] is not broken_page:
+                return
+            logger.warning(f"  ♻️ Recalentando página {slot}")
+            try:
+                await broken_page.context.close()
+            except Exception:
+                pass
+            seed = next(
+                (p for i, p in enumerate(self._pages) if i != slot), None
+            )
+            self._pages[slot] = await self._warm_page(seed_page=seed)
+
+    def _point_result(
+        self, payload: dict, result: dict, start: float, point_num: int = 0
+    ) -> dict:
+        """Build the point result dict from a raw fetch-script result."""
+        fecha_consultada = (
+            f"{payload['anho']}-{payload['mes']:02d}-{payload['dia']:02d} "
+            f"{payload['hora']:02d}:00"
+        )
+        point = {
+            "success": not result.get("error"),
+            "point_num": point_num,
+            "fecha_consultada": fecha_consultada,
+            "data": result.get("data") or [],
+            "hora_server_scraping": self.clock.hora_server(),
+            "duration": time.time() - start,
+        }
+        if result.get("error"):
+            point["error"] = result["error"]
+        return point
+
+    async def _evaluate(self, script: str, arg, timeout: Optional[float] = None):
+        """Evaluate a fetch script on the next page, recycling it on failure.
+
+        Args:
+            script: Fetch script
+            arg: Script argument
+            timeout: Seconds before the evaluate is abandoned
+                (default: ``fetch_timeout``)
+        """
+        slot = next(self._cycle)
+        page = self._pages[slot]
+        try:
+            return await asyncio.wait_for(
+                page.evaluate(script, arg), timeout=timeout or self.fetch_timeout
+            )
+        except Exception:
+            try:
+                await self._recycle_page(slot, page)
+            except Exception as warm_error:
+                logger.error(f"  ❌ No se pudo recalentar: {warm_error}")
+            raise
+
+    @asynccontextmanager
+    async def _lease_http(self):
+        """Borrow the current HTTP session (None in browser mode).
+
+        A session retired by ``_reset_http_session`` while leased is closed
+        when its last lease ends, so in-flight requests are not cut off.
+        """
+        http = self.http
+        if http is None:
+            yield None
+            return
+        self._http_users[http] = self._http_users.get(http, 0) + 1
+        try:
+            yield http
+        finally:
+            self._http_users[http] -= 1
+            if not self._http_users[http]:
+                del self._http_users[http]
+                if http in self._retired_http:
+                    self._retired_http.discard(http)
+                    await http.close()
+
+    async def _retire_http(self, stale: SECHttpSession):
+        """Close a session now, or once its in-flight requests finish."""
+        if self._http_users.get(stale):
+            self._retired_http.add(stale)
+        else:
+            await stale.close()
+
+    async def _reset_http_session(self, stale: SECHttpSession):
+        """Re-pass the challenge in the browser and re-export its cookies."""
+        async with self._http_lock:
+            if self.http is not stale:
+                return
+            # Mientras tanto, los fetch caen al navegador
+            self.http = None
+            await self._retire_http(stale)
+            try:
+                await self._recycle_page(0, self._pages[0])
+                self.http = await SECHttpSession.from_page(
+                    self._pages[0], max_connections=self.max_concurrent
+                )
+            except Exception as e:
+                logger.error(f"  ❌ No se pudo renovar la sesión HTTP: {e}")
+
+    async def _fetch_one(self, payload: dict) -> dict:
+        """Fetch one payload over HTTP when possible, else in the browser."""
+        async with self._lease_http() as http:
+            if http is not None:
+                try:
+                    data = await http.fetch_por_fecha(payload)
+                    return {"data": data, "error": None}
+                except ChallengeDetected as e:
+                    logger.warning(f"  🛡️ {e}; volviendo al navegador")
+                    if self.session_store is not None:
+                        self.session_store.clear()
+                    await self._reset_http_session(http)
+
+        return await self._evaluate(FETCH_SEC_DATA_SCRIPT, payload)
+
+    def _can_grow(self) -> bool:
+        """Whether a batch may take one more permit without waiting forever.
+
+        A fixed semaphore always frees its permits eventually; an adaptive
+        limit may shrink below what a batch already holds.
+        """
+        if self.controller is None:
+            return True
+        return self.controller.in_flight < self.controller.limit
+
+    def _record_outcome(self, latency: float, error: Optional[str]):
+        """Feed one fetch outcome to the adaptive controller, if any.
+
+        A rejected session also drops the saved state, so the next start
+        warms up from scratch instead of restoring dead cookies.
+        """
+        if self.session_store is not None and is_session_rejected(error):
+            self.session_store.clear()
+        if self.controller is None:
+            return
+        error = str(error or "")
+        self.controller.record(
+            latency,
+            ok=not error,
+            timeout="timeout" in error.lower(),
+            http_error=error.startswith("HTTP "),
+        )
+
+    async def _sync_clock(self):
+        """Refresh the cached server time once, even with many callers."""
+        if not self.clock.needs_refresh():
+            return
+        async with self._clock_lock:
+            if not self.clock.needs_refresh():
+                return
+            try:
+                async with self._lease_http() as http:
+                    if http is not None:
+                        result = {"horaServer": await http.fetch_hora_server()}
+                    else:
+                        result = await self._evaluate(FETCH_HORA_SERVER_SCRIPT, None)
+            except Exception as e:
+                result = {"error": str(e), "horaServer": None}
+            if not self.clock.update(result.get("horaServer")):
+                logger.warning(f"  ⚠️ No se pudo obtener hora SEC: {result.get('error')}")
+
+    async def scrape_point(
+        self, year: int, month: int, day: int, hour: int, point_num: int = 0
+    ) -> dict:
+        """Fetch one (year, month, day, hour) point.
+
+        Never raises: failures are reported with ``success=False`` so a whole
+        batch can be gathered without losing the successful points.
+
+        Args:
+            year: Year (e.g., 2017)
+            month: Month (1-12)
+            day: Day (1-31)
+            hour: Hour (0-23)
+            point_num: Sequence number for progress display
+
+        Returns:
+            dict: Point result with 'success', 'data', 'hora_server_scraping'
+                and 'fecha_consultada'
+        """
+        if not self.started:
+            await self.start()
+
+        await self._sync_clock()
+
+        payload = {"anho": year, "mes": month, "dia": day, "hora": hour}
+        start = time.time()
+
+        # El backoff espera fuera del semáforo: un punto en espera no ocupa
+        # un cupo de concurrencia
+        @self.retry
+        async def fetch_point():
+            async with self.semaphore:
+                attempt_start = time.time()
+                try:
+                    result = await self._fetch_one(payload)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    self._record_outcome(time.time() - attempt_start, error)
+                    raise
+                self._record_outcome(time.time() - attempt_start, result.get("error"))
+
+            point = self._point_result(payload, result, start, point_num)
+            if not point["success"]:
+                raise PointFailed(point)
+            return point
+
+        try:
+            return await fetch_point()
+        except PointFailed as e:
+            point = e.point
+        except Exception as e:
+            error = {"error": str(e) or type(e).__name__, "data": None}
+            point = self._point_result(payload, error, start, point_num)
+
+        logger.warning(
+            f"  ❌ {point['fecha_consultada']} falló: {str(point['error'])[:100]}"
+        )
+        return point
+
+    async def scrape_batch(self, points: List[Tuple[int, int, int, int]]) -> List[dict]:
+        """Fetch many points with a single ``page.evaluate`` round-trip.
+
+        The batch holds one semaphore permit per in-page worker, so the total
+        number of fetches in flight never exceeds ``max_concurrent``. Points
+        that fail inside the batch are retried one by one with
+        ``scrape_point``.
+
+        Args:
+            points: List of (year, month, day, hour) tuples
+
+        Returns:
+            List of point results, in the same order as ``points``
+        """
+        if not points:
+            return []
+        if not self.started:
+            await self.start()
+        if self.http is not None:
+            # Sin navegador de por medio no hay round-trip que ahorrar
+            return list(await asyncio.gather(*(self.scrape_point(*p) for p in points)))
+        await self._sync_clock()
+
+        payloads = [
+            {"anho": y, "mes": m, "dia": d, "hora": h} for y, m, d, h in points
+        ]
+        workers = min(len(payloads), self.batch_concurrency, self.max_concurrent)
+        start = time.time()
+
+        # Adquirir varios permisos de forma atómica evita que dos lotes se
+        # bloqueen mutuamente con permisos a medias
+        async with self._batch_lock:
+            await self.semaphore.acquire()
+            held = 1
+            while held < workers and self._can_grow():
+                await self.semaphore.acquire()
+                held += 1
+        workers = held
+        # Cada worker del lote hace sus fetches en serie: fetch_timeout por ronda
+        rounds = math.ceil(len(payloads) / workers)
+        try:
+            raw_results = await self._evaluate(
+                FETCH_SEC_DATA_BATCH_SCRIPT,
+                {"payloads": payloads, "concurrency": workers},
+                timeout=self.fetch_timeout * rounds,
+            )
+        except Exception as e:
+            # TimeoutError tiene str() vacío: sin tipo el punto pasaría por exitoso
+            error = str(e) or type(e).__name__
+            logger.warning(f"  ⚠️ Lote de {len(points)} puntos falló: {error}")
+            raw_results = [{"error": error, "data": None}] * len(payloads)
+        finally:
+            for _ in range(workers):
+                self.semaphore.release()
+
+        results = [
+            self._point_result(payload, raw, start)
+            for payload, raw in zip(payloads, raw_results)
+        ]
+        for result in results:
+            self._record_outcome(result["duration"], result.get("error"))
+
+        failed = [i for i, r in enumerate(results) if not r["success"]]
+        if failed:
+            retried = await asyncio.gather(
+                *(self.scrape_point(*points[i]) for i in failed)
+            )
+            for i, result in zip(failed, retried):
+                results[i] = result
+
+        return results
+
+    async def close(self):
+        """Close the HTTP session, pages, browser and the Playwright driver."""
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+        for stale in self._retired_http:
+            await stale.close()
+        self._retired_http.clear()
+
+        for page in self._pages:
+            try:
+                await page.context.close()
+            except Exception:
+                pass
+        self._pages = []
+
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+            logger.info("🔒 Motor async cerrado")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
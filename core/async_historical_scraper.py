@@ -7,13 +7,26 @@ with configurable concurrency and intervals.
 import asyncio
 import json
 import time
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional
-import sys
 
-sys.path.append(".")
-from test_async_scraper import scrape_point_async
+from core.async_engine import AsyncSECEngine
+from core.concurrency_controller import (
+    AdaptiveConcurrencyController,
+    ConcurrencyDecision,
+)
+from core.raw_archive import RawArchive
+from core.scrape_journal import ScrapeJournal
+from core.scrape_planner import ScrapePlanner
+from core.scrape_sinks import (
+    PartitionedNDJSONSink,
+    Point,
+    Sink,
+    YearCheckpointSink,
+)
+from core.surge_sampler import SurgeDetector
 
 
 class AsyncHistoricalScraper:
@@ -25,6 +38,8 @@ class AsyncHistoricalScraper:
         max_concurrent: Maximum concurrent requests
         hours: Hours to scrape each day (default: [0, 6, 12, 18])
         output_dir: Directory to save results
+        engine: Async engine serving the fetches
+        journal: Point-level journal used to resume interrupted runs
     """
 
     def __init__(
@@ -34,6 +49,18 @@ class AsyncHistoricalScraper:
         max_concurrent: int = 50,
         hours: Optional[List[int]] = None,
         output_dir: str = "outputs",
+        num_pages: int = 4,
+        engine: Optional[AsyncSECEngine] = None,
+        dataset_name: Optional[str] = None,
+        batch_size: int = 10,
+        http_mode: bool = False,
+        adaptive: bool = False,
+        journal: Optional[ScrapeJournal] = None,
+        resume: bool = True,
+        planner: Optional[ScrapePlanner] = None,
+        output_format: str = "ndjson",
+        archive: Optional[RawArchive] = None,
+        surge: Optional[SurgeDetector] = None,
     ):
         """Initialize the async historical scraper.
 
@@ -43,6 +70,29 @@ class AsyncHistoricalScraper:
             max_concurrent: Max concurrent requests (default: 50)
             hours: Hours to scrape per day (default: [0, 6, 12, 18])
             output_dir: Output directory (default: "outputs")
+            num_pages: Warmed browser pages for the default engine (default: 4)
+            engine: Engine to use instead of creating one
+            dataset_name: Final dataset file name
+                (default: "dataset_{start_year}_{end_year}.json")
+            batch_size: Points sent per batched page.evaluate (default: 10)
+            http_mode: Fetch through browserless HTTP using the browser's
+                cookies (default: False)
+            adaptive: Let an AIMD controller move the in-flight limit between
+                2 and ``max_concurrent`` from observed latency and errors
+            journal: Journal to record completed points in
+                (default: ``scrape_journal.sqlite`` in ``output_dir``)
+            resume: Skip points already completed in the journal
+                (default: True)
+            planner: Gap planner; when given, ``scrape_all`` only scrapes the
+                points it reports as missing (journaled points are restored
+                into the output, not dropped)
+            output_format: ``"ndjson"`` streams compressed NDJSON partitions
+                to ``output_dir/<dataset stem>/year=YYYY/month=MM``;
+                ``"json"`` keeps the legacy checkpoints and monolithic JSON
+            archive: Content-addressed store for the raw responses of the
+                owned journal (default: ``output_dir/bronze``)
+            surge: Two-pass mode; ``scrape_all`` first scrapes ``hours``,
+                then adds the detector's dense points on surge days
         """
         self.start_year = start_year
         self.end_year = end_year
@@ -50,6 +100,43 @@ class AsyncHistoricalScraper:
         self.hours = hours or [0, 6, 12, 18]
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dataset_name = dataset_name or f"dataset_{start_year}_{end_year}.json"
+        if output_format not in ("ndjson", "json"):
+            raise ValueError(f"output_format inválido: {output_format}")
+        self.output_format = output_format
+        self.dataset_dir = self.output_dir / Path(self.dataset_name).stem
+        self.batch_size = batch_size
+
+        self._owns_journal = journal is None and resume
+        self._owns_archive = self._owns_journal and archive is None
+        if self._owns_archive:
+            archive = RawArchive(self.output_dir / "bronze")
+        self.archive = archive
+        if self._owns_journal:
+            journal = ScrapeJournal(
+                self.output_dir / "scrape_journal.sqlite", archive=archive
+            )
+        self.journal = journal
+        self.planner = planner
+        self.surge = surge
+        self.surge_days: List[str] = []
+
+        # Un solo motor (y un solo semáforo) para todo el rango
+        self.controller = None
+        if adaptive and engine is None:
+            self.controller = AdaptiveConcurrencyController(
+                initial=max(2, max_concurrent // 2),
+                max_limit=max_concurrent,
+                on_decision=self._print_decision,
+            )
+
+        self._owns_engine = engine is None
+        self.engine = engine or AsyncSECEngine(
+            num_pages=num_pages,
+            max_concurrent=max_concurrent,
+            http_mode=http_mode,
+            controller=self.controller,
+        )
 
         # Calculated properties
         self.years = list(range(start_year, end_year + 1))
@@ -64,6 +151,141 @@ class AsyncHistoricalScraper:
         else:  # February
             return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
 
+    def _year_points(self, year: int) -> List[Point]:
+        """All (year, month, day, hour) points of a year, in calendar order."""
+        return [
+            (year, month, day, hour)
+            for month in range(1, 13)
+            for day in range(1, self._get_days_in_month(year, month) + 1)
+            for hour in self.hours
+        ]
+
+    @staticmethod
+    def _print_decision(decision: ConcurrencyDecision):
+        # Las bajadas explican caídas de throughput: se muestran al instante
+        if decision.new_limit < decision.old_limit:
+            print(f"  🎚️ Concurrencia {decision}")
+
+    def _make_sink(self, points: List[Point]) -> Sink:
+        if self.output_format == "json":
+            return YearCheckpointSink(self.output_dir, Counter(p[0] for p in points))
+        return PartitionedNDJSONSink(self.dataset_dir, points)
+
+    def _print_archive_stats(self):
+        stats = self.archive.stats()
+        if not stats["responses"]:
+            return
+        print(
+            f"🗄️ Bronze: {stats['responses']:,} respuestas en "
+            f"{stats['blobs']:,} blobs (x{stats['dedup_ratio']:.1f} dedup), "
+            f"{stats['logical_bytes'] / 1024 ** 2:.1f} MB → "
+            f"{stats['stored_bytes'] / 1024 ** 2:.1f} MB en disco"
+        )
+
+    async def _densify(self, points: List[Point]) -> List[Point]:
+        """Run the coarse pass through the surge detector, add dense points."""
+        if self.journal is None:
+            print("⚠️ Sin journal: la pasada densa volverá a pedir los puntos gruesos")
+
+        print(f"🌩️ Pasada gruesa: {len(points):,} puntos ({self.hours})")
+        await self.scrape_points(points, self.surge)
+
+        surges = self.surge.surges()
+        extra = self.surge.extra_points(self.hours)
+        self.surge_days = [day.isoformat() for day in surges]
+        print(
+            f"🌩️ {len(surges)} días con peaks → +{len(extra):,} puntos "
+            f"(+{len(extra) / max(len(points), 1) * 100:.0f}% sobre la pasada gruesa)"
+        )
+        for day, regions in surges.items():
+            region, peak = max(regions.items(), key=lambda item: item[1])
+            print(f"     {day}: {region} {peak:,} afectados")
+
+        return sorted(set(points).union(extra))
+
+    def _print_year_summary(self, year_data: dict):
+        meta = year_data["metadata"]
+        print(f"\n  ✅ Año {meta['year']} completado:")
+        print(f"     Exitosos: {meta['successful']}/{meta['total_points']}")
+        print(f"     Registros: {meta['total_records']:,}")
+        print(f"     Tiempo: {meta['duration']:.1f}s ({meta['duration'] / 60:.1f} min)")
+
+    async def scrape_points(self, points: List[Point], sink: Sink):
+        """Scrape a list of points through one continuous work queue.
+
+        Points from every month and year share the same queue and the same
+        concurrency budget, so no worker waits on a month barrier. Each
+        result is journaled and handed to ``sink`` as soon as it completes.
+        Points the journal already holds are restored from disk instead of
+        being fetched again.
+
+        Args:
+            points: (year, month, day, hour) tuples to scrape
+            sink: Receives every point result as it completes
+        """
+        month_expected = Counter((y, m) for y, m, _, _ in points)
+        month_done: Counter = Counter()
+        month_ok: Counter = Counter()
+
+        if self.journal is not None:
+            restored = set()
+            for point, result in self.journal.iter_results(points):
+                restored.add(point)
+                month_done[point[:2]] += 1
+                month_ok[point[:2]] += 1 if result.get("success") else 0
+                year_data = sink.add(point, result)
+                if year_data is not None:
+                    self._print_year_summary(year_data)
+            if restored:
+                print(
+                    f"♻️ Reanudando: {len(restored):,}/{len(points):,} puntos "
+                    f"ya completados en el journal"
+                )
+            points = [p for p in points if p not in restored]
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(0, len(points), self.batch_size):
+            queue.put_nowait(points[i : i + self.batch_size])
+
+        total = len(points)
+        done = 0
+        start = time.time()
+
+        async def worker():
+            nonlocal done
+            while True:
+                try:
+                    batch = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                results = await self.engine.scrape_batch(batch)
+                for point, result in zip(batch, results):
+                    done += 1
+                    if self.journal is not None:
+                        self.journal.record(point, result)
+                    year_data = sink.add(point, result)
+
+                    month = point[:2]
+                    month_done[month] += 1
+                    month_ok[month] += 1 if result.get("success") else 0
+                    if month_done[month] == month_expected[month]:
+                        elapsed = time.time() - start
+                        print(
+                            f"  📆 {month[0]}-{month[1]:02d}: "
+                            f"✅ {month_ok[month]}/{month_expected[month]} exitosos "
+                            f"| {done}/{total} ({done / total * 100:.1f}%) "
+                            f"| {done / elapsed:.2f} puntos/s"
+                        )
+                        if self.controller is not None:
+                            print(f"     {self.controller.status()}")
+                    if year_data is not None:
+                        self._print_year_summary(year_data)
+
+        # Suficientes workers para mantener ocupado todo el presupuesto
+        workers = max(1, -(-self.max_concurrent // self.batch_size))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
     async def scrape_year(self, year: int, year_idx: int) -> dict:
         """Scrape all data for a single year.
 
@@ -72,106 +294,95 @@ class AsyncHistoricalScraper:
             year_idx: Index of year (for progress display)
 
         Returns:
-            dict: Year results with metadata and data
+            dict: Year metadata, plus the results under ``data`` when
+                ``output_format`` is ``"json"``
         """
         print(f"\n{'=' * 70}")
         print(f"📅 AÑO {year} ({year_idx}/{self.total_years})")
         print(f"{'=' * 70}\n")
 
-        year_start = time.time()
-        year_results = []
-
-        # Process each month
-        for month in range(1, 13):
-            days_in_month = self._get_days_in_month(year, month)
-            month_points = days_in_month * len(self.hours)
-
-            print(f"  📆 {year}-{month:02d}: {month_points} puntos")
-
-            # Create tasks for the month
-            semaphore = asyncio.Semaphore(self.max_concurrent)
-            tasks = []
-            point_num = 0
+        points = self._year_points(year)
+        sink = self._make_sink(points)
+        try:
+            await self.scrape_points(points, sink)
+        finally:
+            sink.close()
 
-            for day in range(1, days_in_month + 1):
-                for hour in self.hours:
-                    point_num += 1
-                    task = scrape_point_async(
-                        year, month, day, hour, semaphore, point_num
-                    )
-                    tasks.append(task)
-
-            # Execute month
-            month_results = await asyncio.gather(*tasks, return_exceptions=True)
-            year_results.extend(month_results)
-
-            # Progress
-            successful = sum(
-                1 for r in month_results if isinstance(r, dict) and r.get("success")
-            )
-            print(f"     ✅ {successful}/{len(month_results)} exitosos")
-
-        # Year summary
-        year_duration = time.time() - year_start
-        year_successful = sum(
-            1 for r in year_results if isinstance(r, dict) and r.get("success")
-        )
-        year_records = sum(
-            len(r.get("data", [])) for r in year_results if isinstance(r, dict)
-        )
-
-        print(f"\n  ✅ Año {year} completado:")
-        print(f"     Exitosos: {year_successful}/{len(year_results)}")
-        print(f"     Registros: {year_records:,}")
-        print(f"     Tiempo: {year_duration:.1f}s ({year_duration / 60:.1f} min)")
-
-        year_data = {
-            "metadata": {
-                "year": year,
-                "total_points": len(year_results),
-                "successful": year_successful,
-                "total_records": year_records,
-                "duration": year_duration,
-            },
-            "data": year_results,
-        }
-
-        # Save checkpoint
-        checkpoint_file = self.output_dir / f"checkpoint_{year}.json"
-        with open(checkpoint_file, "w", encoding="utf-8") as f:
-            json.dump(year_data, f, indent=2, ensure_ascii=False)
-        print(f"     💾 Checkpoint guardado: {checkpoint_file}")
-
-        return year_data
+        return sink.year_data(year)
 
     async def scrape_all(self) -> dict:
-        """Scrape all configured years.
+        """Scrape all configured years through a single work queue.
 
         Returns:
-            dict: Complete dataset with metadata and all years
+            dict: Dataset metadata; with ``output_format="json"`` also every
+                year's results under ``data_by_year``, with ``"ndjson"`` the
+                per-year summaries and the partition list of the manifest
         """
         print("=" * 70)
         print("ASYNC HISTORICAL SCRAPER")
         print("=" * 70)
         print(f"Años: {self.start_year}-{self.end_year} ({self.total_years} años)")
         print(f"Horas por día: {self.hours}")
-        print(f"Concurrencia: {self.max_concurrent}")
+        if self.controller is not None:
+            print(
+                f"Concurrencia: adaptativa "
+                f"({self.controller.limit} inicial, máx {self.max_concurrent})"
+            )
+        else:
+            print(f"Concurrencia: {self.max_concurrent}")
+        print(f"Páginas: {self.engine.num_pages}")
         print(f"Output: {self.output_dir}")
         print("=" * 70)
         print()
 
         total_start = time.time()
-        all_results = {}
-
-        # Process each year
-        for year_idx, year in enumerate(self.years, 1):
-            year_data = await self.scrape_year(year, year_idx)
-            all_results[str(year)] = year_data
 
+        points_by_year = {year: self._year_points(year) for year in self.years}
+        if self.planner is not None:
+            missing = self.planner.plan(
+                p for year in self.years for p in points_by_year[year]
+            )
+            # Los puntos del journal siguen en la lista: scrape_points los
+            # restaura al sink sin pedirlos, y las particiones/checkpoints
+            # reescritos no pierden lo que ya estaba en disco
+            keep = set(missing)
+            if self.journal is not None:
+                keep |= self.journal.completed()
+            points_by_year = {
+                year: [p for p in points_by_year[year] if p in keep]
+                for year in self.years
+            }
+            print(
+                f"🧭 Puntos faltantes: {len(missing):,}/"
+                f"{self.planner.last_plan['requested']:,}"
+            )
+        points = [p for year in self.years for p in points_by_year[year]]
+        sink = None
+
+        try:
+            if self.surge is not None:
+                points = await self._densify(points)
+            sink = self._make_sink(points)
+            await self.scrape_points(points, sink)
+        finally:
+            if sink is not None:
+                sink.close()
+            if self._owns_engine:
+                await self.engine.close()
+            if self.archive is not None:
+                self._print_archive_stats()
+            if self._owns_journal:
+                self.journal.close()
+            if self._owns_archive:
+                self.archive.close()
+
+        all_results = {str(year): sink.year_data(year) for year in self.years}
         total_duration = time.time() - total_start
 
         # Final summary
-        total_points = sum(len(all_results[str(y)]["data"]) for y in self.years)
+        total_points = sum(
+            all_results[str(y)]["metadata"]["total_points"] for y in self.years
+        )
         total_successful = sum(
             all_results[str(y)]["metadata"]["successful"] for y in self.years
         )
@@ -186,34 +397,59 @@ class AsyncHistoricalScraper:
         print(f"Puntos totales: {total_points:,}")
         print(
             f"Exitosos: {total_successful:,}/{total_points:,} "
-            f"({total_successful / total_points * 100:.1f}%)"
+            f"({total_successful / max(total_points, 1) * 100:.1f}%)"
         )
         print(f"Registros totales: {total_records:,}")
         print(
             f"Duración total: {total_duration / 60:.1f} minutos "
             f"({total_duration / 3600:.2f} horas)"
         )
-        print(f"Velocidad promedio: {total_points / total_duration:.2f} puntos/s")
+        print(
+            f"Velocidad promedio: "
+            f"{total_points / max(total_duration, 1e-9):.2f} puntos/s"
+        )
+        retry = getattr(self.engine, "retry", None)
+        if retry is not None:
+            m = retry.metrics.snapshot()
+            print(
+                f"Reintentos: {m['retries']:,} ({m['wait_seconds']:.0f}s en espera, "
+                f"presupuesto agotado {m['budget_exhausted']:,} veces)"
+            )
         print("=" * 70)
 
-        # Save final dataset
-        final_file = self.output_dir / f"dataset_{self.start_year}_{self.end_year}.json"
-        final_data = {
-            "metadata": {
-                "title": "Dataset Completo - Interrupciones Eléctricas Chile",
-                "start_year": self.start_year,
-                "end_year": self.end_year,
-                "years": self.years,
-                "hours": self.hours,
-                "total_points": total_points,
-                "total_successful": total_successful,
-                "total_records": total_records,
-                "duration_minutes": total_duration / 60,
-                "scraping_date": datetime.now().isoformat(),
-                "concurrency": self.max_concurrent,
-            },
-            "data_by_year": all_results,
+        metadata = {
+            "title": "Dataset Completo - Interrupciones Eléctricas Chile",
+            "start_year": self.start_year,
+            "end_year": self.end_year,
+            "years": self.years,
+            "hours": self.hours,
+            "total_points": total_points,
+            "total_successful": total_successful,
+            "total_records": total_records,
+            "duration_minutes": total_duration / 60,
+            "scraping_date": datetime.now().isoformat(),
+            "concurrency": self.max_concurrent,
         }
+        if self.surge is not None:
+            metadata["surge_days"] = self.surge_days
+
+        if self.output_format == "ndjson":
+            # Los puntos ya están en disco: solo falta el manifiesto
+            manifest_file = sink.write_manifest(metadata)
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                final_data = json.load(f)
+
+            size_mb = sum(p.stat().st_size for p in sink.partitions()) / (1024 * 1024)
+            print(f"\n💾 Dataset guardado en: {self.dataset_dir}")
+            print(
+                f"📊 Tamaño en disco: {size_mb:.1f} MB "
+                f"({len(final_data['partitions'])} particiones {sink.compression})"
+            )
+            return final_data
+
+        # Save final dataset
+        final_file = self.output_dir / self.dataset_name
+        final_data = {"metadata": metadata, "data_by_year": all_results}
 
         with open(final_file, "w", encoding="utf-8") as f:
             json.dump(final_data, f, indent=2, ensure_ascii=False)
@@ -6,25 +6,62 @@ High-performance asynchronous implementation using asyncpg.
 import logging
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import date
 import asyncpg
+import numpy as np
 from dotenv import load_dotenv
 
+from core.hash_key import hash_key_sql, record_hash_key
+from core.known_keys import KnownKeys
+
 logger = logging.getLogger(__name__)
 
+FACT_COLUMNS = [
+    "hash_id",
+    "id_geografia",
+    "id_empresa",
+    "id_tiempo",
+    "clientes_afectados",
+    "hora_interrupcion",
+    "hora_server_scraping",
+    "fecha_int_str",
+    "actualizado_hace",
+    "actualizado_hace_min",
+]
+
 
 class AsyncPostgreSQLRepository:
     """Async Repository for PostgreSQL with star schema."""
 
-    def __init__(self):
-        """Initialize."""
+    def __init__(
+        self, compact_keys: Optional[bool] = None, known_keys: Optional[bool] = None
+    ):
+        """Initialize.
+
+        Args:
+            compact_keys: Deduplicate on the 64-bit ``hash_key`` column
+                (default: ``DB_COMPACT_KEYS`` environment variable). Must
+                match the table: ``db/migrations/001_compact_hash_key.sql``
+                replaces the ``hash_id`` unique constraint with ``hash_key``
+            known_keys: Drop rows already in the table before inserting
+                (default: ``DB_KNOWN_KEYS`` environment variable, on unless ``0``)
+        """
         load_dotenv()
+        if compact_keys is None:
+            compact_keys = os.getenv("DB_COMPACT_KEYS", "").lower() in ("1", "true")
+        self.compact_keys = compact_keys
+        if known_keys is None:
+            known_keys = os.getenv("DB_KNOWN_KEYS", "1").lower() not in ("0", "false")
+        self.use_known_keys = known_keys
+        self.known_keys: Optional[KnownKeys] = None
+        self._known_lock = asyncio.Lock()
         self.dsn = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
         self.pool = None
 
-        # In-memory caches
-        self._geo_cache: Dict[str, int] = {}
+        # In-memory caches keyed by the names as given (normalization
+        # belongs to the transformer; raw names are stored unchanged)
+        self._geo_cache: Dict[Tuple[str, str], int] = {}
         self._emp_cache: Dict[str, int] = {}
 
         # Lock for cache population to prevent race conditions
@@ -54,7 +91,7 @@ class AsyncPostgreSQLRepository:
 
     async def get_or_create_geografia(self, region: str, comuna: str) -> int:
         """Get or create geografia dimension with caching."""
-        key = f"{region}|{comuna}"
+        key = (region, comuna)
         if key in self._geo_cache:
             return self._geo_cache[key]
 
@@ -129,12 +166,82 @@ class AsyncPostgreSQLRepository:
                 "SELECT id_tiempo FROM dim_tiempo WHERE fecha = $1", fecha
             )
 
+    async def load_known_keys(self) -> KnownKeys:
+        """Read every ``hash_key`` in ``fact_interrupciones`` into memory."""
+        if self.compact_keys:
+            query = "SELECT hash_key FROM fact_interrupciones WHERE hash_key IS NOT NULL"
+        else:
+            query = f"SELECT {hash_key_sql('hash_id')} FROM fact_interrupciones"
+
+        chunks = []
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                cursor = await conn.cursor(query)
+                while True:
+                    rows = await cursor.fetch(100_000)
+                    if not rows:
+                        break
+                    chunks.append(
+                        np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                    )
+
+        known = KnownKeys.from_chunks(chunks)
+        logger.info(
+            f"🔑 Loaded {len(known):,} known keys ({known.nbytes / 1e6:.1f} MB)"
+        )
+        return known
+
+    async def _insert_rows(self, conn, tuples: List[tuple]) -> int:
+        """COPY rows into a temp table and insert the new ones.
+
+        ``executemany`` reports no row counts; ``INSERT ... SELECT ...
+        RETURNING`` from a staged copy does, in one transaction.
+
+        Args:
+            conn: Pool connection
+            tuples: Fact rows in ``FACT_COLUMNS`` order (plus ``hash_key``
+                in compact mode)
+
+        Returns:
+            int: Rows actually inserted (the rest hit ``ON CONFLICT``)
+        """
+        columns = FACT_COLUMNS + (["hash_key"] if self.compact_keys else [])
+        column_list = ", ".join(columns)
+        conflict = "hash_key" if self.compact_keys else "hash_id"
+
+        async with conn.transaction():
+            await conn.execute(
+                f"CREATE TEMP TABLE stage_fact ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM fact_interrupciones WITH NO DATA"
+            )
+            await conn.copy_records_to_table(
+                "stage_fact", records=tuples, columns=columns
+            )
+            rows = await conn.fetch(
+                f"INSERT INTO fact_interrupciones ({column_list}) "
+                f"SELECT {column_list} FROM stage_fact "
+                f"ON CONFLICT ({conflict}) DO NOTHING RETURNING 1"
+            )
+        return len(rows)
+
     async def save_records(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
         """Save batch of records."""
         if not records:
-            return {"insertados": 0}
+            return {"insertados": 0, "duplicados": 0}
 
         try:
+            # Descarta antes de resolver dimensiones los cortes ya cargados
+            keys = [record_hash_key(r) for r in records]
+            omitidos = 0
+            if self.use_known_keys:
+                async with self._known_lock:
+                    if self.known_keys is None:
+                        self.known_keys = await self.load_known_keys()
+                mask = self.known_keys.new_mask(keys)
+                records = [r for r, nuevo in zip(records, mask) if nuevo]
+                keys = [k for k, nuevo in zip(keys, mask) if nuevo]
+                omitidos = len(mask) - len(records)
+
             # Prepare batch data
             # We need to resolve dimensions first.
             # Doing this sequentially in a loop might be slow if cache misses.
@@ -146,7 +253,8 @@ class AsyncPostgreSQLRepository:
             # In a real high-perf scenario, we might want to batch these lookups too,
             # but for now, rely on cache.
 
-            for r in records:
+            sent_keys = []
+            for r, key in zip(records, keys):
                 id_geo = await self.get_or_create_geografia(
                     r.get("REGION") or "DESCONOCIDO", r.get("COMUNA") or "DESCONOCIDO"
                 )
@@ -164,36 +272,38 @@ class AsyncPostgreSQLRepository:
                     # Let's assume dim_tiempo is populated.
                     continue
 
-                tuples.append(
-                    (
-                        r["ID_UNICO"],
-                        id_geo,
-                        id_emp,
-                        id_tiempo,
-                        r.get("CLIENTES_AFECTADOS", 0),
-                        r.get("HORA_INT"),
-                        r.get("TIMESTAMP_SERVER"),
-                        r.get("FECHA_STR"),
-                        r.get("ACTUALIZADO_HACE"),
-                    )
+                row = (
+                    r["ID_UNICO"],
+                    id_geo,
+                    id_emp,
+                    id_tiempo,
+                    r.get("CLIENTES_AFECTADOS", 0),
+                    r.get("HORA_INT"),
+                    r.get("TIMESTAMP_SERVER"),
+                    r.get("FECHA_STR"),
+                    r.get("ACTUALIZADO_HACE"),
+                    r.get("ACTUALIZADO_HACE_MIN"),
                 )
+                if self.compact_keys:
+                    row += (key,)
+                tuples.append(row)
+                sent_keys.append(key)
 
             if not tuples:
-                return {"insertados": 0}
-
-            query = """
-                INSERT INTO fact_interrupciones (
-                    hash_id, id_geografia, id_empresa, id_tiempo,
-                    clientes_afectados, hora_interrupcion,
-                    hora_server_scraping, fecha_int_str, actualizado_hace
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                ON CONFLICT (hash_id) DO NOTHING
-            """
+                return {"insertados": 0, "duplicados": omitidos}
 
             async with self.pool.acquire() as conn:
-                await conn.executemany(query, tuples)
+                insertados = await self._insert_rows(conn, tuples)
+
+            # Con ON CONFLICT DO NOTHING las filas en conflicto también
+            # están en la tabla: todas las claves enviadas quedan conocidas
+            if self.known_keys is not None:
+                self.known_keys.add(sent_keys)
 
-            return {"insertados": len(tuples)}
+            return {
+                "insertados": insertados,
+                "duplicados": omitidos + len(tuples) - insertados,
+            }
 
         except Exception as e:
             logger.error(f"❌ Async Batch Error: {e}")
@@ -0,0 +1,327 @@
+"""Pool of warmed Playwright browser contexts for the SEC historical API.
+
+Launching Chromium, passing through sec.cl and loading the INTONLINE app
+costs far more than the ``GetPorFecha`` request itself. This pool keeps a
+few contexts parked on ``apps.sec.cl/INTONLINEv1/index.aspx`` so each one
+can serve many fetch payloads before being recycled.
+"""
+
+import itertools
+import logging
+import random
+import time
+from typing import List, Optional
+
+from playwright.sync_api import sync_playwright
+
+from config import URL_SEC_APP, URL_SEC_HOME
+from core.lean_navigation import apply_lean_profile, has_valid_session, warm_page
+from core.session_store import SessionStore, is_session_rejected
+from core.sec_fetch import (
+    EXTRA_HEADERS,
+    FETCH_SEC_DATA_BATCH_SCRIPT,
+    FETCH_HORA_SERVER_SCRIPT,
+    FETCH_SEC_DATA_SCRIPT,
+    USER_AGENTS,
+    ServerClock,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class WarmContext:
+    """Browser context + page already parked on the INTONLINE app.
+
+    Attributes:
+        context: Playwright BrowserContext
+        page: Page loaded on the INTONLINE app
+        user_agent: User agent the context was created with
+        requests_served: Number of fetch payloads served so far
+    """
+
+    def __init__(self, context, page, user_agent: str):
+        self.context = context
+        self.page = page
+        self.user_agent = user_agent
+        self.requests_served = 0
+        self.created_at = time.time()
+
+    def close(self):
+        """Close the underlying context, ignoring errors from dead browsers."""
+        try:
+            self.context.close()
+        except Exception as e:
+            logger.debug(f"Error cerrando contexto: {e}")
+
+
+class BrowserPool:
+    """Long-lived Chromium with a fixed number of warmed contexts.
+
+    Contexts are handed out round-robin and recycled after
+    ``max_requests_per_context`` fetches or as soon as a fetch fails.
+
+    Usage:
+        with BrowserPool(size=2) as pool:
+            result = pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_requests_per_context: int = 250,
+        headless: bool = True,
+        home_delay: float = 2.0,
+        app_delay: float = 10.0,
+        server_time_interval: Optional[float] = None,
+        lean: bool = True,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """Initialize the pool (the browser is launched lazily).
+
+        Args:
+            size: Number of warmed contexts kept alive
+            max_requests_per_context: Fetches served before a context is recycled
+            headless: Run Chromium headless
+            home_delay: Seconds to wait after loading the sec.cl home
+            app_delay: Seconds to wait after loading the INTONLINE app
+            server_time_interval: Seconds between GetHoraServer syncs
+                (default: once per pool)
+            lean: Use the lean navigation profile: block heavy resources,
+                wait for readiness instead of ``home_delay``/``app_delay``
+                and reuse a live context's session for new contexts
+            session_store: On-disk session state used to seed contexts when
+                no live context exists, refreshed after every warm-up
+                (default: ``SessionStore.from_env()``)
+        """
+        if size < 1:
+            raise ValueError("size must be >= 1")
+
+        self.size = size
+        self.max_requests_per_context = max_requests_per_context
+        self.headless = headless
+        self.home_delay = home_delay
+        self.app_delay = app_delay
+        self.lean = lean
+        self.session_store = session_store or SessionStore.from_env()
+
+        self._playwright = None
+        self._browser = None
+        self._slots: List[Optional[WarmContext]] = [None] * size
+        self._cycle = itertools.cycle(range(size))
+        self.clock = ServerClock(refresh_interval=server_time_interval)
+
+        self.stats = {"contexts_created": 0, "contexts_recycled": 0, "fetches": 0}
+
+    def start(self):
+        """Launch Chromium if it is not already running."""
+        if self._browser is not None:
+            return
+
+        logger.info("  🌐 Lanzando navegador del pool...")
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+
+    def _session_seed(self) -> Optional[WarmContext]:
+        """A live context whose cookies a new context can reuse."""
+        for ctx in self._slots:
+            if ctx is not None:
+                return ctx
+        return None
+
+    def _launch_context(self) -> WarmContext:
+        """Create a new context and park it on the INTONLINE app."""
+        self.start()
+
+        seed = self._session_seed() if self.lean else None
+        # Las cookies de sesión van atadas al user agent que las obtuvo
+        ua = seed.user_agent if seed is not None else random.choice(USER_AGENTS)
+        state = None
+        if seed is None and self.session_store is not None:
+            state = self.session_store.load()
+            if state is not None:
+                ua = self.session_store.user_agent or ua
+
+        context = self._browser.new_context(
+            user_agent=ua,
+            viewport={"width": 1920, "height": 1080},
+            locale="es-CL",
+            timezone_id="America/Santiago",
+            storage_state=state,
+        )
+        try:
+            page = context.new_page()
+            page.set_extra_http_headers(EXTRA_HEADERS)
+
+            if self.lean:
+                apply_lean_profile(context)
+                if seed is not None:
+                    context.add_cookies(seed.context.cookies())
+                skip_home = has_valid_session(context.cookies())
+                logger.info(
+                    "  🔗 Calentando contexto (perfil liviano"
+                    f"{', sesión reutilizada' if skip_home else ''})..."
+                )
+                warm_page(page, skip_home=skip_home)
+                return self._register(context, page, ua)
+
+            logger.info("  🔗 Calentando contexto: home SEC...")
+            page.goto(URL_SEC_HOME, wait_until="domcontentloaded", timeout=60000)
+            time.sleep(self.home_delay)
+
+            logger.info("  🔗 Calentando contexto: app de interrupciones...")
+            page.goto(URL_SEC_APP, wait_until="commit", timeout=90000)
+            time.sleep(self.app_delay)
+        except Exception:
+            context.close()
+            if state is not None:
+                # La sesión restaurada no pasó el calentamiento
+                self.session_store.clear()
+            raise
+
+        return self._register(context, page, ua)
+
+    def _register(self, context, page, ua: str) -> WarmContext:
+        if self.session_store is not None:
+            try:
+                self.session_store.save(context.storage_state(), ua)
+            except Exception as e:
+                logger.warning(f"  ⚠️ No se pudo guardar la sesión: {e}")
+        self.stats["contexts_created"] += 1
+        logger.info(f"  ✓ Contexto listo ({self.stats['contexts_created']} creados)")
+        return WarmContext(context, page, ua)
+
+    def acquire(self) -> WarmContext:
+        """Return the next warmed context, launching or replacing it if needed."""
+        slot = next(self._cycle)
+        ctx = self._slots[slot]
+
+        if ctx is not None and ctx.requests_served >= self.max_requests_per_context:
+            logger.info(
+                f"  ♻️ Reciclando contexto tras {ctx.requests_served} requests"
+            )
+            self._recycle(slot)
+            ctx = None
+
+        if ctx is None:
+            ctx = self._launch_context()
+            self._slots[slot] = ctx
+
+        return ctx
+
+    def release(self, ctx: WarmContext, failed: bool = False, served: int = 1):
+        """Return a context to the pool.
+
+        Args:
+            ctx: Context previously obtained from ``acquire``
+            failed: Whether the fetch failed; failed contexts are recycled
+            served: Payloads fetched with the context (the only place
+                ``requests_served`` is counted)
+        """
+        ctx.requests_served += served
+        if failed and ctx in self._slots:
+            logger.warning("  ♻️ Reciclando contexto tras error")
+            self._recycle(self._slots.index(ctx))
+
+    def _recycle(self, slot: int):
+        ctx = self._slots[slot]
+        if ctx is not None:
+            ctx.close()
+            self.stats["contexts_recycled"] += 1
+        self._slots[slot] = None
+
+    def _check_session(self, results: List[dict]):
+        """Drop the saved session state if SEC rejected any fetch."""
+        if self.session_store is not None and any(
+            is_session_rejected(r.get("error")) for r in results
+        ):
+            self.session_store.clear()
+
+    def _sync_clock(self, ctx: WarmContext):
+        """Refresh the cached server time if it is missing or stale."""
+        if not self.clock.needs_refresh():
+            return
+        result = ctx.page.evaluate(FETCH_HORA_SERVER_SCRIPT)
+        if not self.clock.update(result.get("horaServer")):
+            logger.warning(f"  ⚠️ No se pudo obtener hora SEC: {result.get('error')}")
+
+    def fetch(self, payload: dict) -> dict:
+        """Run ``FETCH_SEC_DATA_SCRIPT`` for one payload on a warmed context.
+
+        Args:
+            payload: Dict with 'anho', 'mes', 'dia' and 'hora'
+
+        Returns:
+            dict: Raw script result with 'data', 'horaServer' and 'error'
+        """
+        ctx = self.acquire()
+        try:
+            self._sync_clock(ctx)
+            result = ctx.page.evaluate(FETCH_SEC_DATA_SCRIPT, payload)
+        except Exception:
+            self.release(ctx, failed=True)
+            raise
+
+        self._check_session([result])
+        result["horaServer"] = self.clock.hora_server()
+        self.stats["fetches"] += 1
+        self.release(ctx, failed=bool(result.get("error")))
+        return result
+
+    def fetch_batch(self, payloads: List[dict], concurrency: int = 10) -> List[dict]:
+        """Run ``FETCH_SEC_DATA_BATCH_SCRIPT`` for many payloads in one evaluate.
+
+        Args:
+            payloads: List of dicts with 'anho', 'mes', 'dia' and 'hora'
+            concurrency: Fetches run in parallel inside the page
+
+        Returns:
+            List of raw script results, in the same order as ``payloads``
+        """
+        if not payloads:
+            return []
+
+        ctx = self.acquire()
+        try:
+            self._sync_clock(ctx)
+            results = ctx.page.evaluate(
+                FETCH_SEC_DATA_BATCH_SCRIPT,
+                {"payloads": payloads, "concurrency": concurrency},
+            )
+        except Exception:
+            self.release(ctx, failed=True, served=len(payloads))
+            raise
+
+        self._check_session(results)
+        hora_server = self.clock.hora_server()
+        for result in results:
+            result["horaServer"] = hora_server
+        self.stats["fetches"] += len(payloads)
+        # El contexto se recicla sólo si todo el lote falló
+        all_failed = bool(results) and all(r.get("error") for r in results)
+        self.release(ctx, failed=all_failed, served=len(payloads))
+        return results
+
+    def close(self):
+        """Close every context, the browser and the Playwright driver."""
+        for ctx in self._slots:
+            if ctx is not None:
+                ctx.close()
+        self._slots = [None] * self.size
+
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                logger.debug(f"Error cerrando navegador: {e}")
+            self._browser = None
+
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+            logger.info("  🔒 Pool de navegadores cerrado")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
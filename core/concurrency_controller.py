@@ -0,0 +1,219 @@
+"""Adaptive (AIMD) concurrency control for historical scraping.
+
+A fixed ``max_concurrent`` is too aggressive when SEC slows down and too
+timid at night. This controller behaves like a semaphore whose limit moves
+with observed latency percentiles, HTTP error rates and timeouts:
+additive increase while SEC is healthy, multiplicative decrease when it
+is not.
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyDecision:
+    """One limit adjustment and the window statistics that caused it."""
+
+    def __init__(
+        self,
+        old_limit: int,
+        new_limit: int,
+        reason: str,
+        p50: float,
+        p95: float,
+        error_rate: float,
+        timeout_rate: float,
+    ):
+        self.timestamp = time.time()
+        self.old_limit = old_limit
+        self.new_limit = new_limit
+        self.reason = reason
+        self.p50 = p50
+        self.p95 = p95
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+
+    def __str__(self) -> str:
+        arrow = "⬆️" if self.new_limit > self.old_limit else "⬇️"
+        if self.new_limit == self.old_limit:
+            arrow = "⏸️"
+        return (
+            f"{arrow} {self.old_limit}→{self.new_limit} ({self.reason}) "
+            f"p50={self.p50:.1f}s p95={self.p95:.1f}s "
+            f"err={self.error_rate:.0%} timeout={self.timeout_rate:.0%}"
+        )
+
+
+class AdaptiveConcurrencyController:
+    """Semaphore-like gate with an AIMD-controlled limit.
+
+    Use it wherever an ``asyncio.Semaphore`` is expected and report every
+    request outcome with ``record``.
+
+    Usage:
+        controller = AdaptiveConcurrencyController(initial=20, max_limit=50)
+        async with controller:
+            start = time.time()
+            ok = await fetch()
+        controller.record(time.time() - start, ok=ok)
+
+    Attributes:
+        limit: Current maximum number of requests in flight
+        in_flight: Requests currently holding a permit
+        decisions: Most recent limit adjustments
+    """
+
+    def __init__(
+        self,
+        initial: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 100,
+        target_p95: float = 10.0,
+        max_error_rate: float = 0.05,
+        window: int = 50,
+        increase: int = 2,
+        decrease_factor: float = 0.5,
+        on_decision: Optional[Callable[[ConcurrencyDecision], None]] = None,
+    ):
+        """Initialize the controller.
+
+        Args:
+            initial: Starting limit
+            min_limit: Limit never goes below this
+            max_limit: Limit never goes above this
+            target_p95: p95 latency (seconds) above which the limit shrinks
+            max_error_rate: Error + timeout rate above which the limit shrinks
+            window: Samples per adjustment window
+            increase: Additive increase per healthy window
+            decrease_factor: Multiplicative decrease on an unhealthy window
+            on_decision: Optional callback receiving every decision
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial, max_limit))
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.window = window
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.on_decision = on_decision
+
+        self.in_flight = 0
+        self.decisions: Deque[ConcurrencyDecision] = deque(maxlen=100)
+
+        self._condition = asyncio.Condition()
+        # Referencias a los avisos pendientes: una task sin referencia puede
+        # ser recolectada antes de correr y dejar waiters colgados
+        self._notify_tasks: Set[asyncio.Task] = set()
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._timeouts = 0
+
+    async def acquire(self):
+        """Wait until a request may start under the current limit."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    def release(self):
+        """Give a permit back and wake up waiting requests."""
+        self.in_flight -= 1
+        self._schedule_notify()
+
+    async def _notify(self):
+        async with self._condition:
+            self._condition.notify_all()
+
+    def _schedule_notify(self):
+        """Wake up waiters from sync code (``release``, ``record``)."""
+        try:
+            task = asyncio.get_running_loop().create_task(self._notify())
+        except RuntimeError:
+            return
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.in_flight -= 1
+        await self._notify()
+
+    def record(
+        self,
+        latency: float,
+        ok: bool = True,
+        timeout: bool = False,
+        http_error: bool = False,
+    ) -> Optional[ConcurrencyDecision]:
+        """Report the outcome of one request.
+
+        Args:
+            latency: Seconds the request took
+            ok: Whether the request succeeded
+            timeout: Whether the request timed out
+            http_error: Whether SEC answered with an HTTP error
+
+        Returns:
+            ConcurrencyDecision: The adjustment made if this sample closed a
+                window, else None
+        """
+        self._latencies.append(latency)
+        if timeout:
+            self._timeouts += 1
+        elif http_error or not ok:
+            self._errors += 1
+
+        if len(self._latencies) < self.window:
+            return None
+        return self._adjust()
+
+    def _adjust(self) -> ConcurrencyDecision:
+        n = len(self._latencies)
+        p50 = p95 = statistics.median(self._latencies)
+        if n >= 2:
+            p95 = statistics.quantiles(self._latencies, n=20, method="inclusive")[18]
+        error_rate = self._errors / n
+        timeout_rate = self._timeouts / n
+
+        old = self.limit
+        if error_rate + timeout_rate > self.max_error_rate:
+            new = int(old * self.decrease_factor)
+            reason = "errores/timeouts sobre el umbral"
+        elif p95 > self.target_p95:
+            new = int(old * self.decrease_factor)
+            reason = f"p95 sobre objetivo {self.target_p95:.0f}s"
+        else:
+            new = old + self.increase
+            reason = "SEC sana"
+        self.limit = max(self.min_limit, min(new, self.max_limit))
+
+        decision = ConcurrencyDecision(
+            old, self.limit, reason, p50, p95, error_rate, timeout_rate
+        )
+        self.decisions.append(decision)
+        self._latencies = []
+        self._errors = 0
+        self._timeouts = 0
+
+        if self.limit > old:
+            self._schedule_notify()
+
+        if self.on_decision is not None:
+            self.on_decision(decision)
+        return decision
+
+    def status(self) -> str:
+        """One-line summary for progress output."""
+        line = f"🎚️ límite {self.limit} (en vuelo {self.in_flight})"
+        if self.decisions:
+            line += f" | último ajuste: {self.decisions[-1]}"
+        return line
@@ -6,6 +6,8 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+ACTUALIZADO_PATTERN = re.compile(r"\d+\s+Dias\s+\d+\s+Horas\s+\d+\s+Minutos")
+
 
 class DataQualityChecker:
     """Valida integridad de datos transformados"""
@@ -21,8 +23,10 @@ class DataQualityChecker:
         if not row.get("ACTUALIZADO_HACE"):
             return False, "ACTUALIZADO_HACE vacío"
 
-        actualizado_pattern = r"\d+\s+Dias\s+\d+\s+Horas\s+\d+\s+Minutos"
-        if not re.match(actualizado_pattern, row["ACTUALIZADO_HACE"]):
+        # Si el transformer ya lo parseó a minutos no hace falta el regex
+        if row.get("ACTUALIZADO_HACE_MIN") is None and not ACTUALIZADO_PATTERN.match(
+            row["ACTUALIZADO_HACE"]
+        ):
             return (
                 False,
                 f"ACTUALIZADO_HACE formato inválido: {row['ACTUALIZADO_HACE']}",
@@ -0,0 +1,74 @@
+"""``ACTUALIZADO_HACE`` ("2 Dias 3 Horas 15 Minutos") as integer minutes.
+
+SEC reports how long ago each outage started as free text. It is parsed
+once at ingest, vectorized over a whole column, into
+``ACTUALIZADO_HACE_MIN`` (``fact_interrupciones.actualizado_hace_min``) so
+analyses read a number instead of re-running regexes per row. The same
+rules live in SQL as ``parse_actualizado_hace`` (``db/migrations/002``).
+"""
+
+from typing import Iterable, List, Optional
+
+import polars as pl
+
+# Una sola pasada de regex anclada en ambos extremos: "<d> Dias <h> Horas
+# <m> Minutos", cada componente opcional (singular/plural, tildes, "min"),
+# en ese orden; cualquier otro texto ("5 Horas basura") da null.
+ACTUALIZADO_REGEX = (
+    r"(?i)^\s*(?:(\d+)\s*d[ií]as?)?\s*(?:(\d+)\s*horas?)?"
+    r"\s*(?:(\d+)\s*min(?:utos?)?)?\s*$"
+)
+_FACTORS = (1440, 60, 1)
+
+
+def _combine(parts: List[pl.Expr]) -> pl.Expr:
+    """Sum of the component minutes; null if no component matched."""
+    matched = pl.any_horizontal([p.is_not_null() for p in parts])
+    total = pl.sum_horizontal([p.fill_null(0) for p in parts])
+    return pl.when(matched).then(total).otherwise(None)
+
+
+def actualizado_minutes_expr(text: pl.Expr) -> pl.Expr:
+    """Polars expression: minutes in an ``ACTUALIZADO_HACE`` column.
+
+    Missing components count as zero; text with no component at all, with
+    anything else around the components, or null gives null.
+    """
+    groups = text.str.extract_groups(ACTUALIZADO_REGEX)
+    return _combine(
+        [
+            groups.struct.field(str(i + 1)).cast(pl.Int64) * factor
+            for i, factor in enumerate(_FACTORS)
+        ]
+    )
+
+
+def parse_actualizado_hace(values: Iterable) -> List[Optional[int]]:
+    """Minutes for a whole column of ``ACTUALIZADO_HACE`` values.
+
+    Args:
+        values: Raw values (non-strings and None give None)
+
+    Returns:
+        list: Minutes per value, in the same order
+    """
+    textos = [v if isinstance(v, str) else None for v in values]
+    if not textos:
+        return []
+    # Regex una sola vez por fila: extraer grupos, luego combinar
+    return (
+        pl.LazyFrame({"t": textos}, schema={"t": pl.String})
+        .select(pl.col("t").str.extract_groups(ACTUALIZADO_REGEX).alias("g"))
+        .unnest("g")
+        .select(
+            _combine(
+                [
+                    pl.col(str(i + 1)).cast(pl.Int64) * factor
+                    for i, factor in enumerate(_FACTORS)
+                ]
+            )
+        )
+        .collect()
+        .to_series()
+        .to_list()
+    )
@@ -0,0 +1,408 @@
+"""Snapshot-to-event consolidation (``fact_eventos``).
+
+Every row of ``fact_interrupciones`` is one snapshot of an outage: SEC
+reports it again at every scrape until it is resolved. An *event* is the
+chain of snapshots of the same outage, identified by (comuna, empresa,
+declared start date/time). ``EventConsolidator`` keeps only the open
+events in an in-memory index and folds each new snapshot batch into them,
+so the cost of a batch does not depend on the size of the history. An
+event closes once no snapshot has extended it for ``max_gap`` of
+snapshot time.
+
+Snapshot time is the historical instant each point describes
+(``fecha_consultada``), not ``hora_server_scraping``: a backfill scrapes
+years of points within hours of server time.
+
+``EventStore`` persists closed events as Parquet part files plus the open
+events and the watermark, so the next run resumes where the last one
+stopped. ``consolidate`` drives both from raw point results (bronze
+archive or NDJSON dataset).
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import polars as pl
+
+from core.hash_key import content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_GAP = timedelta(hours=24)
+DEFAULT_ROOT = Path("outputs/fact_eventos")
+OPEN_FILE = "_open.parquet"
+STATE_FILE = "_state.json"
+POINT_FORMAT = "%Y-%m-%d %H:%M"
+# Base de tiempo del watermark; estados sin ella usaban TIMESTAMP_SERVER
+SNAPSHOT_CLOCK = "fecha_consultada"
+
+EVENT_SCHEMA = {
+    "id_evento": pl.Int64,
+    "region": pl.String,
+    "comuna": pl.String,
+    "empresa": pl.String,
+    "inicio": pl.Datetime("us"),
+    "primer_snapshot": pl.Datetime("us"),
+    "ultimo_snapshot": pl.Datetime("us"),
+    "n_snapshots": pl.Int64,
+    "clientes_inicial": pl.Int64,
+    "clientes_max": pl.Int64,
+    "clientes_final": pl.Int64,
+    "clientes_hora": pl.Float64,
+    "duracion_min": pl.Int64,
+}
+
+EventKey = Tuple[str, str, datetime]
+
+
+def event_id(
+    comuna: str, empresa: str, inicio: datetime, primer_snapshot: datetime
+) -> int:
+    """Stable 64-bit id of an event (same scheme as ``hash_key``).
+
+    ``primer_snapshot`` tells apart the events of an outage that reappears
+    after ``max_gap`` with the same declared start.
+    """
+    return content_hash(
+        f"{comuna}_{empresa}_{inicio.strftime('%Y%m%d_%H%M')}"
+        f"_{primer_snapshot.strftime('%Y%m%d_%H%M')}"
+    )[1]
+
+
+def point_time(batch: dict) -> Optional[datetime]:
+    """Historical instant a point result describes (``fecha_consultada``)."""
+    value = batch.get("fecha_consultada")
+    return datetime.strptime(value, POINT_FORMAT) if value else None
+
+
+class EventConsolidator:
+    """Links consecutive snapshots of the same outage into events.
+
+    Snapshot batches must arrive in chronological order of snapshot time
+    (``fecha_consultada``, as ``RawArchive.iter_results`` and
+    ``iter_dataset`` yield them).
+
+    Usage:
+        consolidator = EventConsolidator()
+        for point, records in transformed_batches:
+            closed = consolidator.add_snapshot(records, point)
+        closed += consolidator.flush()
+
+    Attributes:
+        max_gap: Snapshot time without news after which an event closes
+        watermark: Latest snapshot time seen
+    """
+
+    def __init__(
+        self,
+        max_gap: timedelta = DEFAULT_MAX_GAP,
+        watermark: Optional[datetime] = None,
+    ):
+        """Initialize the consolidator.
+
+        Args:
+            max_gap: Snapshot time without news after which an event closes
+                (default: 24 hours, so one or two failed 6-hourly points do
+                not split an outage in two)
+            watermark: Latest snapshot time already consolidated
+        """
+        self.max_gap = max_gap
+        self.watermark = watermark
+        self._open: Dict[EventKey, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def add_snapshot(
+        self, records: List[dict], snapshot_time: Optional[datetime] = None
+    ) -> List[dict]:
+        """Fold one snapshot batch of transformed records into the index.
+
+        Args:
+            records: Output of ``SecDataTransformer.transform`` for one point
+            snapshot_time: Instant the point describes (``point_time``);
+                records without it fall back to their ``TIMESTAMP_SERVER``
+
+        Returns:
+            list: Events closed by the advance of the watermark
+        """
+        stamps = [snapshot_time or r["TIMESTAMP_SERVER"] for r in records]
+
+        # Primero cerrar lo vencido: un corte que reaparece tras max_gap es
+        # un evento nuevo, no la continuación del anterior
+        if stamps:
+            latest = max(stamps)
+            if self.watermark is None or latest > self.watermark:
+                self.watermark = latest
+        closed = self._close_stale()
+
+        for record, ts in zip(records, stamps):
+            inicio = datetime.combine(record["FECHA_DT"], record["HORA_INT"])
+            key = (record["COMUNA"], record["EMPRESA"], inicio)
+            clientes = int(record.get("CLIENTES_AFECTADOS") or 0)
+
+            event = self._open.get(key)
+            if event is None:
+                self._open[key] = {
+                    "id_evento": event_id(key[0], key[1], inicio, ts),
+                    "region": record.get("REGION"),
+                    "comuna": key[0],
+                    "empresa": key[1],
+                    "inicio": inicio,
+                    "primer_snapshot": ts,
+                    "ultimo_snapshot": ts,
+                    "n_snapshots": 1,
+                    "clientes_inicial": clientes,
+                    "clientes_max": clientes,
+                    "clientes_final": clientes,
+                    "clientes_hora": 0.0,
+                }
+            elif ts > event["ultimo_snapshot"]:
+                # Escalón: el último nivel vale hasta el snapshot siguiente
+                horas = (ts - event["ultimo_snapshot"]).total_seconds() / 3600
+                event["clientes_hora"] += event["clientes_final"] * horas
+                event["ultimo_snapshot"] = ts
+                event["n_snapshots"] += 1
+                event["clientes_final"] = clientes
+                event["clientes_max"] = max(event["clientes_max"], clientes)
+            else:
+                # Snapshot repetido o fuera de orden: solo puede subir el pico
+                event["clientes_max"] = max(event["clientes_max"], clientes)
+
+        return closed
+
+    def _close_stale(self) -> List[dict]:
+        if self.watermark is None:
+            return []
+        limit = self.watermark - self.max_gap
+        stale = [k for k, e in self._open.items() if e["ultimo_snapshot"] < limit]
+        return [self._finish(self._open.pop(k)) for k in stale]
+
+    @staticmethod
+    def _finish(event: dict) -> dict:
+        duracion = (event["ultimo_snapshot"] - event["inicio"]).total_seconds() / 60
+        return {**event, "duracion_min": max(int(duracion), 0)}
+
+    def open_events(self) -> List[dict]:
+        """Snapshot of the open events (with their duration so far)."""
+        return [self._finish(e) for e in self._open.values()]
+
+    def flush(self) -> List[dict]:
+        """Close every open event (end of the history)."""
+        closed = self.open_events()
+        self._open.clear()
+        return closed
+
+    def restore(self, events: Iterable[dict]):
+        """Reload open events saved by ``EventStore.save_open``."""
+        for event in events:
+            event = {k: v for k, v in event.items() if k != "duracion_min"}
+            key = (event["comuna"], event["empresa"], event["inicio"])
+            self._open[key] = event
+
+
+def events_frame(events: List[dict]) -> pl.DataFrame:
+    """Events as a DataFrame with ``EVENT_SCHEMA``."""
+    return pl.DataFrame(events, schema=EVENT_SCHEMA)
+
+
+class EventStore:
+    """Parquet home of ``fact_eventos``: closed parts + open events + state.
+
+    Layout:
+        root/part-00000.parquet ...  closed events, append-only
+        root/_open.parquet           events still open at the watermark
+        root/_state.json             {"watermark": ..., "parts": ..., ...}
+
+    Attributes:
+        root: Store directory
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        """Initialize the store.
+
+        Args:
+            root: Store directory (created on first write)
+        """
+        self.root = Path(root)
+
+    def _parts(self) -> List[Path]:
+        return sorted(self.root.glob("part-*.parquet"))
+
+    def _read_state(self) -> dict:
+        state_file = self.root / STATE_FILE
+        if not state_file.exists():
+            return {}
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def watermark(self) -> Optional[datetime]:
+        """Latest snapshot time already consolidated."""
+        value = self._read_state().get("watermark")
+        return datetime.fromisoformat(value) if value else None
+
+    def load_consolidator(self, max_gap: timedelta = DEFAULT_MAX_GAP):
+        """Consolidator resumed from the stored open events and watermark.
+
+        Part files written after the last saved state (a run that died
+        between the two writes) are dropped: their events are still in
+        the open set and will close again.
+
+        Raises:
+            ValueError: The store was built on ``TIMESTAMP_SERVER`` and must
+                be rebuilt from scratch
+        """
+        state = self._read_state()
+        if state and state.get("clock") != SNAPSHOT_CLOCK:
+            raise ValueError(
+                f"{self.root} usa TIMESTAMP_SERVER como tiempo de snapshot; "
+                "bórralo y reconstruye los eventos"
+            )
+        committed = state.get("parts")
+        if committed is not None:
+            for orphan in self._parts()[committed:]:
+                logger.warning(f"⚠️ Descartando parte sin estado: {orphan.name}")
+                orphan.unlink()
+
+        consolidator = EventConsolidator(max_gap, watermark=self.watermark())
+        open_file = self.root / OPEN_FILE
+        if open_file.exists():
+            consolidator.restore(pl.read_parquet(open_file).to_dicts())
+        return consolidator
+
+    def append(self, events: List[dict]) -> Optional[Path]:
+        """Write closed events as a new part file."""
+        if not events:
+            return None
+        self.root.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        next_id = int(parts[-1].stem.split("-")[1]) + 1 if parts else 0
+        path = self.root / f"part-{next_id:05d}.parquet"
+        tmp = path.with_suffix(".tmp")
+        events_frame(events).write_parquet(tmp)
+        tmp.replace(path)
+        return path
+
+    def save_open(self, consolidator: EventConsolidator):
+        """Persist the open events and the watermark."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (OPEN_FILE + ".tmp")
+        events_frame(consolidator.open_events()).write_parquet(tmp)
+        tmp.replace(self.root / OPEN_FILE)
+        state = {
+            "watermark": (
+                consolidator.watermark.isoformat() if consolidator.watermark else None
+            ),
+            "clock": SNAPSHOT_CLOCK,
+            "max_gap_min": consolidator.max_gap.total_seconds() / 60,
+            "parts": len(self._parts()),
+        }
+        tmp = self.root / (STATE_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        tmp.replace(self.root / STATE_FILE)
+
+    def part_count(self) -> int:
+        """Closed-event part files written so far."""
+        return len(self._parts())
+
+    def scan(self, include_open: bool = True, from_part: int = 0) -> pl.LazyFrame:
+        """Every event (closed parts, plus open ones unless excluded).
+
+        Adds an ``abierto`` column flagging events still open.
+
+        Args:
+            include_open: Include the events still open at the watermark
+            from_part: Skip the first ``from_part`` part files (events
+                closed by earlier runs)
+        """
+        frames = [
+            pl.scan_parquet(p).with_columns(pl.lit(False).alias("abierto"))
+            for p in self._parts()[from_part:]
+        ]
+        open_file = self.root / OPEN_FILE
+        if include_open and open_file.exists():
+            frames.append(
+                pl.scan_parquet(open_file).with_columns(pl.lit(True).alias("abierto"))
+            )
+        if not frames:
+            return events_frame([]).with_columns(
+                pl.lit(False).alias("abierto")
+            ).lazy()
+        return pl.concat(frames)
+
+
+def consolidate(
+    batches: Iterable[dict],
+    store: Optional[EventStore] = None,
+    transformer=None,
+    max_gap: timedelta = DEFAULT_MAX_GAP,
+    part_size: int = 100_000,
+    finalize: bool = False,
+) -> Dict[str, int]:
+    """Consolidate raw point results into ``store`` incrementally.
+
+    Points at or before the store watermark (compared on
+    ``fecha_consultada``) were consolidated by a previous run and are
+    skipped.
+
+    Args:
+        batches: Point results in chronological order of
+            ``fecha_consultada`` (``data`` + ``hora_server_scraping``)
+        store: Destination (default: ``outputs/fact_eventos``)
+        transformer: ``SecDataTransformer`` (default: a new one)
+        max_gap: Snapshot time without news after which an event closes
+        part_size: Closed events buffered before writing a part file
+        finalize: Close every still-open event at the end
+
+    Returns:
+        dict: ``snapshots``, ``skipped``, ``closed`` and ``open`` counts
+    """
+    if transformer is None:
+        from core.tranformer import SecDataTransformer
+
+        transformer = SecDataTransformer()
+    store = store or EventStore()
+    consolidator = store.load_consolidator(max_gap)
+    resume_after = consolidator.watermark
+
+    stats = {"snapshots": 0, "skipped": 0, "closed": 0, "open": 0}
+    buffer: List[dict] = []
+    for batch in batches:
+        raw = batch.get("data") or []
+        if not raw:
+            continue
+        records = transformer.transform(
+            raw, server_time_raw=batch.get("hora_server_scraping")
+        )
+        if not records:
+            continue
+        # Tiempo del punto consultado, no la hora del servidor al scrapear
+        ts = point_time(batch) or records[0]["TIMESTAMP_SERVER"]
+        if resume_after and ts <= resume_after:
+            stats["skipped"] += 1
+            continue
+
+        buffer.extend(consolidator.add_snapshot(records, ts))
+        stats["snapshots"] += 1
+        if len(buffer) >= part_size:
+            store.append(buffer)
+            store.save_open(consolidator)
+            stats["closed"] += len(buffer)
+            buffer = []
+
+    if finalize:
+        buffer.extend(consolidator.flush())
+    store.append(buffer)
+    stats["closed"] += len(buffer)
+    store.save_open(consolidator)
+    stats["open"] = len(consolidator)
+
+    logger.info(
+        f"🧩 Eventos: {stats['snapshots']:,} snapshots -> {stats['closed']:,} "
+        f"cerrados, {stats['open']:,} abiertos"
+    )
+    return stats
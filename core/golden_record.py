@@ -0,0 +1,200 @@
+"""Incremental golden record (``golden_interrupciones``).
+
+The full rebuild pulls the whole 4-way join of ``fact_interrupciones``
+and deduplicates it in memory. ``GoldenRecordStore`` keeps the golden set
+as Parquet part files plus:
+
+- the high-water mark: the largest fact id already read, so a refresh only
+  reads fact rows inserted since;
+- the key set: the content key (``golden_key``) of every golden row as a
+  sorted int64 array, so new rows are deduplicated against the history
+  without loading it.
+
+The committed parts, key file and high-water mark live in one state file
+that is replaced atomically; anything not listed there is a leftover of
+an interrupted run and is ignored. ``compact`` merges small parts once
+there are too many.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = Path("outputs/golden")
+STATE_FILE = "_state.json"
+KEY_COLUMN = "golden_key"
+DEFAULT_MAX_PARTS = 32
+
+
+class GoldenRecordStore:
+    """Append-only Parquet golden set with a persisted key set.
+
+    Usage:
+        store = GoldenRecordStore()
+        df = read_fact_rows(after_id=store.high_water())
+        store.append(df.with_columns(golden_key=...), high_water=df["id"].max())
+        store.compact_if_needed()
+        store.export("outputs/golden_interrupciones.parquet")
+
+    Attributes:
+        root: Store directory
+        max_parts: Part files tolerated before ``compact_if_needed`` merges
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_parts: int = DEFAULT_MAX_PARTS):
+        """Initialize the store.
+
+        Args:
+            root: Store directory (created on first write)
+            max_parts: Part files tolerated before compaction
+        """
+        self.root = Path(root)
+        self.max_parts = max_parts
+        self._state = self._read_state()
+        self._keys: Optional[np.ndarray] = None
+
+    def _read_state(self) -> dict:
+        state_file = self.root / STATE_FILE
+        if not state_file.exists():
+            return {"parts": [], "keys": None, "high_water": None, "rows": 0}
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _commit(self, state: dict):
+        """Atomically publish a new state, then drop unreferenced files."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / (STATE_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        tmp.replace(self.root / STATE_FILE)
+        self._state = state
+
+        live = set(state["parts"]) | {state["keys"]}
+        for path in self.root.glob("part-*.parquet"):
+            if path.name not in live:
+                path.unlink()
+        for path in self.root.glob("keys-*.npy"):
+            if path.name not in live:
+                path.unlink()
+
+    def _next_name(self, prefix: str, suffix: str) -> str:
+        seq = self._state.get("seq", 0) + 1
+        self._state["seq"] = seq
+        return f"{prefix}-{seq:05d}{suffix}"
+
+    def high_water(self) -> Optional[int]:
+        """Largest fact id already in the golden set (None: never built)."""
+        return self._state["high_water"]
+
+    @property
+    def parts(self) -> List[Path]:
+        """Committed part files, oldest first."""
+        return [self.root / name for name in self._state["parts"]]
+
+    def __len__(self) -> int:
+        return self._state["rows"]
+
+    def keys(self) -> np.ndarray:
+        """Sorted content keys of every golden row."""
+        if self._keys is None:
+            name = self._state["keys"]
+            self._keys = (
+                np.load(self.root / name) if name else np.empty(0, dtype=np.int64)
+            )
+        return self._keys
+
+    def append(self, df: pl.DataFrame, high_water: Optional[int]) -> int:
+        """Add the rows of ``df`` whose ``golden_key`` is new.
+
+        Args:
+            df: New fact rows with a ``golden_key`` column, in fact-id order
+                (the first of each key wins, as in the full rebuild)
+            high_water: Largest fact id covered by ``df``
+
+        Returns:
+            int: Rows added to the golden set
+        """
+        keys = self.keys()
+        nuevos = df.filter(pl.col(KEY_COLUMN).is_not_null()).unique(
+            subset=[KEY_COLUMN], keep="first", maintain_order=True
+        )
+        candidatos = nuevos[KEY_COLUMN].to_numpy()
+        if keys.size:
+            pos = np.searchsorted(keys, candidatos).clip(max=keys.size - 1)
+            nuevos = nuevos.filter(pl.Series(keys[pos] != candidatos))
+
+        state = dict(self._state)
+        if high_water is not None:
+            state["high_water"] = max(high_water, state["high_water"] or high_water)
+        if nuevos.height == 0:
+            self._commit(state)
+            return 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        part = self._next_name("part", ".parquet")
+        nuevos.write_parquet(self.root / part)
+
+        merged = np.union1d(keys, nuevos[KEY_COLUMN].to_numpy())
+        keys_name = self._next_name("keys", ".npy")
+        np.save(self.root / keys_name, merged)
+
+        state.update(
+            seq=self._state["seq"],
+            parts=self._state["parts"] + [part],
+            keys=keys_name,
+            rows=self._state["rows"] + nuevos.height,
+        )
+        self._commit(state)
+        self._keys = merged
+        return nuevos.height
+
+    def reset(self):
+        """Forget the golden set (parts, keys and high-water mark).
+
+        A full rebuild starts from here so the store and the exported file
+        never disagree.
+        """
+        self._commit(
+            {
+                "parts": [],
+                "keys": None,
+                "high_water": None,
+                "rows": 0,
+                "seq": self._state.get("seq", 0),
+            }
+        )
+        self._keys = None
+
+    def scan(self) -> pl.LazyFrame:
+        """The whole golden set."""
+        return pl.scan_parquet(self.parts)
+
+    def compact(self):
+        """Merge every part into one file."""
+        if len(self._state["parts"]) <= 1:
+            return
+        part = self._next_name("part", ".parquet")
+        self.scan().sink_parquet(self.root / part)
+        self._commit(dict(self._state, parts=[part]))
+        logger.info(f"🗜️ Golden record compactado: {len(self):,} filas en {part}")
+
+    def compact_if_needed(self) -> bool:
+        """Compact when there are more than ``max_parts`` part files."""
+        if len(self._state["parts"]) <= self.max_parts:
+            return False
+        self.compact()
+        return True
+
+    def export(self, path) -> Path:
+        """Write the golden set as the single Parquet file analyses read."""
+        path = Path(path)
+        tmp = path.with_suffix(".tmp")
+        self.scan().drop(KEY_COLUMN).sink_parquet(tmp)
+        tmp.replace(path)
+        return path
@@ -0,0 +1,108 @@
+"""Compact 64-bit content key for ``fact_interrupciones``.
+
+``hash_id`` is the 32-char MD5 hex of the outage content
+(``SANTIAGO_ENEL_20231025_1430_500``). ``hash_key`` keeps the first 8 bytes
+of that same digest as a signed big-endian BIGINT, so it is derivable from
+existing rows without re-hashing:
+
+    Python:   hash_key(hash_id)
+    Postgres: hash_key_sql("hash_id")
+    Polars:   hash_key_expr(pl.col("hash_id"))
+
+Every derivation applies the same rule: a ``hash_id`` that is exactly 32
+lowercase hex chars is used as the digest; anything else (legacy or test
+ids) is MD5-hashed first.
+
+An 8-byte index entry instead of a 33-byte varchar makes the unique index
+several times smaller. 64 bits keep the collision odds for tens of
+millions of rows around one in a billion.
+"""
+
+import hashlib
+import re
+
+import polars as pl
+
+HASH_KEY_HEX_CHARS = 16
+MD5_HEX_PATTERN = "^[0-9a-f]{32}$"
+
+_MD5_HEX = re.compile(MD5_HEX_PATTERN)
+
+
+def hash_key_from_digest(digest: bytes) -> int:
+    """Signed 64-bit key from a raw MD5 digest."""
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def is_md5_hex(hash_id: str) -> bool:
+    """Whether ``hash_id`` is used as a digest as-is (32 lowercase hex chars)."""
+    return _MD5_HEX.match(hash_id) is not None
+
+
+def hash_key(hash_id: str) -> int:
+    """Signed 64-bit key of a ``hash_id`` (MD5-hashed first unless MD5 hex)."""
+    if is_md5_hex(hash_id):
+        return hash_key_from_digest(bytes.fromhex(hash_id[:HASH_KEY_HEX_CHARS]))
+    return content_hash(hash_id)[1]
+
+
+def content_hash(unique_str: str) -> tuple:
+    """``(hash_id, hash_key)`` for one content string."""
+    digest = hashlib.md5(unique_str.encode()).digest()
+    return digest.hex(), hash_key_from_digest(digest)
+
+
+def hash_key_sql(column: str = "hash_id") -> str:
+    """Postgres expression computing ``hash_key`` from a text column."""
+    return (
+        f"CASE WHEN {column} ~ '{MD5_HEX_PATTERN}' "
+        f"THEN ('x' || left({column}, 16))::bit(64)::bigint "
+        f"ELSE ('x' || left(md5({column}), 16))::bit(64)::bigint END"
+    )
+
+
+def hash_key_expr(hash_id: pl.Expr) -> pl.Expr:
+    """Polars-native ``hash_key`` from a column of ``hash_id`` values.
+
+    ``str.to_integer`` tops out at Int64, so the 16 hex chars are parsed as
+    two 32-bit halves, combined as UInt64 and reinterpreted as signed.
+    Values that are not MD5 hex go through ``content_key_expr`` (hashlib),
+    so only those rows pay for Python hashing.
+    """
+    is_md5 = hash_id.str.contains(MD5_HEX_PATTERN)
+    hi = hash_id.str.slice(0, 8).str.to_integer(base=16, strict=False)
+    lo = hash_id.str.slice(8, 8).str.to_integer(base=16, strict=False)
+    fast = (hi.cast(pl.UInt64) * (1 << 32) + lo.cast(pl.UInt64)).reinterpret(
+        signed=True
+    )
+    return (
+        pl.when(is_md5)
+        .then(fast)
+        .otherwise(content_key_expr(pl.when(~is_md5).then(hash_id)))
+    )
+
+
+def record_hash_key(record: dict) -> int:
+    """``hash_key`` of a transformed record.
+
+    Uses ``HASH_KEY`` when the transformer set it; otherwise derives it from
+    ``ID_UNICO``.
+    """
+    key = record.get("HASH_KEY")
+    if key is not None:
+        return key
+    return hash_key(str(record.get("ID_UNICO")))
+
+
+def content_key_expr(content: pl.Expr) -> pl.Expr:
+    """``hash_key`` of a column of content strings (MD5 computed in Python).
+
+    Polars has no MD5 expression, so this runs ``hashlib`` once per row:
+    meant for incremental batches, not for re-keying the whole history.
+    """
+    return content.map_batches(
+        lambda s: pl.Series(
+            [None if v is None else content_hash(v)[1] for v in s], dtype=pl.Int64
+        ),
+        return_dtype=pl.Int64,
+    )
@@ -3,17 +3,22 @@
 Optimized version with Parallel Processing and Progress Bars (tqdm).
 """
 
+import io
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+import polars as pl
 from tqdm import tqdm
 
 from core.postgres_repository import PostgreSQLRepository
+from core.raw_archive import ARCHIVE_INDEX, RawArchive
+from core.scrape_sinks import MANIFEST_NAME, iter_dataset
 from core.tranformer import SecDataTransformer
+from core.transform_pool import TransformPool, ipc_to_records
 
 logger = logging.getLogger(__name__)
 
@@ -31,21 +36,29 @@ class HistoricalETLOrchestrator:
         transformer: Optional[SecDataTransformer] = None,
         max_workers: int = 4,
         batch_size: int = 5000,
+        transform_processes: int = 0,
     ):
         """Initialize the data loader.
 
         Args:
-            json_file: Path to JSON file
+            json_file: Path to the legacy JSON file, to a partitioned
+                NDJSON dataset directory written by the async scraper, or
+                to a raw response archive (``outputs/bronze``)
             repository: PostgreSQL repository
             transformer: Data transformer
             max_workers: Number of parallel threads
             batch_size: Size of each DB insert batch
+            transform_processes: Run the transform in this many worker
+                processes (``TransformPool``) and keep only the DB writes
+                in the ``max_workers`` threads (0: transform in threads).
+                Worker processes use a default ``SecDataTransformer``
         """
         self.json_file = Path(json_file)
         self.repository = repository or PostgreSQLRepository()
         self.transformer = transformer or SecDataTransformer()
         self.max_workers = max_workers
         self.batch_size = batch_size
+        self.transform_processes = transform_processes
 
         self.stats = {
             "total_inserted": 0,
@@ -66,6 +79,57 @@ class HistoricalETLOrchestrator:
             data = json.load(f)
         return data
 
+    def _iter_work_units(
+        self, start_year: Optional[int], end_year: Optional[int]
+    ) -> Iterator[Tuple[list, Any]]:
+        """Yield (raw_data, hora_server) for every point with records."""
+        if (self.json_file / ARCHIVE_INDEX).exists():
+            batches = self._iter_archive_batches(start_year, end_year)
+        elif self.json_file.is_dir():
+            batches = iter_dataset(self.json_file, start_year, end_year)
+        else:
+            batches = self._iter_json_batches(start_year, end_year)
+
+        for batch in batches:
+            raw = batch.get("data", [])
+            if raw:
+                yield raw, batch.get("hora_server_scraping")
+
+    def _iter_json_batches(
+        self, start_year: Optional[int], end_year: Optional[int]
+    ) -> Iterator[dict]:
+        data = self.load_json()
+        for year_str, year_info in data.get("data_by_year", {}).items():
+            yr = int(year_str)
+            if start_year and yr < start_year:
+                continue
+            if end_year and yr > end_year:
+                continue
+            yield from year_info.get("data", [])
+
+    def _iter_archive_batches(
+        self, start_year: Optional[int], end_year: Optional[int]
+    ) -> Iterator[dict]:
+        # Re-transforma el histórico desde bronze sin volver a scrapear
+        with RawArchive(self.json_file) as archive:
+            yield from archive.iter_results(start_year, end_year)
+
+    def _expected_units(
+        self, start_year: Optional[int], end_year: Optional[int]
+    ) -> Optional[int]:
+        """Successful points per the dataset manifest (progress bar total)."""
+        manifest_file = self.json_file / MANIFEST_NAME
+        if not manifest_file.exists():
+            return None
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            years = json.load(f).get("years", {})
+        return sum(
+            meta.get("successful", 0)
+            for year_str, meta in years.items()
+            if not (start_year and int(year_str) < start_year)
+            and not (end_year and int(year_str) > end_year)
+        )
+
     def _process_chunk_worker(self, raw_data: list, hora_server: str):
         """Worker function to transform and save a chunk of data."""
         try:
@@ -83,6 +147,75 @@ class HistoricalETLOrchestrator:
             logger.error(f"❌ Worker error: {e}")
             return 0
 
+    def _save_transformed(self, future) -> int:
+        """Writer thread: decode one IPC batch from the pool and save it."""
+        try:
+            payload = future.result()
+            if hasattr(self.repository, "save_frame"):
+                frame = pl.read_ipc(io.BytesIO(payload))
+                if frame.height == 0:
+                    return 0
+                result = self.repository.save_frame(frame)
+            else:
+                records = ipc_to_records(payload)
+                if not records:
+                    return 0
+                result = self.repository.save_records(records)
+            return result["insertados"]
+        except Exception as e:
+            logger.error(f"❌ Worker error: {e}")
+            return 0
+
+    def _run_threaded(self, work_units, pbar):
+        """Transform and save every batch in the thread pool."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Ventana acotada de futures: la memoria no crece con el dataset
+            max_pending = self.max_workers * 4
+            pending = set()
+
+            for chunk, server_time in work_units:
+                pending.add(
+                    executor.submit(self._process_chunk_worker, chunk, server_time)
+                )
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._collect(done, pbar)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                self._collect(done, pbar)
+
+    def _run_process_pool(self, work_units, pbar):
+        """Transform in worker processes, save from the writer threads."""
+        with TransformPool(self.transform_processes) as pool, ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as writers:
+            max_transforms = self.transform_processes * 4
+            max_writes = self.max_workers * 4
+            transforms, writes = set(), set()
+
+            def dispatch(done):
+                nonlocal writes
+                for future in done:
+                    writes.add(writers.submit(self._save_transformed, future))
+                if len(writes) >= max_writes:
+                    finished, writes = wait(writes, return_when=FIRST_COMPLETED)
+                    self._collect(finished, pbar)
+
+            for chunk, server_time in work_units:
+                transforms.add(pool.submit(chunk, server_time))
+                if len(transforms) >= max_transforms:
+                    done, transforms = wait(transforms, return_when=FIRST_COMPLETED)
+                    dispatch(done)
+
+            while transforms:
+                done, transforms = wait(transforms, return_when=FIRST_COMPLETED)
+                dispatch(done)
+
+            while writes:
+                finished, writes = wait(writes, return_when=FIRST_COMPLETED)
+                self._collect(finished, pbar)
+
     def load_all(
         self, start_year: Optional[int] = None, end_year: Optional[int] = None
     ):
@@ -93,29 +226,25 @@ class HistoricalETLOrchestrator:
 
         # Initial state
         initial_count = self.repository.get_record_count()
-        data = self.load_json()
-
-        # Calculate total records for progress bar
-        total_batches_all = 0
-        all_work_units = []  # List of (data_chunk, hora_server)
 
-        for year_str, year_info in data.get("data_by_year", {}).items():
-            yr = int(year_str)
-            if start_year and yr < start_year:
-                continue
-            if end_year and yr > end_year:
-                continue
-
-            year_batches = year_info.get("data", [])
-            for batch in year_batches:
-                raw = batch.get("data", [])
-                if raw:
-                    all_work_units.append((raw, batch.get("hora_server_scraping")))
-                    total_batches_all += 1
+        if self.json_file.is_dir():
+            # Dataset particionado: se procesa en streaming, sin cargarlo entero
+            total_batches_all = self._expected_units(start_year, end_year)
+            work_units = self._iter_work_units(start_year, end_year)
+        else:
+            all_work_units = list(self._iter_work_units(start_year, end_year))
+            total_batches_all = len(all_work_units)
+            work_units = iter(all_work_units)
 
         self.stats["start_time"] = datetime.now()
 
-        print(f"🚀 Starting parallel ETL with {self.max_workers} workers...")
+        if self.transform_processes > 0:
+            print(
+                f"🚀 Starting parallel ETL with {self.transform_processes} transform "
+                f"processes and {self.max_workers} writer threads..."
+            )
+        else:
+            print(f"🚀 Starting parallel ETL with {self.max_workers} workers...")
 
         # Global Progress Bar
         with tqdm(
@@ -124,29 +253,25 @@ class HistoricalETLOrchestrator:
             unit="batch",
             colour="green",
         ) as pbar:
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = {
-                    executor.submit(self._process_chunk_worker, chunk, server_time): i
-                    for i, (chunk, server_time) in enumerate(all_work_units)
-                }
-
-                for future in as_completed(futures):
-                    inserted = future.result()
-                    self.stats["total_inserted"] += inserted
-                    pbar.update(1)
-                    # Update description with speed
-                    if self.stats["total_inserted"] > 0:
-                        elapsed = (
-                            datetime.now() - self.stats["start_time"]
-                        ).total_seconds()
-                        rps = (
-                            self.stats["total_inserted"] / elapsed if elapsed > 0 else 0
-                        )
-                        pbar.set_postfix({"RPS": f"{rps:.0f}"})
+            if self.transform_processes > 0:
+                self._run_process_pool(work_units, pbar)
+            else:
+                self._run_threaded(work_units, pbar)
 
         self.stats["end_time"] = datetime.now()
         self._print_summary(initial_count)
 
+    def _collect(self, futures, pbar):
+        for future in futures:
+            inserted = future.result()
+            self.stats["total_inserted"] += inserted
+            pbar.update(1)
+            # Update description with speed
+            if self.stats["total_inserted"] > 0:
+                elapsed = (datetime.now() - self.stats["start_time"]).total_seconds()
+                rps = self.stats["total_inserted"] / elapsed if elapsed > 0 else 0
+                pbar.set_postfix({"RPS": f"{rps:.0f}"})
+
     def _print_summary(self, initial_count: int):
         final_count = self.repository.get_record_count()
         final_size = self.repository.get_database_size()
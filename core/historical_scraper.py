@@ -7,75 +7,64 @@ custom date/time ranges with automatic retry on failures.
 import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-import random
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 import time
 import pytz
 
+from core.browser_pool import BrowserPool
 from core.retry_handler import retry_with_backoff
+from core.scrape_journal import ScrapeJournal
+from core.session_store import SessionStore
+from core.sec_fetch import (  # noqa: F401 - re-exportados por compatibilidad
+    EXTRA_HEADERS,
+    FETCH_SEC_DATA_SCRIPT,
+    USER_AGENTS,
+)
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
 
-FETCH_SEC_DATA_SCRIPT = """
-                    async (payload) => {
-                        try {
-                            const response = await fetch('https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetPorFecha', {
-                                method: 'POST',
-                                headers: {
-                                    'Content-Type': 'application/json; charset=utf-8'
-                                },
-                                body: JSON.stringify(payload)
-                            });
-                            
-                            if (!response.ok) {
-                                return { error: `HTTP ${response.status}`, data: null };
-                            }
-                            
-                            const data = await response.json();
-                            
-                            // Intentar obtener hora del servidor también
-                            const timeResponse = await fetch('https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetHoraServer', {
-                                method: 'POST',
-                                headers: {
-                                    'Content-Type': 'application/json; charset=utf-8'
-                                }
-                            });
-                            
-                            let horaServer = null;
-                            if (timeResponse.ok) {
-                                horaServer = await timeResponse.json();
-                            }
-                            
-                            return { data: data, horaServer: horaServer, error: null };
-                        } catch (e) {
-                            return { error: e.toString(), data: null };
-                        }
-                    }
-                """
-USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
-]
-EXTRA_HEADERS = {
-    "Accept-Language": "es-CL,es;q=0.9,en;q=0.8",
-    "Referer": "https://www.sec.cl/",
-    "sec-ch-ua-platform": '"Windows"',
-    "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-}
+class SECHistoricalScraper:
+    """Scraper for historical SEC data with configurable date ranges.
 
+    Fetches are served by a ``BrowserPool`` of warmed contexts, so the
+    browser start-up and warm-up sleeps are paid once per context instead
+    of once per (year, month, day, hour) point.
+    """
 
-class SECHistoricalScraper:
-    """Scraper for historical SEC data with configurable date ranges."""
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        journal: Optional[ScrapeJournal] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """Initialize the historical scraper.
 
-    def __init__(self):
-        """Initialize the historical scraper."""
+        Args:
+            pool: Browser pool to fetch from (default: a private 1-context pool)
+            journal: Journal of completed points; ``scrape_date_range`` skips
+                points it already holds and records new ones
+            session_store: On-disk session state for the private pool
+                (default: ``SessionStore.from_env()``)
+        """
         self.registros = []
         self.hora_server = None
         self.chile_tz = pytz.timezone("America/Santiago")
+        self._owns_pool = pool is None
+        self.pool = pool or BrowserPool(size=1, session_store=session_store)
+        self.journal = journal
+
+    def close(self):
+        """Close the browser pool if this scraper created it."""
+        if self._owns_pool:
+            self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     @retry_with_backoff(
         max_attempts=5,
@@ -95,7 +84,7 @@ class SECHistoricalScraper:
             hour: Hour (0-23)
 
         Returns:
-            dict: Dictionary with 'data' and 'hora_server'
+            dict: Dictionary with 'data', 'hora_server' and 'fecha_consultada'
 
         Raises:
             Exception: If scraping fails after all retries
@@ -106,73 +95,30 @@ class SECHistoricalScraper:
         logger.info(f"🔍 Scraping: {year}-{month:02d}-{day:02d} {hour:02d}:00")
 
         try:
-            with sync_playwright() as p:
-                # User agents para rotar
-                user_agents = USER_AGENTS
-                ua = random.choice(user_agents)
-
-                logger.info("  🌐 Lanzando navegador...")
-                browser = p.chromium.launch(headless=True)
-                context = browser.new_context(
-                    user_agent=ua,
-                    viewport={"width": 1920, "height": 1080},
-                    locale="es-CL",
-                    timezone_id="America/Santiago",
-                )
-                page = context.new_page()
-
-                # Headers adicionales
-                page.set_extra_http_headers(EXTRA_HEADERS)
-
-                logger.info("  🔗 Conectando a SEC...")
-
-                # Ir a la home primero
-                page.goto(
-                    "https://www.sec.cl/", wait_until="domcontentloaded", timeout=60000
-                )
-                logger.info("  ✓ Home cargada")
-                time.sleep(2)
-
-                # Luego a la aplicación
-                logger.info("  🔗 Accediendo a app de interrupciones...")
-                page.goto(
-                    "https://apps.sec.cl/INTONLINEv1/index.aspx",
-                    wait_until="commit",
-                    timeout=90000,
-                )
-                logger.info("  ✓ App cargada")
-                time.sleep(10)
-
-                # Payload con fecha histórica
-                payload = {"anho": year, "mes": month, "dia": day, "hora": hour}
-
-                logger.info(f"  📡 Ejecutando fetch API con payload: {payload}")
-
-                # Fetch directo a la API
-                result = page.evaluate(
-                    FETCH_SEC_DATA_SCRIPT,
-                    payload,
-                )
-
-                browser.close()
-                logger.info("  🔒 Navegador cerrado")
-
-                # Procesar resultado
-                if result.get("error"):
-                    logger.error(f"  ❌ Error en fetch: {result['error']}")
-                    raise Exception(f"Error en fetch API: {result['error']}")
-                elif result.get("data") is not None:
-                    self.registros = result["data"]
-                    self.hora_server = result.get("horaServer")
-                    logger.info(f"  ✅ Capturados {len(self.registros)} registros")
-                else:
-                    logger.warning("  ⚠️ No se detectaron datos")
-
-                return {
-                    "data": self.registros,
-                    "hora_server": self.hora_server,
-                    "fecha_consultada": f"{year}-{month:02d}-{day:02d} {hour:02d}:00",
-                }
+            # Payload con fecha histórica
+            payload = {"anho": year, "mes": month, "dia": day, "hora": hour}
+
+            logger.info(f"  📡 Ejecutando fetch API con payload: {payload}")
+
+            # Fetch directo a la API desde un contexto ya calentado
+            result = self.pool.fetch(payload)
+
+            # Procesar resultado
+            if result.get("error"):
+                logger.error(f"  ❌ Error en fetch: {result['error']}")
+                raise Exception(f"Error en fetch API: {result['error']}")
+            elif result.get("data") is not None:
+                self.registros = result["data"]
+                self.hora_server = result.get("horaServer")
+                logger.info(f"  ✅ Capturados {len(self.registros)} registros")
+            else:
+                logger.warning("  ⚠️ No se detectaron datos")
+
+            return {
+                "data": self.registros,
+                "hora_server": self.hora_server,
+                "fecha_consultada": f"{year}-{month:02d}-{day:02d} {hour:02d}:00",
+            }
 
         except PlaywrightTimeoutError as e:
             logger.error(f"  ❌ Timeout: {str(e)}")
@@ -199,10 +145,8 @@ class SECHistoricalScraper:
 
         total_points = 0
         while current <= end_date:
-            for hour in range(0, 24, hour_interval):
-                if current > end_date:
-                    break
-                total_points += 1
+            total_points += len(range(0, 24, hour_interval))
+            current += timedelta(days=1)
 
         logger.info(f"📅 Rango: {start_date.date()} a {end_date.date()}")
         logger.info(f"📊 Total de puntos a scrapear: {total_points}")
@@ -226,6 +170,13 @@ class SECHistoricalScraper:
                 logger.info(f"📅 Fecha: {current.date()} {hour:02d}:00")
                 logger.info(f"{'=' * 60}")
 
+                point = (current.year, current.month, current.day, hour)
+                if self.journal is not None and self.journal.is_done(point):
+                    results.append(self.journal.load(point))
+                    successful += 1
+                    logger.info(f"♻️ Punto {point_num} ya completado en el journal")
+                    continue
+
                 try:
                     result = self.scrape_datetime(
                         year=current.year,
@@ -233,6 +184,8 @@ class SECHistoricalScraper:
                         day=current.day,
                         hour=hour,
                     )
+                    if self.journal is not None:
+                        self.journal.record(point, result)
                     results.append(result)
                     successful += 1
                     logger.info(
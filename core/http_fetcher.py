@@ -0,0 +1,135 @@
+"""Browserless HTTP client for the SEC historical API.
+
+Once Playwright has passed the sec.cl front page, its cookies and headers
+are enough to call ``GetPorFecha`` directly. This module replays them over
+a keep-alive ``httpx`` connection pool, so each point costs a few KB
+instead of a Chromium page. When SEC answers with a challenge again,
+``ChallengeDetected`` tells the caller to go back to the browser.
+"""
+
+import logging
+from typing import List, Optional
+
+import httpx
+
+from config import URL_SEC_API_BASE, URL_SEC_APP
+from core.sec_fetch import EXTRA_HEADERS
+
+logger = logging.getLogger(__name__)
+
+# Marcadores de las páginas de desafío de Cloudflare
+CHALLENGE_MARKERS = ("just a moment", "cf-chl", "challenge-platform", "captcha")
+
+
+class ChallengeDetected(Exception):
+    """SEC answered with an anti-bot challenge instead of JSON."""
+
+
+class SECHttpSession:
+    """Keep-alive HTTP session reusing cookies exported from Playwright.
+
+    Usage:
+        http = await SECHttpSession.from_page(page)
+        data = await http.fetch_por_fecha({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+        await http.close()
+    """
+
+    def __init__(
+        self,
+        cookies: List[dict],
+        user_agent: str,
+        base_url: str = URL_SEC_API_BASE,
+        max_connections: int = 20,
+        timeout: float = 30.0,
+    ):
+        """Initialize the connection pool.
+
+        Args:
+            cookies: Cookies as returned by ``BrowserContext.cookies()``
+            user_agent: User agent of the browser that obtained the cookies
+            base_url: Base URL of the ClientesAfectados endpoints
+            max_connections: Keep-alive connections kept open
+            timeout: Seconds before a request is abandoned
+        """
+        jar = httpx.Cookies()
+        for cookie in cookies:
+            jar.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+
+        headers = {
+            **EXTRA_HEADERS,
+            "User-Agent": user_agent,
+            "Content-Type": "application/json; charset=utf-8",
+            "Accept": "application/json, text/javascript, */*; q=0.01",
+            "Origin": "https://apps.sec.cl",
+            "Referer": URL_SEC_APP,
+        }
+
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(
+            cookies=jar,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    @classmethod
+    async def from_page(cls, page, **kwargs) -> "SECHttpSession":
+        """Build a session from a warmed Playwright (async) page.
+
+        Args:
+            page: Page that already passed the sec.cl front page
+            **kwargs: Extra arguments for ``SECHttpSession``
+
+        Returns:
+            SECHttpSession: Session carrying the page's cookies and user agent
+        """
+        cookies = await page.context.cookies()
+        user_agent = await page.evaluate("() => navigator.userAgent")
+        logger.info(f"🍪 Sesión HTTP con {len(cookies)} cookies exportadas")
+        return cls(cookies, user_agent, **kwargs)
+
+    async def _post(self, endpoint: str, payload: Optional[dict] = None):
+        response = await self.client.post(
+            f"{self.base_url}/{endpoint}",
+            json=payload,
+        )
+
+        content_type = response.headers.get("content-type", "")
+        if "json" not in content_type:
+            body = response.text[:2000].lower()
+            if (
+                response.status_code in (403, 503)
+                or response.headers.get("cf-mitigated") == "challenge"
+                or any(marker in body for marker in CHALLENGE_MARKERS)
+            ):
+                raise ChallengeDetected(
+                    f"{endpoint}: desafío detectado (HTTP {response.status_code})"
+                )
+
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_por_fecha(self, payload: dict) -> list:
+        """POST a ``{anho, mes, dia, hora}`` payload to ``GetPorFecha``.
+
+        Raises:
+            ChallengeDetected: If SEC answered with a challenge page
+            httpx.HTTPError: On any other transport or HTTP error
+        """
+        return await self._post("GetPorFecha", payload)
+
+    async def fetch_hora_server(self) -> list:
+        """POST to ``GetHoraServer`` and return the raw response."""
+        return await self._post("GetHoraServer")
+
+    async def close(self):
+        """Close every pooled connection."""
+        await self.client.aclose()
@@ -0,0 +1,99 @@
+"""In-memory set of the ``hash_key``s already in ``fact_interrupciones``.
+
+Re-running the ETL (or the near-real-time loop) sends mostly rows that
+already exist; each one still costs Postgres an index probe and a
+discarded insert under ``ON CONFLICT DO NOTHING``. ``KnownKeys`` lets the
+repositories drop those rows before they go on the wire.
+
+Keys are the 64-bit ``hash_key`` (``core.hash_key``) kept as a sorted
+``int64`` array: 8 bytes per row and vectorized ``searchsorted`` lookups,
+with no false positives beyond the key's own collision odds. Keys added
+after seeding go to a small sorted side array that is merged into the
+main one once it grows.
+"""
+
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+DEFAULT_MERGE_EVERY = 1 << 16
+
+
+def _contains(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Membership mask of ``keys`` in a sorted array."""
+    if sorted_keys.size == 0:
+        return np.zeros(keys.shape, dtype=bool)
+    pos = np.searchsorted(sorted_keys, keys).clip(max=sorted_keys.size - 1)
+    return sorted_keys[pos] == keys
+
+
+class KnownKeys:
+    """Thread-safe membership set of 64-bit keys.
+
+    Usage:
+        known = KnownKeys.from_chunks(chunks_read_from_db)
+        mask = known.new_mask(keys)    # True: unknown, first in batch
+        ...insert rows[mask]...
+        known.add(keys[mask])          # only once the insert committed
+    """
+
+    def __init__(
+        self,
+        keys: Optional[Iterable[int]] = None,
+        merge_every: int = DEFAULT_MERGE_EVERY,
+    ):
+        """Initialize the set.
+
+        Args:
+            keys: Initial keys (any order, duplicates allowed)
+            merge_every: Size of the side array that triggers a merge
+        """
+        base = np.empty(0, dtype=np.int64) if keys is None else np.asarray(keys)
+        self._base = np.unique(base.astype(np.int64, copy=False))
+        self._recent = np.empty(0, dtype=np.int64)
+        self.merge_every = merge_every
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray], **kwargs) -> "KnownKeys":
+        """Build the set from key arrays streamed out of the database."""
+        chunks = list(chunks)
+        keys = np.concatenate(chunks) if chunks else None
+        return cls(keys, **kwargs)
+
+    def __len__(self) -> int:
+        return self._base.size + self._recent.size
+
+    def __contains__(self, key: int) -> bool:
+        keys = np.array([key], dtype=np.int64)
+        with self._lock:
+            return bool(_contains(self._base, keys)[0] or _contains(self._recent, keys)[0])
+
+    @property
+    def nbytes(self) -> int:
+        return self._base.nbytes + self._recent.nbytes
+
+    def new_mask(self, keys: Iterable[int]) -> np.ndarray:
+        """Mask of the keys worth sending to the database.
+
+        True for keys that are not known and appear for the first time in
+        ``keys`` (repeats inside one batch would hit the same conflict).
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        with self._lock:
+            known = _contains(self._base, keys) | _contains(self._recent, keys)
+        first = np.zeros(keys.shape, dtype=bool)
+        first[np.unique(keys, return_index=True)[1]] = True
+        return first & ~known
+
+    def add(self, keys: Iterable[int]):
+        """Record keys that are now in the database."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if keys.size == 0:
+            return
+        with self._lock:
+            self._recent = np.union1d(self._recent, keys)
+            if self._recent.size > max(self.merge_every, self._base.size >> 4):
+                self._base = np.union1d(self._base, self._recent)
+                self._recent = np.empty(0, dtype=np.int64)
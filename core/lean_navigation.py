@@ -0,0 +1,139 @@
+"""Lean navigation profile for Playwright sessions against sec.cl.
+
+Warming a session used to load the full sec.cl homepage and then sleep a
+fixed number of seconds after the INTONLINE app loaded. The lean profile:
+
+- aborts images, fonts, stylesheets, media and analytics requests;
+- treats the app's own ``GetHoraServer`` call as the readiness signal,
+  with a DOM readiness probe as fallback, instead of fixed sleeps;
+- skips the homepage hop when the context already holds a valid sec.cl
+  session (e.g. cookies seeded from another warm context).
+"""
+
+import logging
+import time
+from typing import Iterable, Optional
+
+# El mismo TimeoutError sirve para la API sync y la async
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from config import URL_SEC_APP, URL_SEC_HOME
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+ANALYTICS_MARKERS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "analytics.google.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "clarity.ms",
+)
+SEC_COOKIE_DOMAIN = "sec.cl"
+
+# Milisegundos máximos esperando la señal de que la app está lista
+READY_TIMEOUT_MS = 20000
+
+
+def should_block(resource_type: str, url: str) -> bool:
+    """Whether a request is dead weight for fetching SEC data."""
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    return any(marker in url for marker in ANALYTICS_MARKERS)
+
+
+def has_valid_session(cookies: Iterable[dict], now: Optional[float] = None) -> bool:
+    """Whether ``cookies`` hold an unexpired sec.cl cookie.
+
+    Args:
+        cookies: Cookies as returned by ``BrowserContext.cookies()``
+        now: Current UNIX time (default: ``time.time()``)
+    """
+    now = time.time() if now is None else now
+    for cookie in cookies:
+        if not str(cookie.get("domain", "")).endswith(SEC_COOKIE_DOMAIN):
+            continue
+        expires = cookie.get("expires", -1)
+        if expires is None or expires < 0 or expires > now:
+            return True
+    return False
+
+
+def is_hora_server_response(response) -> bool:
+    """Readiness signal: the app asked for the server time."""
+    return "GetHoraServer" in response.url
+
+
+def is_por_fecha_response(response) -> bool:
+    """A ``GetPorFecha`` response (the outage data itself)."""
+    return "GetPorFecha" in response.url
+
+
+def _route_handler(route):
+    if should_block(route.request.resource_type, route.request.url):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _route_handler_async(route):
+    if should_block(route.request.resource_type, route.request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def apply_lean_profile(context):
+    """Block heavy and analytics requests on a sync ``BrowserContext``."""
+    context.route("**/*", _route_handler)
+
+
+async def apply_lean_profile_async(context):
+    """Block heavy and analytics requests on an async ``BrowserContext``."""
+    await context.route("**/*", _route_handler_async)
+
+
+def warm_page(page, skip_home: bool = False, ready_timeout: int = READY_TIMEOUT_MS):
+    """Park a sync page on the INTONLINE app without fixed sleeps.
+
+    Args:
+        page: Page of a context with the lean profile applied
+        skip_home: Go straight to the app (the context already has a session)
+        ready_timeout: Milliseconds to wait for the app's readiness signal
+
+    Returns:
+        bool: True if ``GetHoraServer`` was seen, False if the DOM probe
+            was used instead
+    """
+    if not skip_home:
+        page.goto(URL_SEC_HOME, wait_until="domcontentloaded", timeout=60000)
+
+    try:
+        with page.expect_response(is_hora_server_response, timeout=ready_timeout):
+            page.goto(URL_SEC_APP, wait_until="commit", timeout=90000)
+        return True
+    except PlaywrightTimeoutError:
+        logger.debug("GetHoraServer no llegó, usando sonda DOM")
+        page.wait_for_load_state("domcontentloaded", timeout=ready_timeout)
+        return False
+
+
+async def warm_page_async(
+    page, skip_home: bool = False, ready_timeout: int = READY_TIMEOUT_MS
+):
+    """Async version of ``warm_page``."""
+    if not skip_home:
+        await page.goto(URL_SEC_HOME, wait_until="domcontentloaded", timeout=60000)
+
+    try:
+        async with page.expect_response(
+            is_hora_server_response, timeout=ready_timeout
+        ):
+            await page.goto(URL_SEC_APP, wait_until="commit", timeout=90000)
+        return True
+    except PlaywrightTimeoutError:
+        logger.debug("GetHoraServer no llegó, usando sonda DOM")
+        await page.wait_for_load_state("domcontentloaded", timeout=ready_timeout)
+        return False
@@ -0,0 +1,89 @@
+"""Process-wide interning cache for region/comuna/empresa names.
+
+Only a few hundred distinct comunas and a few dozen companies exist, but
+every batch used to run Unicode NFD + ASCII folding on every row. The
+cache normalizes each distinct raw string once and gives every normalized
+value a small integer code, stable for the life of the process (codes are
+assigned in first-seen order).
+
+Normalization happens in the transformer. The repositories store the
+names they are given unchanged, so callers that pass raw names (scripts,
+backfills) never get renamed dimension rows behind their back.
+"""
+
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Uppercase, strip and drop accents (``"Ñuñoa "`` -> ``"NUNOA"``)."""
+    text_nfd = unicodedata.normalize("NFD", text)
+    text_ascii = text_nfd.encode("ASCII", "ignore").decode("ASCII")
+    return text_ascii.upper().strip()
+
+
+class NormalizationCache:
+    """Raw string -> (normalized string, integer code), computed once.
+
+    Usage:
+        NORMALIZER.normalize("Región del Biobío")  # "REGION DEL BIOBIO"
+        NORMALIZER.code("Biobío") == NORMALIZER.code("BIOBIO ")
+        NORMALIZER.value(code)
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._by_raw: Dict[str, Tuple[str, int]] = {}
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, raw) -> Tuple[str, int]:
+        """Return ``(normalized, code)`` for ``raw`` (``str()``-ed first)."""
+        key = raw if isinstance(raw, str) else str(raw)
+        hit = self._by_raw.get(key)
+        if hit is not None:
+            return hit
+
+        normalized = normalize_text(key)
+        with self._lock:
+            code = self._codes.get(normalized)
+            if code is None:
+                code = len(self._values)
+                self._codes[normalized] = code
+                self._values.append(normalized)
+            entry = (normalized, code)
+            self._by_raw[key] = entry
+            # El valor normalizado también es una clave válida
+            self._by_raw.setdefault(normalized, entry)
+        return entry
+
+    def normalize(self, raw) -> str:
+        """Normalized form of ``raw``."""
+        return self.intern(raw)[0]
+
+    def code(self, raw) -> int:
+        """Integer code of ``raw``'s normalized form."""
+        return self.intern(raw)[1]
+
+    def value(self, code: int) -> str:
+        """Normalized string behind ``code``."""
+        return self._values[code]
+
+    def encode(self, values: Iterable) -> List[int]:
+        """Codes for a whole column of raw values."""
+        intern = self.intern
+        return [intern(v)[1] for v in values]
+
+    def decode(self, codes: Iterable[int]) -> List[str]:
+        """Normalized strings for a whole column of codes."""
+        values = self._values
+        return [values[c] for c in codes]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Caché compartida por todo el proceso
+NORMALIZER = NormalizationCache()
@@ -6,22 +6,53 @@ using star schema (fact table + dimension tables). Optimized for high performanc
 
 import logging
 import os
-from typing import List, Dict, Any, Optional
-from datetime import date, datetime
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
+import numpy as np
 import psycopg2
 from psycopg2.extras import execute_values
+import polars as pl
 from dotenv import load_dotenv
 
+from core.hash_key import hash_key_sql, record_hash_key
+from core.known_keys import KnownKeys
+
 logger = logging.getLogger(__name__)
 
 
 class PostgreSQLRepository:
     """Repository for PostgreSQL with star schema. Optimized version."""
 
-    def __init__(self):
-        """Initialize PostgreSQL connection from environment variables."""
+    def __init__(
+        self, compact_keys: Optional[bool] = None, known_keys: Optional[bool] = None
+    ):
+        """Initialize PostgreSQL connection from environment variables.
+
+        Args:
+            compact_keys: Deduplicate on the 64-bit ``hash_key`` column
+                instead of ``hash_id``. Defaults to the ``DB_COMPACT_KEYS``
+                environment variable, which must match the table:
+                ``db/migrations/001_compact_hash_key.sql`` makes ``hash_key``
+                the unique key and drops the ``hash_id`` unique constraint
+                (one unique index per insert), so after it every writer
+                needs compact mode and before it none can use it.
+            known_keys: Drop rows whose key is already in the table before
+                inserting them (``core.known_keys``); the key set is read
+                from the database on the first write. Defaults to the
+                ``DB_KNOWN_KEYS`` environment variable (on unless ``0``).
+        """
         load_dotenv()
 
+        if compact_keys is None:
+            compact_keys = os.getenv("DB_COMPACT_KEYS", "").lower() in ("1", "true")
+        self.compact_keys = compact_keys
+        if known_keys is None:
+            known_keys = os.getenv("DB_KNOWN_KEYS", "1").lower() not in ("0", "false")
+        self.use_known_keys = known_keys
+        self.known_keys: Optional[KnownKeys] = None
+        self._known_lock = threading.Lock()
+
         self.conn_params = {
             "host": os.getenv("DB_HOST") or os.getenv("POSTGRES_HOST") or "localhost",
             "port": os.getenv("DB_PORT") or os.getenv("POSTGRES_PORT") or "5432",
@@ -37,8 +68,10 @@ class PostgreSQLRepository:
 
         self.conn = None
 
-        # In-memory caches for dimensions to avoid redundant DB queries
-        self._geo_cache: Dict[str, int] = {}
+        # In-memory caches for dimensions to avoid redundant DB queries,
+        # keyed by the names as given (normalization belongs to the
+        # transformer, so raw names from other callers are stored unchanged)
+        self._geo_cache: Dict[Tuple[str, str], int] = {}
         self._emp_cache: Dict[str, int] = {}
 
         self._connect()
@@ -55,7 +88,7 @@ class PostgreSQLRepository:
 
     def get_or_create_geografia(self, region: str, comuna: str) -> int:
         """Get or create geografia dimension record (with caching)."""
-        cache_key = f"{region}|{comuna}"
+        cache_key = (region, comuna)
         if cache_key in self._geo_cache:
             return self._geo_cache[cache_key]
 
@@ -124,6 +157,89 @@ class PostgreSQLRepository:
             result = cur.fetchone()
             return result[0] if result else None
 
+    def get_covered_dates(self, start: date, end: date) -> Set[date]:
+        """Get distinct dim_tiempo dates referenced by fact_interrupciones.
+
+        These are outage start dates, not queried dates: a day can appear
+        without ever having been scraped. Only ``ScrapePlanner(fact_days=True)``
+        uses them; prefer ``get_snapshot_points``.
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT DISTINCT t.fecha
+                    FROM fact_interrupciones f
+                    JOIN dim_tiempo t ON t.id_tiempo = f.id_tiempo
+                    WHERE t.fecha BETWEEN %s AND %s
+                    """,
+                    (start, end),
+                )
+                return {row[0] for row in cur.fetchall()}
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"⚠️ Could not read covered dates: {e}")
+            return set()
+
+    def get_snapshot_points(self, start: date, end: date) -> Set[datetime]:
+        """Get scraping_snapshots.fecha_consultada values within a date range.
+
+        Returns an empty set when the table does not exist in this database.
+        """
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT fecha_consultada FROM scraping_snapshots
+                    WHERE fecha_consultada >= %s AND fecha_consultada < %s
+                    """,
+                    (start, end + timedelta(days=1)),
+                )
+                return {row[0] for row in cur.fetchall()}
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"⚠️ Could not read scraping_snapshots: {e}")
+            return set()
+
+    def load_known_keys(self) -> KnownKeys:
+        """Read every ``hash_key`` in ``fact_interrupciones`` into memory.
+
+        Streams through a server-side cursor; without the ``hash_key``
+        column the key is derived from ``hash_id`` in SQL.
+        """
+        if self.compact_keys:
+            query = "SELECT hash_key FROM fact_interrupciones WHERE hash_key IS NOT NULL"
+        else:
+            query = f"SELECT {hash_key_sql('hash_id')} FROM fact_interrupciones"
+
+        chunks = []
+        with self.conn.cursor(name="known_keys") as cur:
+            cur.itersize = 100_000
+            cur.execute(query)
+            while True:
+                rows = cur.fetchmany(cur.itersize)
+                if not rows:
+                    break
+                chunks.append(
+                    np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+                )
+        self.conn.commit()
+
+        known = KnownKeys.from_chunks(chunks)
+        logger.info(
+            f"🔑 Loaded {len(known):,} known keys ({known.nbytes / 1e6:.1f} MB)"
+        )
+        return known
+
+    def _new_rows_mask(self, keys: List[int]) -> Optional[np.ndarray]:
+        """Rows worth inserting (None: known-key filter disabled)."""
+        if not self.use_known_keys:
+            return None
+        with self._known_lock:
+            if self.known_keys is None:
+                self.known_keys = self.load_known_keys()
+        return self.known_keys.new_mask(keys)
+
     def save_records(self, records: List[Dict[str, Any]]) -> Dict[str, int]:
         """Save records to PostgreSQL using massive batch inserts.
 
@@ -137,8 +253,17 @@ class PostgreSQLRepository:
             return {"insertados": 0, "duplicados": 0}
 
         try:
+            keys = [record_hash_key(record) for record in records]
+            mask = self._new_rows_mask(keys)
+            if mask is not None:
+                records = [r for r, nuevo in zip(records, mask) if nuevo]
+                keys = [k for k, nuevo in zip(keys, mask) if nuevo]
+            omitidos = len(mask) - len(records) if mask is not None else 0
+            if not records:
+                return {"insertados": 0, "duplicados": omitidos}
+
             batch_data = []
-            for record in records:
+            for record, key in zip(records, keys):
                 # Dim IDs (efficiently cached)
                 id_geografia = self.get_or_create_geografia(
                     record.get("REGION") or "DESCONOCIDO",
@@ -149,40 +274,221 @@ class PostgreSQLRepository:
                 )
                 id_tiempo = self.get_id_tiempo(record.get("FECHA_DT") or date.today())
 
-                batch_data.append(
-                    (
-                        record.get("ID_UNICO"),
-                        id_geografia,
-                        id_empresa,
-                        id_tiempo,
-                        record.get("CLIENTES_AFECTADOS", 0),
-                        record.get("HORA_INT"),
-                        record.get("TIMESTAMP_SERVER"),
-                        record.get("FECHA_STR"),
-                        record.get("ACTUALIZADO_HACE"),
-                    )
+                row = (
+                    record.get("ID_UNICO"),
+                    id_geografia,
+                    id_empresa,
+                    id_tiempo,
+                    record.get("CLIENTES_AFECTADOS", 0),
+                    record.get("HORA_INT"),
+                    record.get("TIMESTAMP_SERVER"),
+                    record.get("FECHA_STR"),
+                    record.get("ACTUALIZADO_HACE"),
+                    record.get("ACTUALIZADO_HACE_MIN"),
                 )
+                if self.compact_keys:
+                    row += (key,)
+                batch_data.append(row)
+
+            return self._insert_rows(batch_data, keys, omitidos)
+
+        except Exception as e:
+            if self.conn:
+                self.conn.rollback()
+            logger.error(f"❌ Error in batch saving: {e}")
+            raise
+
+    def save_frame(self, frame: pl.DataFrame) -> Dict[str, int]:
+        """Save a columnar batch (``core.transform_pool.RECORD_SCHEMA``).
+
+        Same result as ``save_records`` on the equivalent dicts, but
+        dimensions are resolved once per distinct value and rows are built
+        column-wise, without materializing one dict per record.
 
-            # Massive Insert
+        Args:
+            frame: Transformed records as a Polars DataFrame
+
+        Returns:
+            Dict with counts of processed records
+        """
+        if frame.height == 0:
+            return {"insertados": 0, "duplicados": 0}
+
+        try:
+            keys = frame["HASH_KEY"]
+            mask = self._new_rows_mask(keys.to_numpy())
+            if mask is not None:
+                frame = frame.filter(pl.Series(mask))
+                keys = keys.filter(pl.Series(mask))
+            omitidos = len(mask) - frame.height if mask is not None else 0
+            if frame.height == 0:
+                return {"insertados": 0, "duplicados": omitidos}
+
+            dims = frame.select(
+                [
+                    pl.col(c).fill_null("").replace("", "DESCONOCIDO")
+                    for c in ("REGION", "COMUNA", "EMPRESA")
+                ]
+                + [pl.col("FECHA_DT").fill_null(date.today())]
+            )
+            regiones = dims["REGION"].to_list()
+            comunas = dims["COMUNA"].to_list()
+            empresas = dims["EMPRESA"].to_list()
+            fechas = dims["FECHA_DT"].to_list()
+
+            geo = {
+                key: self.get_or_create_geografia(*key)
+                for key in set(zip(regiones, comunas))
+            }
+            emp = {e: self.get_or_create_empresa(e) for e in set(empresas)}
+            tiempo = {f: self.get_id_tiempo(f) for f in set(fechas)}
+
+            columns = [
+                frame["ID_UNICO"].to_list(),
+                [geo[key] for key in zip(regiones, comunas)],
+                [emp[e] for e in empresas],
+                [tiempo[f] for f in fechas],
+                frame["CLIENTES_AFECTADOS"].fill_null(0).to_list(),
+                frame["HORA_INT"].to_list(),
+                frame["TIMESTAMP_SERVER"].to_list(),
+                frame["FECHA_STR"].to_list(),
+                frame["ACTUALIZADO_HACE"].to_list(),
+                frame["ACTUALIZADO_HACE_MIN"].to_list(),
+            ]
+            if self.compact_keys:
+                columns.append(keys.to_list())
+
+            return self._insert_rows(list(zip(*columns)), keys.to_list(), omitidos)
+
+        except Exception as e:
+            if self.conn:
+                self.conn.rollback()
+            logger.error(f"❌ Error in batch saving: {e}")
+            raise
+
+    def _insert_rows(
+        self, batch_data: List[tuple], keys: List[int], omitidos: int = 0
+    ) -> Dict[str, int]:
+        """Insert prepared fact rows in one ``execute_values`` round trip.
+
+        Args:
+            batch_data: Fact rows
+            keys: ``hash_key`` of each row, added to the known-key set once
+                the insert commits
+            omitidos: Rows already dropped as known (counted as duplicates)
+
+        Returns:
+            Dict with the rows actually inserted (``RETURNING``) and the
+            duplicates, whether dropped up front or by ``ON CONFLICT``
+        """
+        if self.compact_keys:
             query = """
                 INSERT INTO fact_interrupciones (
                     hash_id, id_geografia, id_empresa, id_tiempo,
                     clientes_afectados, hora_interrupcion,
-                    hora_server_scraping, fecha_int_str, actualizado_hace
+                    hora_server_scraping, fecha_int_str, actualizado_hace,
+                    actualizado_hace_min,
+                    hash_key
                 ) VALUES %s
-                ON CONFLICT (hash_id) DO NOTHING;
+                ON CONFLICT (hash_key) DO NOTHING
+                RETURNING 1;
             """
+        else:
+            query = """
+                INSERT INTO fact_interrupciones (
+                    hash_id, id_geografia, id_empresa, id_tiempo,
+                    clientes_afectados, hora_interrupcion,
+                    hora_server_scraping, fecha_int_str, actualizado_hace,
+                    actualizado_hace_min
+                ) VALUES %s
+                ON CONFLICT (hash_id) DO NOTHING
+                RETURNING 1;
+            """
+
+        with self.conn.cursor() as cur:
+            insertados = len(execute_values(cur, query, batch_data, fetch=True))
+            self.conn.commit()
+
+        if self.known_keys is not None:
+            self.known_keys.add(keys)
+
+        return {
+            "insertados": insertados,
+            "duplicados": omitidos + len(batch_data) - insertados,
+        }
 
+    def save_events(self, frame: pl.DataFrame) -> int:
+        """Upsert consolidated events into ``fact_eventos``.
+
+        Args:
+            frame: Events (``core.event_consolidator.EventStore.scan``),
+                with the ``abierto`` flag
+
+        Returns:
+            int: Events written
+        """
+        if frame.height == 0:
+            return 0
+
+        # id_evento es único por evento (incluye primer_snapshot); si llega
+        # repetido (p.ej. abierto y luego cerrado), gana el estado más reciente
+        frame = frame.sort("ultimo_snapshot").unique("id_evento", keep="last")
+
+        try:
+            geo = {
+                key: self.get_or_create_geografia(*key)
+                for key in frame.select("region", "comuna").unique().rows()
+            }
+            emp = {e: self.get_or_create_empresa(e) for e in frame["empresa"].unique()}
+
+            columns = [
+                "id_evento",
+                "inicio",
+                "primer_snapshot",
+                "ultimo_snapshot",
+                "n_snapshots",
+                "clientes_inicial",
+                "clientes_max",
+                "clientes_final",
+                "clientes_hora",
+                "duracion_min",
+                "abierto",
+            ]
+            rows = [
+                (row[0], geo[(region, comuna)], emp[empresa], *row[1:])
+                for region, comuna, empresa, row in zip(
+                    frame["region"],
+                    frame["comuna"],
+                    frame["empresa"],
+                    frame.select(columns).iter_rows(),
+                )
+            ]
+
+            query = """
+                INSERT INTO fact_eventos (
+                    id_evento, id_geografia, id_empresa, inicio,
+                    primer_snapshot, ultimo_snapshot, n_snapshots,
+                    clientes_inicial, clientes_max, clientes_final,
+                    clientes_hora, duracion_min, abierto
+                ) VALUES %s
+                ON CONFLICT (id_evento) DO UPDATE SET
+                    ultimo_snapshot = EXCLUDED.ultimo_snapshot,
+                    n_snapshots = EXCLUDED.n_snapshots,
+                    clientes_max = EXCLUDED.clientes_max,
+                    clientes_final = EXCLUDED.clientes_final,
+                    clientes_hora = EXCLUDED.clientes_hora,
+                    duracion_min = EXCLUDED.duracion_min,
+                    abierto = EXCLUDED.abierto;
+            """
             with self.conn.cursor() as cur:
-                execute_values(cur, query, batch_data)
+                execute_values(cur, query, rows)
                 self.conn.commit()
-
-            return {"insertados": len(batch_data), "duplicados": 0}
+            return len(rows)
 
         except Exception as e:
             if self.conn:
                 self.conn.rollback()
-            logger.error(f"❌ Error in batch saving: {e}")
+            logger.error(f"❌ Error saving events: {e}")
             raise
 
     def get_record_count(self) -> int:
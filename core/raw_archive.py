@@ -0,0 +1,229 @@
+"""Content-addressed archive of raw SEC responses (bronze layer).
+
+Raw ``GetPorFecha`` bodies are stored once per distinct content: each body
+is serialized canonically, hashed with SHA-256 and written compressed to
+``blobs/<2 hex>/<hash>.json.{zst,gz}``. A SQLite index maps every query
+point (``fecha_consultada``) to its blob plus the rest of the point result
+(server time, success flag...), so identical snapshots from adjacent hours
+share one blob and ``SecDataTransformer`` can be re-run on history without
+re-scraping.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # gzip como respaldo si zstandard no está instalado
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_INDEX = "index.sqlite"
+
+
+def canonical_body(data) -> bytes:
+    """Serialize a response body so equal content always hashes equal."""
+    return json.dumps(
+        data, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RawArchive:
+    """Deduplicated, compressed store of raw responses.
+
+    Usage:
+        archive = RawArchive("outputs/bronze")
+        digest = archive.put("2017-01-01 00:00", data, {"success": True})
+        archive.get("2017-01-01 00:00")
+
+    Attributes:
+        root: Archive directory (blobs + ``index.sqlite``)
+        compression: ``"zstd"`` or ``"gzip"``
+    """
+
+    def __init__(self, root, compression: Optional[str] = None):
+        """Open (or create) the archive.
+
+        Args:
+            root: Archive directory
+            compression: ``"zstd"`` or ``"gzip"`` (default: zstd if available)
+        """
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression or ("zstd" if zstandard else "gzip")
+        self.suffix = ".json.zst" if self.compression == "zstd" else ".json.gz"
+
+        self.conn = sqlite3.connect(str(self.root / ARCHIVE_INDEX), timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                raw_bytes INTEGER NOT NULL,
+                stored_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                fecha_consultada TEXT PRIMARY KEY,
+                hash TEXT NOT NULL REFERENCES blobs(hash),
+                meta TEXT NOT NULL,
+                records INTEGER NOT NULL,
+                archived_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_hash ON responses(hash);
+            """
+        )
+        self.conn.commit()
+
+    def _compress(self, raw: bytes) -> bytes:
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor(level=9).compress(raw)
+        return gzip.compress(raw, compresslevel=9)
+
+    @staticmethod
+    def _decompress(path: Path) -> bytes:
+        blob = path.read_bytes()
+        if path.name.endswith(".zst"):
+            if zstandard is None:
+                raise ImportError("zstandard no está instalado: pip install zstandard")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return gzip.decompress(blob)
+
+    def _write_blob(self, digest: str, raw: bytes):
+        if self.conn.execute(
+            "SELECT 1 FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone():
+            return
+
+        rel_path = Path(digest[:2]) / f"{digest}{self.suffix}"
+        path = self.blob_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stored = self._compress(raw)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(stored)
+        os.replace(tmp, path)
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO blobs (hash, path, raw_bytes, stored_bytes, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (digest, rel_path.as_posix(), len(raw), len(stored), time.time()),
+        )
+
+    def put(self, fecha_consultada: str, data, meta: Optional[dict] = None) -> str:
+        """Archive one response body and index it under its query point.
+
+        Args:
+            fecha_consultada: Query point ("YYYY-MM-DD HH:00")
+            data: Raw response body (the list of records)
+            meta: Rest of the point result (server time, success flag...)
+
+        Returns:
+            str: SHA-256 of the canonical body
+        """
+        raw = canonical_body(data if data is not None else [])
+        digest = hashlib.sha256(raw).hexdigest()
+        meta = {k: v for k, v in (meta or {}).items() if k != "data"}
+
+        self._write_blob(digest, raw)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(fecha_consultada, hash, meta, records, archived_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                fecha_consultada,
+                digest,
+                json.dumps(meta, ensure_ascii=False),
+                len(data or []),
+                time.time(),
+            ),
+        )
+        self.conn.commit()
+        return digest
+
+    def get_blob(self, digest: str):
+        """Return the decoded body stored under ``digest``."""
+        row = self.conn.execute(
+            "SELECT path FROM blobs WHERE hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return json.loads(self._decompress(self.blob_dir / row[0]).decode("utf-8"))
+
+    def get(self, fecha_consultada: str) -> Optional[dict]:
+        """Rebuild the point result archived for ``fecha_consultada``."""
+        row = self.conn.execute(
+            "SELECT hash, meta FROM responses WHERE fecha_consultada = ?",
+            (fecha_consultada,),
+        ).fetchone()
+        if row is None:
+            return None
+        return {**json.loads(row[1]), "data": self.get_blob(row[0])}
+
+    def iter_results(
+        self, start_year: Optional[int] = None, end_year: Optional[int] = None
+    ) -> Iterator[dict]:
+        """Yield archived point results in chronological order.
+
+        Consecutive points sharing a blob decode it only once.
+
+        Args:
+            start_year: Skip points before this year
+            end_year: Skip points after this year
+        """
+        query = "SELECT fecha_consultada, hash, meta FROM responses"
+        params = []
+        if start_year:
+            query += " WHERE fecha_consultada >= ?"
+            params.append(f"{start_year}")
+        if end_year:
+            query += " AND" if start_year else " WHERE"
+            query += " fecha_consultada < ?"
+            params.append(f"{end_year + 1}")
+        query += " ORDER BY fecha_consultada"
+
+        last_hash, last_data = None, None
+        for fecha, digest, meta in self.conn.execute(query, params).fetchall():
+            if digest != last_hash:
+                last_hash, last_data = digest, self.get_blob(digest)
+            yield {**json.loads(meta), "fecha_consultada": fecha, "data": last_data}
+
+    def stats(self) -> Dict[str, float]:
+        """Responses, distinct blobs and bytes saved by dedup + compression."""
+        responses = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        blobs, raw_bytes, stored_bytes = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(raw_bytes), 0), "
+            "COALESCE(SUM(stored_bytes), 0) FROM blobs"
+        ).fetchone()
+        logical_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(b.raw_bytes), 0) FROM responses r "
+            "JOIN blobs b ON b.hash = r.hash"
+        ).fetchone()[0]
+        return {
+            "responses": responses,
+            "blobs": blobs,
+            "logical_bytes": logical_bytes,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "dedup_ratio": responses / blobs if blobs else 0.0,
+        }
+
+    def close(self):
+        """Close the SQLite index."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
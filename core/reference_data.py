@@ -0,0 +1,304 @@
+"""Reference data: electricity customers per region (``GetClientesRegional``).
+
+Analyses normalize outage impact by the number of customers of each
+region. Counts are fetched concurrently over one pooled ``httpx`` client
+and kept as a dated time series in Parquet (one snapshot per fetch date),
+refreshed when the latest snapshot is older than the TTL. ``clientes_lookup``
+returns the join table the analyses use; when SEC cannot be reached and no
+snapshot exists yet it falls back to the approximate CNE/SEC counts.
+"""
+
+import asyncio
+import logging
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import polars as pl
+
+from config import URL_SEC_API_BASE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path("data/processed/clientes_region.parquet")
+DEFAULT_TTL_DAYS = 30
+
+# Nombre que espera GetClientesRegional -> nombre_region en dim_geografia
+REGIONES_SEC: Dict[str, str] = {
+    "Region de Arica y Parinacota": "ARICA Y PARINACOTA",
+    "Region de Tarapaca": "TARAPACA",
+    "Region de Antofagasta": "ANTOFAGASTA",
+    "Region de Atacama": "ATACAMA",
+    "Region de Coquimbo": "COQUIMBO",
+    "Region de Valparaiso": "VALPARAISO",
+    "Region Metropolitana de Santiago": "METROPOLITANA",
+    "Region del Libertador General Bernardo O'Higgins": "O'HIGGINS",
+    "Region del Maule": "MAULE",
+    "Region del Biobio": "BIOBIO",
+    "Region de La Araucania": "LA ARAUCANIA",
+    "Region de Los Rios": "LOS RIOS",
+    "Region de Los Lagos": "LOS LAGOS",
+    "Region de Aysen del General Carlos Ibanez del Campo": "AYSEN",
+    "Region de Magallanes y de la Antartica Chilena": "MAGALLANES",
+    "Region de Nuble": "NUBLE",
+}
+
+# Clientes aproximados por región en miles (CNE/SEC), respaldo sin red
+FALLBACK_CLIENTES_K: Dict[str, int] = {
+    "METROPOLITANA": 2500,
+    "VALPARAISO": 880,
+    "BIOBIO": 720,
+    "MAULE": 440,
+    "LA ARAUCANIA": 430,
+    "O'HIGGINS": 400,
+    "LOS LAGOS": 350,
+    "COQUIMBO": 340,
+    "ANTOFAGASTA": 220,
+    "NUBLE": 210,
+    "LOS RIOS": 170,
+    "TARAPACA": 150,
+    "ATACAMA": 110,
+    "ARICA Y PARINACOTA": 100,
+    "MAGALLANES": 80,
+    "AYSEN": 40,
+}
+
+SCHEMA = {
+    "fecha": pl.Date,
+    "nombre_region": pl.String,
+    "region_sec": pl.String,
+    "region_id": pl.String,
+    "clientes": pl.Int64,
+}
+
+
+async def fetch_clientes_regionales(
+    regions: Optional[List[str]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    max_concurrent: int = 8,
+) -> List[dict]:
+    """Fetch ``GetClientesRegional`` for every region concurrently.
+
+    Args:
+        regions: SEC region names (default: every key of ``REGIONES_SEC``)
+        client: Pooled client to reuse (default: a new keep-alive client)
+        max_concurrent: Requests in flight at once
+
+    Returns:
+        List of dicts with ``region``, ``clientes``, ``region_id``, ``success``
+        (and ``error`` on failure), in the order of ``regions``
+    """
+    regions = regions or list(REGIONES_SEC)
+    owns_client = client is None
+    if owns_client:
+        client = httpx.AsyncClient(
+            headers={
+                "Content-Type": "application/json",
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                ),
+            },
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=max_concurrent,
+                max_keepalive_connections=max_concurrent,
+            ),
+        )
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def fetch_one(region: str) -> dict:
+        async with semaphore:
+            try:
+                response = await client.post(
+                    f"{URL_SEC_API_BASE}/GetClientesRegional",
+                    json={"region": region},
+                )
+                response.raise_for_status()
+                data = response.json()
+                # El API devuelve una lista, tomar el primer elemento
+                item = data[0] if isinstance(data, list) and data else data
+                return {
+                    "region": region,
+                    "clientes": item.get("CLIENTES"),
+                    "region_id": item.get("REGION_ID"),
+                    "success": True,
+                }
+            except Exception as e:
+                logger.warning(f"⚠️ GetClientesRegional falló para {region}: {e}")
+                return {
+                    "region": region,
+                    "clientes": None,
+                    "region_id": None,
+                    "success": False,
+                    "error": str(e),
+                }
+
+    try:
+        return list(await asyncio.gather(*(fetch_one(r) for r in regions)))
+    finally:
+        if owns_client:
+            await client.aclose()
+
+
+class ClientesRegionalStore:
+    """Dated Parquet time series of customers per region.
+
+    Usage:
+        store = ClientesRegionalStore()
+        await store.refresh_if_stale()
+        lookup = store.lookup()
+
+    Attributes:
+        path: Parquet file holding every snapshot
+        ttl_days: Days a snapshot is considered fresh
+    """
+
+    def __init__(self, path=DEFAULT_PATH, ttl_days: int = DEFAULT_TTL_DAYS):
+        """Initialize the store.
+
+        Args:
+            path: Parquet file holding every snapshot
+            ttl_days: Days a snapshot is considered fresh (default: 30)
+        """
+        self.path = Path(path)
+        self.ttl_days = ttl_days
+
+    def history(self) -> pl.DataFrame:
+        """Every stored snapshot (empty frame if none)."""
+        if not self.path.exists():
+            return pl.DataFrame(schema=SCHEMA)
+        return pl.read_parquet(self.path)
+
+    def latest_date(self) -> Optional[date]:
+        """Date of the most recent snapshot."""
+        history = self.history()
+        return history["fecha"].max() if history.height else None
+
+    def is_stale(self, today: Optional[date] = None) -> bool:
+        """Whether the latest snapshot is missing or older than the TTL."""
+        latest = self.latest_date()
+        today = today or date.today()
+        return latest is None or (today - latest).days >= self.ttl_days
+
+    def append(self, results: List[dict], fecha: Optional[date] = None) -> int:
+        """Store the successful results of one fetch as the ``fecha`` snapshot.
+
+        A snapshot already stored for ``fecha`` is replaced.
+
+        Returns:
+            int: Regions stored
+        """
+        fecha = fecha or date.today()
+        rows = [
+            {
+                "fecha": fecha,
+                "nombre_region": REGIONES_SEC.get(r["region"], r["region"].upper()),
+                "region_sec": r["region"],
+                "region_id": None if r["region_id"] is None else str(r["region_id"]),
+                "clientes": int(r["clientes"]),
+            }
+            for r in results
+            if r.get("success") and r.get("clientes") is not None
+        ]
+        if not rows:
+            return 0
+
+        snapshot = pl.DataFrame(rows, schema=SCHEMA)
+        history = self.history().filter(pl.col("fecha") != fecha)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pl.concat([history, snapshot]).sort(["fecha", "nombre_region"]).write_parquet(
+            self.path
+        )
+        return len(rows)
+
+    async def refresh(self, **kwargs) -> int:
+        """Fetch every region now and store today's snapshot.
+
+        Args:
+            **kwargs: Extra arguments for ``fetch_clientes_regionales``
+
+        Returns:
+            int: Regions stored
+        """
+        results = await fetch_clientes_regionales(**kwargs)
+        stored = self.append(results)
+        logger.info(f"📊 Clientes por región: {stored}/{len(results)} regiones")
+        return stored
+
+    async def refresh_if_stale(self, **kwargs) -> bool:
+        """Refresh when the latest snapshot is older than the TTL.
+
+        Returns:
+            bool: True if a refresh was attempted
+        """
+        if not self.is_stale():
+            return False
+        await self.refresh(**kwargs)
+        return True
+
+    def lookup(self, as_of: Optional[date] = None) -> pl.DataFrame:
+        """Join table: latest counts on or before ``as_of`` per region.
+
+        Regions without any stored count use ``FALLBACK_CLIENTES_K``.
+
+        Returns:
+            pl.DataFrame: ``nombre_region``, ``clientes``, ``clientes_reg_k``
+                and ``fecha`` (null for fallback rows)
+        """
+        history = self.history()
+        if as_of is not None:
+            history = history.filter(pl.col("fecha") <= as_of)
+
+        measured = (
+            history.sort("fecha")
+            .group_by("nombre_region")
+            .agg(pl.col("clientes").last(), pl.col("fecha").last())
+        )
+        fallback = pl.DataFrame(
+            {
+                "nombre_region": list(FALLBACK_CLIENTES_K),
+                "clientes": [k * 1000 for k in FALLBACK_CLIENTES_K.values()],
+            },
+            schema={"nombre_region": pl.String, "clientes": pl.Int64},
+        ).filter(~pl.col("nombre_region").is_in(measured["nombre_region"].to_list()))
+
+        return (
+            pl.concat(
+                [measured, fallback.with_columns(pl.lit(None, pl.Date).alias("fecha"))],
+                how="diagonal",
+            )
+            .with_columns((pl.col("clientes") / 1000).alias("clientes_reg_k"))
+            .select("nombre_region", "clientes", "clientes_reg_k", "fecha")
+            .sort("clientes", descending=True)
+        )
+
+
+def clientes_lookup(
+    path=DEFAULT_PATH,
+    ttl_days: int = DEFAULT_TTL_DAYS,
+    refresh: bool = True,
+) -> pl.DataFrame:
+    """Customers-per-region join table for analyses (sync entry point).
+
+    Args:
+        path: Parquet file holding the snapshots
+        ttl_days: Days a snapshot is considered fresh
+        refresh: Fetch from SEC first when the snapshot is stale
+
+    Returns:
+        pl.DataFrame: See ``ClientesRegionalStore.lookup``
+    """
+    store = ClientesRegionalStore(path, ttl_days=ttl_days)
+    if refresh and store.is_stale():
+        try:
+            asyncio.run(store.refresh())
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo refrescar clientes por región: {e}")
+    return store.lookup()
+
+
+def clientes_por_region(**kwargs) -> Dict[str, int]:
+    """``{nombre_region: clientes}`` from ``clientes_lookup``."""
+    lookup = clientes_lookup(**kwargs)
+    return dict(zip(lookup["nombre_region"], lookup["clientes"]))
@@ -1,13 +1,18 @@
 """Retry handler with exponential backoff for robust scraping.
 
 This module provides decorators and utilities to handle transient failures
-with configurable retry strategies.
+with configurable retry strategies. Handlers wrap both plain functions and
+coroutines, can add full jitter to their delays, apply per-exception rules,
+and share a run-wide ``RetryBudget``.
 """
 
+import asyncio
+import random
+import threading
 import time
 import logging
 from functools import wraps
-from typing import Callable, Optional, Tuple, Type
+from typing import Callable, Dict, Optional, Tuple, Type
 from enum import Enum
 
 
@@ -19,8 +24,135 @@ class RetryStrategy(Enum):
     FIBONACCI = "fibonacci"
 
 
+class RetryRule:
+    """Retry settings for one exception class.
+
+    Fields left as ``None`` inherit the handler's settings.
+
+    Usage:
+        rules = {
+            PlaywrightTimeoutError: RetryRule(base_delay=5.0),
+            ValueError: RetryRule(retry=False),
+        }
+    """
+
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        retry: bool = True,
+    ):
+        """Initialize the rule.
+
+        Args:
+            max_attempts: Maximum attempts for this exception class
+            base_delay: Base delay in seconds for this exception class
+            max_delay: Maximum delay cap in seconds for this exception class
+            retry: Whether this exception class is retried at all
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry = retry
+
+
+class RetryBudget:
+    """Run-wide cap on retries, shared by every handler that uses it.
+
+    Retries are allowed while ``retries <= min_retries + ratio * requests``,
+    so when many tasks fail together they stop retrying instead of
+    multiplying the load on a struggling server.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries: int = 10,
+        max_retries: Optional[int] = None,
+    ):
+        """Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per first attempt
+            min_retries: Retries always allowed, even with few requests
+            max_retries: Absolute cap on retries for the whole run
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.max_retries = max_retries
+        self.requests = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        """Count one first attempt."""
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False when it is exhausted."""
+        with self._lock:
+            allowed = self.min_retries + self.ratio * self.requests
+            if self.max_retries is not None:
+                allowed = min(allowed, self.max_retries)
+            if self.retries + 1 > allowed:
+                return False
+            self.retries += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        """Retries still available right now."""
+        allowed = self.min_retries + self.ratio * self.requests
+        if self.max_retries is not None:
+            allowed = min(allowed, self.max_retries)
+        return max(0, int(allowed) - self.retries)
+
+
+class RetryMetrics:
+    """Counters for calls, attempts, retries and time spent waiting."""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.successes = 0
+        self.failures = 0
+        self.budget_exhausted = 0
+        self.wait_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counters):
+        """Increment one or more counters atomically."""
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the counters as a dictionary."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "successes": self.successes,
+                "failures": self.failures,
+                "budget_exhausted": self.budget_exhausted,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
 class RetryHandler:
-    """Handles retry logic with various backoff strategies."""
+    """Handles retry logic with various backoff strategies.
+
+    Decorates both functions and coroutine functions; coroutines wait with
+    ``asyncio.sleep`` so the event loop keeps running during backoff.
+
+    Attributes:
+        metrics: Counters for every call made through this handler
+        budget: Optional run-wide retry budget
+    """
 
     def __init__(
         self,
@@ -30,6 +162,9 @@ class RetryHandler:
         strategy: RetryStrategy = RetryStrategy.EXPONENTIAL,
         exceptions: Tuple[Type[Exception], ...] = (Exception,),
         logger: Optional[logging.Logger] = None,
+        jitter: bool = False,
+        rules: Optional[Dict[Type[Exception], RetryRule]] = None,
+        budget: Optional[RetryBudget] = None,
     ):
         """Initialize retry handler.
 
@@ -40,6 +175,11 @@ class RetryHandler:
             strategy: Retry strategy to use
             exceptions: Tuple of exceptions to catch and retry
             logger: Optional logger instance
+            jitter: Use full jitter (a uniform delay between 0 and the
+                strategy's delay) so concurrent failures do not retry in sync
+            rules: Per-exception-class overrides, matched with ``isinstance``
+                in insertion order
+            budget: Run-wide retry budget shared with other handlers
         """
         self.max_attempts = max_attempts
         self.base_delay = base_delay
@@ -47,28 +187,119 @@ class RetryHandler:
         self.strategy = strategy
         self.exceptions = exceptions
         self.logger = logger or logging.getLogger(__name__)
+        self.jitter = jitter
+        self.rules = rules or {}
+        self.budget = budget
+        self.metrics = RetryMetrics()
+
+    def _rule_for(self, exc: Optional[BaseException]) -> Optional[RetryRule]:
+        if exc is None:
+            return None
+        for exc_class, rule in self.rules.items():
+            if isinstance(exc, exc_class):
+                return rule
+        return None
 
-    def calculate_delay(self, attempt: int) -> float:
+    def calculate_delay(
+        self, attempt: int, exc: Optional[BaseException] = None
+    ) -> float:
         """Calculate delay based on strategy and attempt number.
 
         Args:
             attempt: Current attempt number (0-indexed)
+            exc: Exception that caused the retry (selects its rule)
 
         Returns:
             Delay in seconds
         """
+        rule = self._rule_for(exc)
+        base_delay = self.base_delay
+        max_delay = self.max_delay
+        if rule is not None:
+            if rule.base_delay is not None:
+                base_delay = rule.base_delay
+            if rule.max_delay is not None:
+                max_delay = rule.max_delay
+
         if self.strategy == RetryStrategy.EXPONENTIAL:
-            delay = self.base_delay * (2**attempt)
+            delay = base_delay * (2**attempt)
         elif self.strategy == RetryStrategy.LINEAR:
-            delay = self.base_delay * (attempt + 1)
+            delay = base_delay * (attempt + 1)
         elif self.strategy == RetryStrategy.FIBONACCI:
             # Fibonacci sequence: 1, 1, 2, 3, 5, 8, 13...
             fib = self._fibonacci(attempt + 1)
-            delay = self.base_delay * fib
+            delay = base_delay * fib
+        else:
+            delay = base_delay
+
+        delay = min(delay, max_delay)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def should_retry(self, attempt: int, exc: Optional[BaseException] = None) -> bool:
+        """Decide whether a failed attempt gets another try.
+
+        Spends one retry from the budget when the answer is yes.
+
+        Args:
+            attempt: Attempt that just failed (0-indexed)
+            exc: Exception raised by that attempt
+
+        Returns:
+            True if the caller should wait ``calculate_delay`` and retry
+        """
+        rule = self._rule_for(exc)
+        max_attempts = self.max_attempts
+        if rule is not None:
+            if not rule.retry:
+                return False
+            if rule.max_attempts is not None:
+                max_attempts = rule.max_attempts
+
+        if attempt >= max_attempts - 1:
+            return False
+
+        if self.budget is not None and not self.budget.try_spend():
+            self.metrics.add(budget_exhausted=1)
+            self.logger.warning("⚠️ Presupuesto de reintentos agotado")
+            return False
+        return True
+
+    def _on_failure(self, func_name: str, attempt: int, exc: Exception):
+        """Return the delay before the next attempt, or None to give up."""
+        if not self.should_retry(attempt, exc):
+            self.metrics.add(failures=1)
+            self.logger.error(
+                f"❌ {func_name} falló después de {attempt + 1} intentos"
+            )
+            return None
+
+        delay = self.calculate_delay(attempt, exc)
+        self.metrics.add(retries=1, wait_seconds=delay)
+        self.logger.warning(f"⚠️ Error en intento {attempt + 1}: {str(exc)[:100]}")
+        self.logger.info(f"⏳ Esperando {delay:.1f}s antes del siguiente intento...")
+        return delay
+
+    def _on_attempt(self, func_name: str, attempt: int):
+        self.metrics.add(attempts=1)
+        if attempt == 0:
+            self.metrics.add(calls=1)
+            if self.budget is not None:
+                self.budget.record_request()
+            self.logger.debug(f"Intento 1/{self.max_attempts} - {func_name}")
         else:
-            delay = self.base_delay
+            self.logger.info(
+                f"Intento {attempt + 1}/{self.max_attempts} - {func_name}"
+            )
+
+    def _on_success(self, attempt: int):
+        self.metrics.add(successes=1)
+        if attempt > 0:
+            self.logger.info(f"✅ Éxito después de {attempt + 1} intentos")
 
-        return min(delay, self.max_delay)
+    def _retryable(self, exc: Exception) -> bool:
+        return isinstance(exc, self.exceptions) or self._rule_for(exc) is not None
 
     @staticmethod
     def _fibonacci(n: int) -> int:
@@ -81,7 +312,7 @@ class RetryHandler:
         return a
 
     def __call__(self, func: Callable) -> Callable:
-        """Decorator to add retry logic to a function.
+        """Decorator to add retry logic to a function or coroutine function.
 
         Args:
             func: Function to wrap with retry logic
@@ -89,42 +320,49 @@ class RetryHandler:
         Returns:
             Wrapped function
         """
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempt = 0
+                while True:
+                    self._on_attempt(func.__name__, attempt)
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        if not self._retryable(e):
+                            raise
+                        delay = self._on_failure(func.__name__, attempt, e)
+                        if delay is None:
+                            raise
+                        await asyncio.sleep(delay)
+                        attempt += 1
+                        continue
+
+                    self._on_success(attempt)
+                    return result
+
+            return async_wrapper
 
         @wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
-
-            for attempt in range(self.max_attempts):
+            attempt = 0
+            while True:
+                self._on_attempt(func.__name__, attempt)
                 try:
-                    self.logger.info(
-                        f"Intento {attempt + 1}/{self.max_attempts} - {func.__name__}"
-                    )
                     result = func(*args, **kwargs)
+                except Exception as e:
+                    if not self._retryable(e):
+                        raise
+                    delay = self._on_failure(func.__name__, attempt, e)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
 
-                    if attempt > 0:
-                        self.logger.info(f"✅ Éxito después de {attempt + 1} intentos")
-
-                    return result
-
-                except self.exceptions as e:
-                    last_exception = e
-
-                    if attempt < self.max_attempts - 1:
-                        delay = self.calculate_delay(attempt)
-                        self.logger.warning(
-                            f"⚠️ Error en intento {attempt + 1}: {str(e)[:100]}"
-                        )
-                        self.logger.info(
-                            f"⏳ Esperando {delay:.1f}s antes del siguiente intento..."
-                        )
-                        time.sleep(delay)
-                    else:
-                        self.logger.error(
-                            f"❌ Falló después de {self.max_attempts} intentos"
-                        )
-
-            # Si llegamos aquí, todos los intentos fallaron
-            raise last_exception
+                self._on_success(attempt)
+                return result
 
         return wrapper
 
@@ -136,6 +374,9 @@ def retry_with_backoff(
     strategy: str = "exponential",
     exceptions: Tuple[Type[Exception], ...] = (Exception,),
     logger: Optional[logging.Logger] = None,
+    jitter: bool = False,
+    rules: Optional[Dict[Type[Exception], RetryRule]] = None,
+    budget: Optional[RetryBudget] = None,
 ):
     """Decorator factory for retry with backoff.
 
@@ -145,6 +386,10 @@ def retry_with_backoff(
             # code that might fail
             pass
 
+        @retry_with_backoff(max_attempts=3, jitter=True, budget=shared_budget)
+        async def my_coroutine():
+            pass
+
     Args:
         max_attempts: Maximum number of retry attempts
         base_delay: Base delay in seconds between retries
@@ -152,6 +397,9 @@ def retry_with_backoff(
         strategy: Retry strategy ("exponential", "linear", "fibonacci")
         exceptions: Tuple of exceptions to catch and retry
         logger: Optional logger instance
+        jitter: Use full jitter on every delay
+        rules: Per-exception-class overrides (see ``RetryRule``)
+        budget: Run-wide retry budget shared with other handlers
     """
     strategy_enum = RetryStrategy(strategy)
     handler = RetryHandler(
@@ -161,6 +409,9 @@ def retry_with_backoff(
         strategy=strategy_enum,
         exceptions=exceptions,
         logger=logger,
+        jitter=jitter,
+        rules=rules,
+        budget=budget,
     )
     return handler
 
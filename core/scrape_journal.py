@@ -0,0 +1,354 @@
+"""Point-level journal for resumable historical scraping.
+
+Yearly checkpoints are only written when a year completes, so a crash late
+in the year used to lose all of its work. The journal records every
+completed (year, month, day, hour) point as it arrives, together with the
+location of its raw payload, so a restarted scrape only fetches what is
+still missing.
+
+Raw payloads are appended to one JSONL file per month under ``raw_dir``;
+the SQLite index stores the file and byte offset of each line. With a
+``RawArchive`` attached, payloads go to the content-addressed archive
+instead and the location column holds ``sha256:<digest>``.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.raw_archive import RawArchive
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[int, int, int, int]
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+ARCHIVE_PREFIX = "sha256:"
+
+
+def point_key(point: Point) -> str:
+    """Format a point as its ``fecha_consultada`` ("YYYY-MM-DD HH:00")."""
+    year, month, day, hour = point
+    return f"{year}-{month:02d}-{day:02d} {hour:02d}:00"
+
+
+class ScrapeJournal:
+    """SQLite journal of scraped points and their raw payload location.
+
+    Only successful points count as completed; failed points are recorded
+    with their error and fetched again on the next run.
+
+    Usage:
+        journal = ScrapeJournal("outputs/scrape_journal.sqlite")
+        pending = journal.pending(points)
+        journal.record((2017, 1, 1, 0), result)
+        journal.load((2017, 1, 1, 0))
+
+    Attributes:
+        path: SQLite database file
+        raw_dir: Directory holding the monthly JSONL payload files
+        archive: Content-addressed store used instead of ``raw_dir``
+    """
+
+    def __init__(
+        self,
+        path,
+        raw_dir: Optional[str] = None,
+        archive: Optional[RawArchive] = None,
+    ):
+        """Open (or create) the journal.
+
+        Args:
+            path: SQLite database file
+            raw_dir: Directory for raw payloads (default: ``raw/`` next to
+                the database)
+            archive: Store payloads deduplicated in this archive instead
+                of the monthly JSONL files
+        """
+        self.archive = archive
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.raw_dir = Path(raw_dir) if raw_dir else self.path.parent / "raw"
+        self.raw_dir.mkdir(parents=True, exist_ok=True)
+
+        # Varios procesos pueden compartir el journal (backfill por shards)
+        self.conn = sqlite3.connect(str(self.path), timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS points (
+                year INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                hour INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                records INTEGER NOT NULL DEFAULT 0,
+                location TEXT,
+                offset INTEGER,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (year, month, day, hour)
+            );
+            CREATE TABLE IF NOT EXISTS claims (
+                shard TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                claimed_at REAL NOT NULL,
+                finished_at REAL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def _raw_file(self, point: Point) -> Path:
+        year, month = point[0], point[1]
+        return self.raw_dir / f"points_{year}_{month:02d}.jsonl"
+
+    def record(self, point: Point, result: dict):
+        """Record the outcome of one point.
+
+        Successful results are written to the archive (or appended to the
+        month's JSONL file) before the point is marked done, so a done row
+        always has its payload.
+
+        Args:
+            point: (year, month, day, hour) tuple
+            result: Point result as returned by the scraper
+        """
+        location = offset = error = None
+        records = len(result.get("data") or [])
+
+        status = STATUS_FAILED
+        if result.get("success", True) and not result.get("error"):
+            status = STATUS_DONE
+
+        if status == STATUS_DONE and self.archive is not None:
+            digest = self.archive.put(point_key(point), result.get("data"), result)
+            location = ARCHIVE_PREFIX + digest
+        elif status == STATUS_DONE:
+            raw_file = self._raw_file(point)
+            line = json.dumps(result, ensure_ascii=False) + "\n"
+            with open(raw_file, "ab") as f:
+                offset = f.tell()
+                f.write(line.encode("utf-8"))
+            location = raw_file.name
+        else:
+            error = str(result.get("error", "sin datos"))[:500]
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO points "
+            "(year, month, day, hour, status, records, location, offset, error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*point, status, records, location, offset, error, time.time()),
+        )
+        self.conn.commit()
+
+    def completed(self, points: Optional[Iterable[Point]] = None) -> Set[Point]:
+        """Return the completed points (optionally restricted to ``points``)."""
+        rows = self.conn.execute(
+            "SELECT year, month, day, hour FROM points WHERE status = ?",
+            (STATUS_DONE,),
+        )
+        done = {tuple(row) for row in rows}
+        if points is None:
+            return done
+        return done.intersection(points)
+
+    def is_done(self, point: Point) -> bool:
+        """Whether ``point`` was already scraped successfully."""
+        row = self.conn.execute(
+            "SELECT 1 FROM points WHERE year = ? AND month = ? AND day = ? "
+            "AND hour = ? AND status = ?",
+            (*point, STATUS_DONE),
+        ).fetchone()
+        return row is not None
+
+    def pending(self, points: Iterable[Point]) -> List[Point]:
+        """Return the points of ``points`` not yet completed, order preserved."""
+        done = self.completed()
+        return [p for p in points if p not in done]
+
+    def load(self, point: Point) -> Optional[dict]:
+        """Read back the raw result of a completed point."""
+        row = self.conn.execute(
+            "SELECT location, offset FROM points WHERE year = ? AND month = ? "
+            "AND day = ? AND hour = ? AND status = ?",
+            (*point, STATUS_DONE),
+        ).fetchone()
+        if row is None:
+            return None
+        return self._read(point, row[0], row[1])
+
+    def load_many(self, points: Iterable[Point]) -> Dict[Point, dict]:
+        """Read back the raw results of every completed point in ``points``."""
+        return dict(self.iter_results(points))
+
+    def iter_results(self, points: Iterable[Point]) -> Iterator[Tuple[Point, dict]]:
+        """Yield (point, result) for every completed point in ``points``.
+
+        Results are read in calendar order and each monthly file is opened
+        once, so restoring a full range neither reopens the same file
+        thousands of times nor holds every payload in memory.
+        """
+        wanted = set(points)
+        rows = self.conn.execute(
+            "SELECT year, month, day, hour, location, offset FROM points "
+            "WHERE status = ? ORDER BY year, month, day, hour",
+            (STATUS_DONE,),
+        ).fetchall()
+
+        handle = None
+        current = None
+        try:
+            for year, month, day, hour, location, offset in rows:
+                point = (year, month, day, hour)
+                if point not in wanted:
+                    continue
+                if location.startswith(ARCHIVE_PREFIX):
+                    yield point, self._read(point, location, offset)
+                    continue
+                if location != current:
+                    if handle is not None:
+                        handle.close()
+                    handle = open(self.raw_dir / location, "rb")
+                    current = location
+                handle.seek(offset)
+                yield point, json.loads(handle.readline().decode("utf-8"))
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def _read(self, point: Point, location: str, offset: Optional[int]) -> dict:
+        if location.startswith(ARCHIVE_PREFIX):
+            if self.archive is None:
+                raise RuntimeError(
+                    f"{point_key(point)} está en un RawArchive no adjunto al journal"
+                )
+            return self.archive.get(point_key(point))
+        with open(self.raw_dir / location, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline().decode("utf-8"))
+
+    def claim_shard(
+        self, shards: Iterable[str], owner: str, lease: float = 900.0
+    ) -> Optional[str]:
+        """Atomically claim the first shard nobody else is working on.
+
+        A shard is free when it was never claimed, or when its claim is
+        unfinished and older than ``lease`` (its worker died).
+
+        Args:
+            shards: Candidate shard ids, in preferred order
+            owner: Id of the claiming worker
+            lease: Seconds after which an unfinished claim can be taken over
+
+        Returns:
+            str: The claimed shard, or None when every shard is taken
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            taken = {
+                shard
+                for shard, finished_at, claimed_at in self.conn.execute(
+                    "SELECT shard, finished_at, claimed_at FROM claims"
+                )
+                if finished_at is not None or claimed_at > now - lease
+            }
+            shard = next((s for s in shards if s not in taken), None)
+            if shard is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO claims (shard, owner, claimed_at) "
+                    "VALUES (?, ?, ?)",
+                    (shard, owner, now),
+                )
+            self.conn.commit()
+            return shard
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def renew_shard(self, shard: str, owner: str) -> bool:
+        """Extend ``owner``'s lease on an unfinished shard.
+
+        Returns:
+            bool: False when the claim was taken over (or finished) meanwhile
+        """
+        cur = self.conn.execute(
+            "UPDATE claims SET claimed_at = ? "
+            "WHERE shard = ? AND owner = ? AND finished_at IS NULL",
+            (time.time(), shard, owner),
+        )
+        self.conn.commit()
+        return cur.rowcount == 1
+
+    def finish_shard(self, shard: str, owner: str) -> bool:
+        """Mark a shard claimed by ``owner`` as finished.
+
+        Returns:
+            bool: False when ``owner`` no longer holds the claim
+        """
+        cur = self.conn.execute(
+            "UPDATE claims SET finished_at = ? "
+            "WHERE shard = ? AND owner = ? AND finished_at IS NULL",
+            (time.time(), shard, owner),
+        )
+        self.conn.commit()
+        return cur.rowcount == 1
+
+    def reset_claims(self):
+        """Forget every shard claim (start of a new sharded run)."""
+        self.conn.execute("DELETE FROM claims")
+        self.conn.commit()
+
+    def unfinished_shards(self, shards: Iterable[str]) -> List[str]:
+        """Return the shards of ``shards`` not marked finished."""
+        finished = {
+            row[0]
+            for row in self.conn.execute(
+                "SELECT shard FROM claims WHERE finished_at IS NOT NULL"
+            )
+        }
+        return [s for s in shards if s not in finished]
+
+    def point_stats(self, points: Iterable[Point]) -> Dict[int, Dict[str, int]]:
+        """Per-year totals of the recorded points among ``points``.
+
+        Returns:
+            dict: year -> ``total_points``, ``successful``, ``total_records``
+        """
+        wanted = set(points)
+        stats: Dict[int, Dict[str, int]] = {}
+        rows = self.conn.execute(
+            "SELECT year, month, day, hour, status, records FROM points"
+        )
+        for year, month, day, hour, status, records in rows:
+            if (year, month, day, hour) not in wanted:
+                continue
+            year_stats = stats.setdefault(
+                year, {"total_points": 0, "successful": 0, "total_records": 0}
+            )
+            year_stats["total_points"] += 1
+            if status == STATUS_DONE:
+                year_stats["successful"] += 1
+                year_stats["total_records"] += records
+        return stats
+
+    def summary(self) -> Dict[str, int]:
+        """Count points per status."""
+        rows = self.conn.execute("SELECT status, COUNT(*) FROM points GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def close(self):
+        """Close the SQLite connection."""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,142 @@
+"""Gap-aware planning for incremental historical scrapes.
+
+Re-running 2017-2025 to fill a handful of holes used to cost the full
+scrape. The planner expands a requested date/hour range into points and
+drops every point that already exists in one of the known sources:
+
+- the scrape journal (point granularity)
+- ``scraping_snapshots`` (point granularity, ``fecha_consultada``)
+- opt-in (``fact_days=True``): dates referenced by ``fact_interrupciones``
+  through ``dim_tiempo``, at day granularity. This over-covers:
+  ``dim_tiempo.fecha`` is the outage start date, not the queried date, so
+  a query on D+1 that returns an outage started on D marks D as covered
+  for every hour although D was never scraped. Use it only to seed a
+  planner when neither the journal nor the snapshots exist.
+"""
+
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.scrape_journal import Point, ScrapeJournal
+
+logger = logging.getLogger(__name__)
+
+
+def expand_points(start: date, end: date, hours: Iterable[int]) -> List[Point]:
+    """Expand an inclusive date range into (year, month, day, hour) points.
+
+    Args:
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        hours: Hours to sample each day
+
+    Returns:
+        List of points in calendar order
+    """
+    hours = sorted(hours)
+    points = []
+    current = start
+    while current <= end:
+        points.extend((current.year, current.month, current.day, h) for h in hours)
+        current += timedelta(days=1)
+    return points
+
+
+class ScrapePlanner:
+    """Emits only the points of a range that no source already covers.
+
+    Usage:
+        planner = ScrapePlanner(journal=journal)
+        planner.add_snapshots(repo.get_snapshot_points(start, end))
+        missing = planner.plan(expand_points(start, end, [0, 6, 12, 18]))
+
+    Attributes:
+        journal: Scrape journal consulted for completed points
+        fact_days: Whether days with facts (``add_covered_days``) count
+        last_plan: Points skipped per source in the last ``plan`` call
+    """
+
+    def __init__(
+        self, journal: Optional[ScrapeJournal] = None, fact_days: bool = False
+    ):
+        """Initialize the planner.
+
+        Args:
+            journal: Scrape journal consulted for completed points
+            fact_days: Treat days with facts as covered for every hour
+                (over-covers, see the module docstring)
+        """
+        self.journal = journal
+        self.fact_days = fact_days
+        self._snapshot_points: Set[Point] = set()
+        self._covered_days: Set[date] = set()
+        self.last_plan: Dict[str, int] = {}
+
+    def add_snapshots(self, fechas: Iterable):
+        """Mark ``scraping_snapshots.fecha_consultada`` values as covered.
+
+        Args:
+            fechas: datetimes or (year, month, day, hour) tuples
+        """
+        for fecha in fechas:
+            if isinstance(fecha, datetime):
+                fecha = (fecha.year, fecha.month, fecha.day, fecha.hour)
+            self._snapshot_points.add(tuple(fecha))
+
+    def add_covered_days(self, days: Iterable[date]):
+        """Mark whole days (dates with facts in the star schema) as covered.
+
+        Ignored unless the planner was built with ``fact_days=True``.
+        """
+        if not self.fact_days:
+            logger.warning(
+                "⚠️ Días con hechos ignorados: dim_tiempo.fecha es el inicio del "
+                "corte, no la fecha consultada (usa fact_days=True para forzarlo)"
+            )
+            return
+        self._covered_days.update(
+            d.date() if isinstance(d, datetime) else d for d in days
+        )
+
+    def plan(self, points: Iterable[Point]) -> List[Point]:
+        """Return the points not covered by any source, order preserved.
+
+        Args:
+            points: Requested points (see ``expand_points``)
+
+        Returns:
+            List of missing points
+        """
+        points = list(points)
+        journal_done = self.journal.completed() if self.journal is not None else set()
+
+        skipped: Counter = Counter()
+        missing = []
+        for point in points:
+            if point in journal_done:
+                skipped["journal"] += 1
+            elif point in self._snapshot_points:
+                skipped["snapshots"] += 1
+            elif date(point[0], point[1], point[2]) in self._covered_days:
+                skipped["fact_interrupciones"] += 1
+            else:
+                missing.append(point)
+
+        self.last_plan = {
+            "requested": len(points),
+            "missing": len(missing),
+            **skipped,
+        }
+        logger.info(
+            f"🧭 Plan: {len(missing):,}/{len(points):,} puntos faltantes "
+            f"(journal: {skipped['journal']:,}, snapshots: {skipped['snapshots']:,}, "
+            f"fact: {skipped['fact_interrupciones']:,})"
+        )
+        return missing
+
+    @staticmethod
+    def missing_days(points: Iterable[Point]) -> List[date]:
+        """Distinct dates of a list of points, sorted."""
+        return sorted({date(y, m, d) for y, m, d, _ in points})
@@ -0,0 +1,345 @@
+"""Checkpoint sinks for historical scraping results.
+
+Point results arrive out of order from the async work queue. A sink
+receives each one as soon as it completes and decides how and when it is
+persisted.
+
+- ``PartitionedNDJSONSink`` streams every point to compressed NDJSON files
+  partitioned by ``year=YYYY/month=MM``; memory stays flat.
+- ``YearCheckpointSink`` keeps a year in memory and writes the legacy
+  ``checkpoint_{year}.json``.
+"""
+
+import gzip
+import io
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # gzip como respaldo si zstandard no está instalado
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[int, int, int, int]
+
+MANIFEST_NAME = "_manifest.json"
+SUFFIXES = {"zstd": ".ndjson.zst", "gzip": ".ndjson.gz"}
+
+
+def default_compression() -> str:
+    """``zstd`` when ``zstandard`` is installed, else ``gzip``."""
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _open_partition_writer(path: Path, compression: str):
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard no está instalado: pip install zstandard")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def iter_partition(path) -> Iterator[dict]:
+    """Yield the point results stored in one NDJSON partition file."""
+    path = Path(path)
+    if path.name.endswith(SUFFIXES["zstd"]):
+        if zstandard is None:
+            raise ImportError("zstandard no está instalado: pip install zstandard")
+        raw = zstandard.ZstdDecompressor().stream_reader(
+            open(path, "rb"), read_across_frames=True, closefd=True
+        )
+    else:
+        raw = gzip.open(path, "rb")
+
+    with io.TextIOWrapper(raw, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_dataset(
+    dataset_dir,
+    start_year: Optional[int] = None,
+    end_year: Optional[int] = None,
+) -> Iterator[dict]:
+    """Yield every point result of a partitioned dataset, month by month.
+
+    Args:
+        dataset_dir: Directory written by ``PartitionedNDJSONSink``
+        start_year: Skip partitions before this year
+        end_year: Skip partitions after this year
+    """
+    for path in sorted(Path(dataset_dir).glob("year=*/month=*/part*.ndjson.*")):
+        year = int(path.parent.parent.name.split("=")[1])
+        if start_year and year < start_year:
+            continue
+        if end_year and year > end_year:
+            continue
+        yield from iter_partition(path)
+
+
+def write_manifest(
+    dataset_dir,
+    years: Dict[int, dict],
+    metadata: dict,
+    compression: str,
+) -> Path:
+    """Write ``_manifest.json`` for a partitioned dataset.
+
+    Args:
+        dataset_dir: Root directory of the partitions
+        years: year -> summary metadata (``total_points``, ``successful``...)
+        metadata: Run metadata (totals, years, hours...)
+        compression: ``"zstd"`` or ``"gzip"``
+
+    Returns:
+        Path: The manifest file
+    """
+    dataset_dir = Path(dataset_dir)
+    partitions = sorted(
+        dataset_dir.glob(f"year=*/month=*/part{SUFFIXES[compression]}")
+    )
+    manifest = {
+        "metadata": {**metadata, "format": "ndjson", "compression": compression},
+        "years": {str(y): meta for y, meta in sorted(years.items())},
+        "partitions": [str(p.relative_to(dataset_dir)) for p in partitions],
+    }
+    manifest_file = dataset_dir / MANIFEST_NAME
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest_file
+
+
+class PartitionedNDJSONSink:
+    """Streams point results to ``year=YYYY/month=MM/part.ndjson.{zst,gz}``.
+
+    Each result is compressed and written the moment it arrives; only
+    per-year counters stay in memory. A month's file is closed as soon as
+    its last expected point is written.
+
+    With ``part_tag`` the months are staged in ``_claim-<tag>`` files that
+    readers ignore, and only ``commit`` moves them into place.
+
+    Attributes:
+        dataset_dir: Root directory of the partitions
+        compression: ``"zstd"`` or ``"gzip"``
+    """
+
+    def __init__(
+        self,
+        dataset_dir: Path,
+        points: Iterable[Point],
+        compression: Optional[str] = None,
+        part_tag: Optional[str] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            dataset_dir: Root directory of the partitions
+            points: Every point that will be added (sets the expected counts)
+            compression: ``"zstd"`` or ``"gzip"`` (default: zstd if available)
+            part_tag: Stage partitions under a private name until ``commit``
+        """
+        self.dataset_dir = Path(dataset_dir)
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        self.compression = compression or default_compression()
+        self.suffix = SUFFIXES[self.compression]
+        self.part_tag = part_tag
+        self._staged: Dict[Path, Path] = {}
+
+        points = list(points)
+        self.expected = Counter(p[0] for p in points)
+        self._month_expected = Counter(p[:2] for p in points)
+        self._month_done: Counter = Counter()
+        self._writers: Dict[Tuple[int, int], object] = {}
+        self._stats: Dict[int, Counter] = defaultdict(Counter)
+        self._finished: Dict[int, dict] = {}
+        self._opened_at = time.time()
+
+    def _partition_path(self, year: int, month: int) -> Path:
+        partition = self.dataset_dir / f"year={year}" / f"month={month:02d}"
+        partition.mkdir(parents=True, exist_ok=True)
+        final = partition / f"part{self.suffix}"
+        if self.part_tag is None:
+            return final
+        staged = partition / f"_claim-{self.part_tag}{self.suffix}"
+        self._staged[staged] = final
+        return staged
+
+    def add(self, point: Point, result: dict) -> Optional[dict]:
+        """Write one point result to its month partition.
+
+        Args:
+            point: (year, month, day, hour) tuple
+            result: Point result as returned by the engine
+
+        Returns:
+            dict: The year summary if this point completed its year, else None
+        """
+        year, month = point[0], point[1]
+        writer = self._writers.get((year, month))
+        if writer is None:
+            writer = _open_partition_writer(
+                self._partition_path(year, month), self.compression
+            )
+            self._writers[(year, month)] = writer
+
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        writer.write(line.encode("utf-8"))
+
+        stats = self._stats[year]
+        stats["total_points"] += 1
+        stats["successful"] += 1 if result.get("success") else 0
+        stats["total_records"] += len(result.get("data") or [])
+
+        self._month_done[(year, month)] += 1
+        if self._month_done[(year, month)] >= self._month_expected[(year, month)]:
+            self._writers.pop((year, month)).close()
+
+        if stats["total_points"] >= self.expected.get(year, 0):
+            self._finished[year] = self.year_data(year)
+            return self._finished[year]
+        return None
+
+    def year_data(self, year: int) -> dict:
+        """Return the summary of a year (results live on disk, not here)."""
+        if year in self._finished:
+            return self._finished[year]
+
+        stats = self._stats[year]
+        return {
+            "metadata": {
+                "year": year,
+                "total_points": stats["total_points"],
+                "successful": stats["successful"],
+                "total_records": stats["total_records"],
+                "duration": time.time() - self._opened_at,
+            },
+            "data": [],
+        }
+
+    def partitions(self) -> List[Path]:
+        """Partition files currently in the dataset directory."""
+        return sorted(self.dataset_dir.glob(f"year=*/month=*/part{self.suffix}"))
+
+    def write_manifest(self, metadata: dict) -> Path:
+        """Write ``_manifest.json`` describing the dataset.
+
+        Args:
+            metadata: Run metadata (totals, years, hours...)
+
+        Returns:
+            Path: The manifest file
+        """
+        return write_manifest(
+            self.dataset_dir,
+            {y: self.year_data(y)["metadata"] for y in self.expected},
+            metadata,
+            self.compression,
+        )
+
+    def close(self):
+        """Flush and close every open partition."""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+    def commit(self):
+        """Close and move staged partitions (``part_tag``) into place."""
+        self.close()
+        for staged, final in self._staged.items():
+            staged.replace(final)
+        self._staged.clear()
+
+    def discard(self):
+        """Close and delete staged partitions (``part_tag``)."""
+        self.close()
+        for staged in self._staged:
+            staged.unlink(missing_ok=True)
+        self._staged.clear()
+
+
+class YearCheckpointSink:
+    """Collects point results per year and writes ``checkpoint_{year}.json``.
+
+    A year's checkpoint is written as soon as its last expected point
+    arrives, so finished years are safe on disk while later years are
+    still being scraped.
+
+    Attributes:
+        output_dir: Directory where checkpoints are written
+        expected: Number of points expected per year
+    """
+
+    def __init__(self, output_dir: Path, expected: Dict[int, int]):
+        """Initialize the sink.
+
+        Args:
+            output_dir: Directory where checkpoints are written
+            expected: Number of points expected per year
+        """
+        self.output_dir = Path(output_dir)
+        self.expected = dict(expected)
+        self._results: Dict[int, List[Tuple[Point, dict]]] = defaultdict(list)
+        self._written: Dict[int, dict] = {}
+        self._opened_at = time.time()
+
+    def add(self, point: Point, result: dict) -> Optional[dict]:
+        """Record one point result.
+
+        Args:
+            point: (year, month, day, hour) tuple
+            result: Point result as returned by the engine
+
+        Returns:
+            dict: The year data if this point completed its year, else None
+        """
+        year = point[0]
+        self._results[year].append((point, result))
+
+        if len(self._results[year]) >= self.expected.get(year, 0):
+            return self._write_year(year)
+        return None
+
+    def year_data(self, year: int) -> dict:
+        """Return the checkpoint structure for a year (written or not)."""
+        if year in self._written:
+            return self._written[year]
+
+        results = [r for _, r in sorted(self._results[year], key=lambda pr: pr[0])]
+        return {
+            "metadata": {
+                "year": year,
+                "total_points": len(results),
+                "successful": sum(1 for r in results if r.get("success")),
+                "total_records": sum(len(r.get("data", [])) for r in results),
+                "duration": time.time() - self._opened_at,
+            },
+            "data": results,
+        }
+
+    def _write_year(self, year: int) -> dict:
+        year_data = self.year_data(year)
+
+        checkpoint_file = self.output_dir / f"checkpoint_{year}.json"
+        with open(checkpoint_file, "w", encoding="utf-8") as f:
+            json.dump(year_data, f, indent=2, ensure_ascii=False)
+        logger.info(f"💾 Checkpoint guardado: {checkpoint_file}")
+
+        self._written[year] = year_data
+        return year_data
+
+    def close(self):
+        """Write checkpoints for years that did not complete."""
+        for year in self._results:
+            if year not in self._written:
+                self._write_year(year)
+
+
+Sink = Union[PartitionedNDJSONSink, YearCheckpointSink]
@@ -1,9 +1,14 @@
 ﻿from playwright.sync_api import Response, sync_playwright
 import logging
+import time
+from typing import Optional
+
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 from config import URL_SEC_PRINCIPAL
+from core.lean_navigation import apply_lean_profile, is_por_fecha_response
 from core.retry_handler import retry_with_backoff
+from core.session_store import SessionStore
 
 # Configurar logger
 logger = logging.getLogger(__name__)
@@ -21,10 +26,17 @@ class SECScraper:
         hora_server (str): Official date and time reported by SEC server.
     """
 
-    def __init__(self):
-        """Initializes the scraper object with empty lists and values."""
+    def __init__(self, session_store: Optional[SessionStore] = None):
+        """Initializes the scraper object with empty lists and values.
+
+        Args:
+            session_store: On-disk session state used to seed the browser
+                context and refreshed after each successful run
+                (default: ``SessionStore.from_env()``)
+        """
         self.registros = []
         self.hora_server = None
+        self.session_store = session_store or SessionStore.from_env()
 
     def handle_response(self, response: Response):
         """Event handler to intercept network responses.
@@ -76,8 +88,9 @@ class SECScraper:
     def run(self) -> dict:
         """Starts the navigation and data capture process.
 
-        Launches a headless browser, navigates to the SEC page,
-        waits for AJAX requests and returns the results.
+        Launches a headless browser with the lean navigation profile,
+        navigates to the SEC page, waits until the page's own
+        ``GetPorFecha`` response arrives and returns the results.
 
         Includes automatic retry with exponential backoff on failures.
 
@@ -90,23 +103,40 @@ class SECScraper:
         self.registros = []  # Limpiamos el saco
         self.hora_server = None
         logger.info("🚀 Iniciando navegador...")
+        state = None
 
         try:
             with sync_playwright() as p:
                 # Usar un User-Agent real para evitar bloqueos
                 user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
                 browser = p.chromium.launch(headless=True)
-                context = browser.new_context(user_agent=user_agent)
+                if self.session_store is not None:
+                    state = self.session_store.load()
+                    if state is not None:
+                        user_agent = self.session_store.user_agent or user_agent
+                context = browser.new_context(
+                    user_agent=user_agent, storage_state=state
+                )
+                apply_lean_profile(context)
                 page = context.new_page()
 
                 page.on("response", self.handle_response)
 
-                logger.info("📍 Navegando a la SEC...")
-                page.goto(URL_SEC_PRINCIPAL, timeout=60000)
+                # En vez de esperar 30s fijos, esperamos la respuesta de datos
+                logger.info("📍 Navegando a la SEC (esperando GetPorFecha)...")
+                with page.expect_response(is_por_fecha_response, timeout=60000):
+                    page.goto(URL_SEC_PRINCIPAL, timeout=60000)
+
+                # El handler procesa la respuesta en el mismo ciclo de eventos;
+                # damos un margen corto a GetHoraServer si aún no llegó
+                deadline = time.time() + 5
+                while (not self.registros or self.hora_server is None) and (
+                    time.time() < deadline
+                ):
+                    page.wait_for_timeout(100)
 
-                # Esperamos un tiempo prudente para que la página tire sus peticiones AJAX
-                logger.info("⏳ Esperando datos (30s)...")
-                page.wait_for_timeout(30000)
+                if self.session_store is not None and self.registros:
+                    self.session_store.save(context.storage_state(), user_agent)
 
                 browser.close()
 
@@ -123,7 +153,14 @@ class SECScraper:
 
         except PlaywrightTimeoutError as e:
             logger.error(f"❌ Timeout en navegación: {str(e)}")
+            self._drop_restored_session(state)
             raise
         except Exception as e:
             logger.error(f"❌ Error en scraping: {str(e)}")
+            self._drop_restored_session(state)
             raise
+
+    def _drop_restored_session(self, state: Optional[dict]):
+        """Forget a restored session that did not get data out of SEC."""
+        if state is not None:
+            self.session_store.clear()
@@ -0,0 +1,183 @@
+"""Browser-side fetch scripts and request fingerprints for the SEC API.
+
+Shared by the historical scrapers and the browser pool so every session
+talks to ``apps.sec.cl`` with the same payloads and headers.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+FETCH_SEC_DATA_SCRIPT = """
+                    async (payload) => {
+                        try {
+                            const response = await fetch('https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetPorFecha', {
+                                method: 'POST',
+                                headers: {
+                                    'Content-Type': 'application/json; charset=utf-8'
+                                },
+                                body: JSON.stringify(payload)
+                            });
+                            
+                            if (!response.ok) {
+                                return { error: `HTTP ${response.status}`, data: null };
+                            }
+                            
+                            const data = await response.json();
+
+                            return { data: data, error: null };
+                        } catch (e) {
+                            return { error: e.toString(), data: null };
+                        }
+                    }
+                """
+# Hora oficial del servidor. Se consulta una vez por sesión (ver ServerClock)
+# en lugar de después de cada GetPorFecha.
+FETCH_HORA_SERVER_SCRIPT = """
+                    async () => {
+                        try {
+                            const response = await fetch('https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetHoraServer', {
+                                method: 'POST',
+                                headers: {
+                                    'Content-Type': 'application/json; charset=utf-8'
+                                }
+                            });
+
+                            if (!response.ok) {
+                                return { error: `HTTP ${response.status}`, horaServer: null };
+                            }
+
+                            return { horaServer: await response.json(), error: null };
+                        } catch (e) {
+                            return { error: e.toString(), horaServer: null };
+                        }
+                    }
+                """
+
+# Variante por lotes: recibe {payloads, concurrency} y ejecuta los fetch con un
+# Promise.all acotado dentro de la página. Devuelve un resultado por payload,
+# en el mismo orden, con la misma forma que FETCH_SEC_DATA_SCRIPT.
+FETCH_SEC_DATA_BATCH_SCRIPT = """
+                    async ({ payloads, concurrency }) => {
+                        const headers = { 'Content-Type': 'application/json; charset=utf-8' };
+
+                        const fetchOne = async (payload) => {
+                            try {
+                                const response = await fetch('https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetPorFecha', {
+                                    method: 'POST',
+                                    headers: headers,
+                                    body: JSON.stringify(payload)
+                                });
+
+                                if (!response.ok) {
+                                    return { error: `HTTP ${response.status}`, data: null };
+                                }
+
+                                const data = await response.json();
+
+                                return { data: data, error: null };
+                            } catch (e) {
+                                return { error: e.toString(), data: null };
+                            }
+                        };
+
+                        const results = new Array(payloads.length);
+                        let next = 0;
+                        const worker = async () => {
+                            while (next < payloads.length) {
+                                const i = next++;
+                                results[i] = await fetchOne(payloads[i]);
+                            }
+                        };
+
+                        const workers = Math.max(1, Math.min(concurrency, payloads.length));
+                        await Promise.all(Array.from({ length: workers }, worker));
+                        return results;
+                    }
+                """
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:122.0) Gecko/20100101 Firefox/122.0",
+]
+EXTRA_HEADERS = {
+    "Accept-Language": "es-CL,es;q=0.9,en;q=0.8",
+    "Referer": "https://www.sec.cl/",
+    "sec-ch-ua-platform": '"Windows"',
+    "sec-ch-ua": '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+}
+
+
+class ServerClock:
+    """SEC server time cached as an offset from the local clock.
+
+    ``GetHoraServer`` is fetched once per session (or every
+    ``refresh_interval`` seconds) and each point's ``hora_server`` is derived
+    locally, halving the requests sent per point.
+
+    Attributes:
+        offset: Server time minus local time, or None before the first sync
+        refresh_interval: Seconds between syncs (None: once per session)
+    """
+
+    FECHA_FORMAT = "%d/%m/%Y %H:%M"
+
+    def __init__(
+        self, refresh_interval: Optional[float] = None, retry_after: float = 60.0
+    ):
+        """Initialize an unsynchronized clock.
+
+        Args:
+            refresh_interval: Seconds between syncs (default: once per session)
+            retry_after: Seconds to wait before retrying a failed sync
+        """
+        self.refresh_interval = refresh_interval
+        self.retry_after = retry_after
+        self.offset: Optional[timedelta] = None
+        self._synced_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+
+    def needs_refresh(self) -> bool:
+        """Whether ``GetHoraServer`` should be queried again."""
+        now = time.monotonic()
+        if self.offset is None:
+            return (
+                self._attempted_at is None
+                or now - self._attempted_at >= self.retry_after
+            )
+        if self.refresh_interval is None:
+            return False
+        return now - self._synced_at >= self.refresh_interval
+
+    def update(self, hora_server_raw) -> bool:
+        """Sync the offset from a raw ``GetHoraServer`` response.
+
+        Args:
+            hora_server_raw: Response as returned by SEC, e.g.
+                [{"FECHA": "23/05/2024 15:30"}]
+
+        Returns:
+            bool: True if the response could be parsed
+        """
+        self._attempted_at = time.monotonic()
+        try:
+            fecha_str = (
+                hora_server_raw[0].get("FECHA")
+                if isinstance(hora_server_raw, list)
+                else hora_server_raw
+            )
+            server_dt = datetime.strptime(fecha_str, self.FECHA_FORMAT)
+        except (ValueError, TypeError, IndexError, AttributeError):
+            return False
+
+        self.offset = server_dt - datetime.now()
+        self._synced_at = self._attempted_at
+        return True
+
+    def hora_server(self) -> Optional[list]:
+        """Current server time in the ``GetHoraServer`` response format."""
+        if self.offset is None:
+            return None
+        server_now = datetime.now() + self.offset
+        return [{"FECHA": server_now.strftime(self.FECHA_FORMAT)}]
@@ -0,0 +1,161 @@
+"""On-disk persistence of Playwright session state across scraper restarts.
+
+Every process start used to repeat the sec.cl/Cloudflare warm-up. The
+store keeps a context's ``storage_state`` (cookies and localStorage)
+together with the user agent that obtained it, so new contexts can be
+seeded from disk and go straight to the INTONLINE app.
+
+Set ``SEC_SESSION_STATE`` to a file path to enable it for every scraper
+(see ``SessionStore.from_env``).
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from core.lean_navigation import has_valid_session
+
+logger = logging.getLogger(__name__)
+
+SESSION_STATE_ENV = "SEC_SESSION_STATE"
+SESSION_TTL_ENV = "SEC_SESSION_TTL"
+DEFAULT_TTL = 6 * 3600
+# Respuesta de SEC a cookies que ya no valen (los scripts de fetch la
+# reportan como "HTTP 403"; el modo HTTP lanza ChallengeDetected)
+REJECTED_PREFIX = "HTTP 403"
+
+
+def is_session_rejected(error) -> bool:
+    """Whether a fetch error means SEC rejected the session cookies."""
+    return bool(error) and str(error).startswith(REJECTED_PREFIX)
+
+
+class SessionStore:
+    """JSON file holding one Playwright ``storage_state`` with an expiry.
+
+    Usage:
+        store = SessionStore("outputs/session/sec_storage_state.json")
+        context = browser.new_context(
+            storage_state=store.load(), user_agent=store.user_agent or ua
+        )
+        ...
+        store.save(context.storage_state(), ua)
+
+    Attributes:
+        path: File where the state is stored
+        ttl: Seconds a saved state is considered usable
+    """
+
+    def __init__(self, path, ttl: float = DEFAULT_TTL):
+        """Initialize the store.
+
+        Args:
+            path: File where the state is stored
+            ttl: Seconds a saved state is considered usable (default: 6h)
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self._cached: Optional[dict] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["SessionStore"]:
+        """Build a store from ``SEC_SESSION_STATE`` / ``SEC_SESSION_TTL``.
+
+        Returns:
+            SessionStore: The configured store, or None if the variable is unset
+        """
+        path = os.getenv(SESSION_STATE_ENV)
+        if not path:
+            return None
+        return cls(path, ttl=float(os.getenv(SESSION_TTL_ENV, DEFAULT_TTL)))
+
+    def _read(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Estado de sesión ilegible ({self.path}): {e}")
+            return None
+
+    def load(self) -> Optional[dict]:
+        """Return the saved ``storage_state`` if it is still usable.
+
+        Expired cookies are dropped; the state is discarded when it is
+        older than ``ttl`` or no valid sec.cl cookie remains.
+
+        Returns:
+            dict: A ``storage_state`` for ``Browser.new_context``, or None
+        """
+        saved = self._read()
+        if not saved:
+            return None
+
+        age = time.time() - saved.get("saved_at", 0)
+        if age > self.ttl:
+            logger.info(f"🕒 Sesión guardada expirada ({age / 3600:.1f}h)")
+            return None
+
+        state = saved.get("storage_state") or {}
+        now = time.time()
+        cookies = [
+            c
+            for c in state.get("cookies", [])
+            if c.get("expires", -1) is None
+            or c.get("expires", -1) < 0
+            or c.get("expires", -1) > now
+        ]
+        if not has_valid_session(cookies, now=now):
+            return None
+
+        self._cached = saved
+        logger.info(f"🍪 Sesión reutilizada desde disco ({age / 60:.0f} min)")
+        return {**state, "cookies": cookies}
+
+    @property
+    def user_agent(self) -> Optional[str]:
+        """User agent that obtained the saved state."""
+        saved = self._cached or self._read()
+        return saved.get("user_agent") if saved else None
+
+    def save(self, storage_state: dict, user_agent: str):
+        """Persist a context's ``storage_state`` atomically.
+
+        Args:
+            storage_state: Result of ``BrowserContext.storage_state()``
+            user_agent: User agent of the context (cookies are bound to it)
+        """
+        saved = {
+            "saved_at": time.time(),
+            "user_agent": user_agent,
+            "storage_state": storage_state,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Nombre temporal único: varios workers (shards) guardan a la vez
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.path.parent,
+            prefix=self.path.name + ".",
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            json.dump(saved, f, ensure_ascii=False)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+        self._cached = saved
+
+    def clear(self):
+        """Forget the saved state (e.g. after SEC rejects it)."""
+        self._cached = None
+        if self.path.exists():
+            logger.warning(f"🗑️ Descartando sesión guardada: {self.path}")
+            self.path.unlink(missing_ok=True)
@@ -0,0 +1,445 @@
+"""Multi-process sharded backfill of historical SEC data.
+
+One asyncio process driving Chromium tops out at one CPU core for JSON
+decoding and result handling. The launcher splits the requested range into
+month shards and starts N worker processes, each with its own browser
+engine and event loop. Workers claim shards through the shared point
+journal (so no two work on the same month), write that month's NDJSON
+partition and journal every point into the shared raw archive. The parent
+only polls the journal to print one aggregated progress/ETA line, and
+writes the dataset manifest when every worker is done.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.raw_archive import RawArchive
+from core.scrape_journal import ScrapeJournal
+from core.scrape_planner import ScrapePlanner, expand_points
+from core.scrape_sinks import (
+    PartitionedNDJSONSink,
+    Point,
+    default_compression,
+    write_manifest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def shard_id(point: Point) -> str:
+    """Shard (month) a point belongs to, e.g. ``"2017-01"``."""
+    return f"{point[0]}-{point[1]:02d}"
+
+
+def format_progress(
+    recorded: int,
+    total: int,
+    baseline: int,
+    elapsed: float,
+    alive: int,
+    workers: int,
+) -> str:
+    """One aggregated progress line with throughput and ETA.
+
+    Args:
+        recorded: Points recorded in the journal so far
+        total: Points requested
+        baseline: Points already recorded when the run started
+        elapsed: Seconds since the run started
+        alive: Worker processes still running
+        workers: Worker processes launched
+    """
+    rate = (recorded - baseline) / elapsed if elapsed > 0 else 0.0
+    remaining = max(total - recorded, 0)
+    eta = f"{remaining / rate / 60:.1f} min" if rate > 0 else "--"
+    return (
+        f"  ⏱️ {recorded:,}/{total:,} ({recorded / max(total, 1) * 100:.1f}%) "
+        f"| {rate:.2f} puntos/s | ETA {eta} | workers {alive}/{workers}"
+    )
+
+
+class ShardLost(Exception):
+    """The worker's claim on a shard expired and was taken over."""
+
+
+class ClaimedShardSink(PartitionedNDJSONSink):
+    """Partition sink for one claimed shard.
+
+    Partitions are staged under the owner's tag, the lease is renewed as
+    points arrive, and the month only replaces ``part.ndjson.*`` in
+    ``finish`` if the claim is still ours. A worker that lost its claim
+    (it stalled past the lease and another one took the shard) stops
+    writing and its staged file is dropped.
+    """
+
+    def __init__(
+        self,
+        dataset_dir: Path,
+        points: List[Point],
+        journal: ScrapeJournal,
+        shard: str,
+        owner: str,
+        lease: float,
+        compression: Optional[str] = None,
+    ):
+        """Initialize the sink.
+
+        Args:
+            dataset_dir: Root directory of the partitions
+            points: Points of the shard
+            journal: Journal holding the claim
+            shard: Claimed shard id
+            owner: Id of the claiming worker
+            lease: Claim lease in seconds (renewed every quarter of it)
+            compression: ``"zstd"`` or ``"gzip"``
+        """
+        tag = "".join(c if c.isalnum() else "-" for c in owner)
+        super().__init__(dataset_dir, points, compression=compression, part_tag=tag)
+        self.journal = journal
+        self.shard = shard
+        self.owner = owner
+        self.renew_every = lease / 4
+        self._renewed_at = time.time()
+        self.lost = False
+
+    def _check_claim(self):
+        if self.lost:
+            raise ShardLost(self.shard)
+        if time.time() - self._renewed_at < self.renew_every:
+            return
+        if not self.journal.renew_shard(self.shard, self.owner):
+            self.lost = True
+            raise ShardLost(self.shard)
+        self._renewed_at = time.time()
+
+    def add(self, point: Point, result: dict) -> Optional[dict]:
+        self._check_claim()
+        return super().add(point, result)
+
+    def finish(self) -> bool:
+        """Publish the shard's partition and mark it finished, if still ours."""
+        if self.lost or not self.journal.renew_shard(self.shard, self.owner):
+            self.discard()
+            return False
+        self.commit()
+        return self.journal.finish_shard(self.shard, self.owner)
+
+
+def run_shard_worker(worker_id: int, config: dict):
+    """Process entry point: claim and scrape shards until none are left.
+
+    Args:
+        worker_id: Index of the worker (names its log file)
+        config: Picklable settings built by ``ShardedBackfill``
+    """
+    log_file = Path(config["log_dir"]) / f"worker_{worker_id:02d}.log"
+    with open(log_file, "a", encoding="utf-8", buffering=1) as log:
+        # La vista de progreso es la del padre; cada worker escribe a su log
+        sys.stdout = sys.stderr = log
+        asyncio.run(_worker_loop(worker_id, config))
+
+
+async def _worker_loop(worker_id: int, config: dict):
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    archive = RawArchive(config["archive_dir"])
+    journal = ScrapeJournal(config["journal_path"], archive=archive)
+    scraper = AsyncHistoricalScraper(
+        start_year=config["start_year"],
+        end_year=config["end_year"],
+        max_concurrent=config["max_concurrent"],
+        hours=config["hours"],
+        output_dir=config["output_dir"],
+        num_pages=config["num_pages"],
+        dataset_name=config["dataset_name"],
+        adaptive=config["adaptive"],
+        journal=journal,
+    )
+    shards: Dict[str, List[Point]] = config["shards"]
+
+    try:
+        while True:
+            shard = journal.claim_shard(shards, owner, lease=config["lease"])
+            if shard is None:
+                break
+            print(f"🧩 Worker {worker_id} ({owner}) toma el shard {shard}")
+            points = [tuple(p) for p in shards[shard]]
+            sink = ClaimedShardSink(
+                scraper.dataset_dir,
+                points,
+                journal,
+                shard,
+                owner,
+                lease=config["lease"],
+                compression=config["compression"],
+            )
+            try:
+                await scraper.scrape_points(points, sink)
+            except ShardLost:
+                # Otro worker tomó el shard: lo ya journalizado no se pierde
+                print(f"⚠️ Worker {worker_id} perdió el shard {shard} (lease vencido)")
+                sink.discard()
+                continue
+            except BaseException:
+                sink.discard()
+                raise
+            if not sink.finish():
+                print(f"⚠️ Worker {worker_id} perdió el shard {shard} (lease vencido)")
+    finally:
+        await scraper.engine.close()
+        journal.close()
+        archive.close()
+
+
+class ShardedBackfill:
+    """Runs a historical backfill across several worker processes.
+
+    Usage:
+        backfill = ShardedBackfill(2017, 2025, workers=16, max_concurrent=64)
+        backfill.run()
+
+    Attributes:
+        workers: Number of worker processes
+        journal_path: Shared point journal (also holds the shard claims)
+        dataset_dir: Partitioned NDJSON dataset written by the workers
+    """
+
+    def __init__(
+        self,
+        start_year: int,
+        end_year: int,
+        workers: Optional[int] = None,
+        max_concurrent: int = 64,
+        hours: Optional[List[int]] = None,
+        output_dir: str = "outputs",
+        num_pages: int = 2,
+        dataset_name: Optional[str] = None,
+        adaptive: bool = False,
+        planner: Optional[ScrapePlanner] = None,
+        lease: float = 900.0,
+        progress_interval: float = 15.0,
+        worker_target: Callable[[int, dict], None] = run_shard_worker,
+    ):
+        """Initialize the launcher.
+
+        Args:
+            start_year: First year to scrape
+            end_year: Last year to scrape
+            workers: Worker processes (default: one per CPU core)
+            max_concurrent: Total in-flight requests, split across workers
+                so SEC sees the same load as a single-process run
+            hours: Hours to scrape per day (default: [0, 6, 12, 18])
+            output_dir: Output directory (default: "outputs")
+            num_pages: Warmed browser pages per worker (default: 2)
+            dataset_name: Dataset name, as in ``AsyncHistoricalScraper``
+            adaptive: Enable the AIMD controller inside every worker
+            planner: Gap planner; only months with missing points are
+                sharded, together with their journaled points (restored, not
+                fetched, so the rewritten partition keeps them)
+            lease: Seconds before a dead worker's shard can be reclaimed;
+                live workers renew it as their points arrive
+            progress_interval: Seconds between progress lines
+            worker_target: Process entry point (tests swap in a fake)
+        """
+        self.start_year = start_year
+        self.end_year = end_year
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent
+        self.hours = hours or [0, 6, 12, 18]
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.num_pages = num_pages
+        self.dataset_name = dataset_name or f"dataset_{start_year}_{end_year}.json"
+        self.dataset_dir = self.output_dir / Path(self.dataset_name).stem
+        self.adaptive = adaptive
+        self.planner = planner
+        self.lease = lease
+        self.progress_interval = progress_interval
+        self.worker_target = worker_target
+
+        self.journal_path = self.output_dir / "scrape_journal.sqlite"
+        self.archive_dir = self.output_dir / "bronze"
+        self.log_dir = self.output_dir / "shards"
+        self.compression = default_compression()
+
+    def _points(self) -> List[Point]:
+        points = expand_points(
+            date(self.start_year, 1, 1),
+            date(self.end_year, 12, 31),
+            self.hours,
+        )
+        self._gap_shards: Optional[Set[str]] = None
+        if self.planner is not None:
+            missing = self.planner.plan(points)
+            print(
+                f"🧭 Puntos faltantes: {len(missing):,}/"
+                f"{self.planner.last_plan['requested']:,}"
+            )
+            # Un shard reescribe el mes completo: lleva también los puntos del
+            # journal, que el worker restaura sin volver a pedirlos
+            with ScrapeJournal(self.journal_path) as journal:
+                done = journal.completed(points)
+            self._gap_shards = {shard_id(p) for p in missing}
+            missing = set(missing)
+            points = [p for p in points if p in missing or p in done]
+        return points
+
+    def _config(self, shards: Dict[str, List[Point]], workers: int) -> dict:
+        return {
+            "start_year": self.start_year,
+            "end_year": self.end_year,
+            "max_concurrent": max(1, self.max_concurrent // workers),
+            "hours": self.hours,
+            "output_dir": str(self.output_dir),
+            "num_pages": self.num_pages,
+            "dataset_name": self.dataset_name,
+            "adaptive": self.adaptive,
+            "journal_path": str(self.journal_path),
+            "archive_dir": str(self.archive_dir),
+            "log_dir": str(self.log_dir),
+            "compression": self.compression,
+            "lease": self.lease,
+            "shards": shards,
+        }
+
+    def run(self) -> dict:
+        """Launch the workers, report progress and write the manifest.
+
+        Returns:
+            dict: Run metadata (totals, unfinished shards, duration...)
+        """
+        points = self._points()
+        shards: Dict[str, List[Point]] = defaultdict(list)
+        for point in points:
+            shards[shard_id(point)].append(point)
+        if self._gap_shards is not None:
+            # Meses sin huecos: su partición ya está completa en disco
+            shards = {s: p for s, p in shards.items() if s in self._gap_shards}
+        shards = dict(shards)
+        workers = min(self.workers, max(len(shards), 1))
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        journal = ScrapeJournal(self.journal_path)
+        journal.reset_claims()
+        # Sin claims vivos, los parciales de workers muertos son basura
+        for staged in self.dataset_dir.glob("year=*/month=*/_claim-*"):
+            staged.unlink()
+
+        print("=" * 70)
+        print("SHARDED BACKFILL")
+        print("=" * 70)
+        print(f"Años: {self.start_year}-{self.end_year}")
+        print(f"Shards (meses): {len(shards)} | Puntos: {len(points):,}")
+        print(
+            f"Workers: {workers} | Concurrencia total: {self.max_concurrent} "
+            f"({max(1, self.max_concurrent // workers)} por worker)"
+        )
+        print(f"Logs: {self.log_dir}")
+        print("=" * 70)
+
+        def recorded() -> int:
+            stats = journal.point_stats(points)
+            return sum(year["total_points"] for year in stats.values())
+
+        baseline = recorded()
+        start = time.time()
+
+        # spawn: cada worker arranca limpio (Playwright no tolera fork)
+        ctx = multiprocessing.get_context("spawn")
+        config = self._config(shards, workers)
+        processes = [
+            ctx.Process(target=self.worker_target, args=(i, config), daemon=False)
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            while any(p.is_alive() for p in processes):
+                for process in processes:
+                    process.join(timeout=self.progress_interval / len(processes))
+                print(
+                    format_progress(
+                        recorded(),
+                        len(points),
+                        baseline,
+                        time.time() - start,
+                        sum(p.is_alive() for p in processes),
+                        workers,
+                    )
+                )
+        except KeyboardInterrupt:
+            print("\n🛑 Interrumpido: deteniendo workers (el journal conserva el avance)")
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+            raise
+
+        failed_workers = [i for i, p in enumerate(processes) if p.exitcode != 0]
+        unfinished = journal.unfinished_shards(shards)
+        year_stats = journal.point_stats(points)
+        journal.close()
+        duration = time.time() - start
+
+        for i in failed_workers:
+            print(f"❌ Worker {i} terminó con código {processes[i].exitcode}")
+        if unfinished:
+            print(
+                f"⚠️ Shards sin terminar: {', '.join(unfinished)} "
+                "(vuelve a lanzar para completarlos)"
+            )
+
+        totals = {
+            key: sum(year[key] for year in year_stats.values())
+            for key in ("total_points", "successful", "total_records")
+        }
+        metadata = {
+            "title": "Dataset Completo - Interrupciones Eléctricas Chile",
+            "start_year": self.start_year,
+            "end_year": self.end_year,
+            "years": list(range(self.start_year, self.end_year + 1)),
+            "hours": self.hours,
+            "total_points": totals["total_points"],
+            "total_successful": totals["successful"],
+            "total_records": totals["total_records"],
+            "duration_minutes": duration / 60,
+            "scraping_date": datetime.now().isoformat(),
+            "concurrency": self.max_concurrent,
+            "workers": workers,
+            "unfinished_shards": unfinished,
+        }
+        if self.dataset_dir.exists():
+            write_manifest(
+                self.dataset_dir,
+                {
+                    year: {"year": year, **stats, "duration": duration}
+                    for year, stats in year_stats.items()
+                },
+                metadata,
+                self.compression,
+            )
+
+        print("\n" + "=" * 70)
+        print("✅ BACKFILL COMPLETADO" if not unfinished else "⚠️ BACKFILL INCOMPLETO")
+        print("=" * 70)
+        print(
+            f"Exitosos: {totals['successful']:,}/{len(points):,} | "
+            f"Registros: {totals['total_records']:,}"
+        )
+        print(
+            f"Duración: {duration / 60:.1f} min | "
+            f"{(totals['total_points'] - baseline) / max(duration, 1e-9):.2f} puntos/s"
+        )
+        print(f"💾 Dataset: {self.dataset_dir}")
+        print("=" * 70)
+        return metadata
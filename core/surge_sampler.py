@@ -0,0 +1,142 @@
+"""Adaptive temporal sampling around outage surges.
+
+Sampling every hour of every day costs 6x the default four hours, quiet
+days included. ``SurgeDetector`` plugs in as the sink of a coarse pass: it
+keeps, per day and region, the peak of affected customers seen at the
+sampled hours, then flags the days where some region jumps well above its
+own typical level (a storm, a snowfall). ``extra_points`` returns the
+missing hourly points of those days (plus a margin of neighbouring days)
+for a second, dense pass.
+"""
+
+import logging
+import statistics
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Point = Tuple[int, int, int, int]
+
+ALL_HOURS = list(range(24))
+
+
+class SurgeDetector:
+    """Finds surge days from the results of a coarse sampling pass.
+
+    A (day, region) is a surge when its peak of affected customers is at
+    least ``factor`` times the region's median daily peak and at least
+    ``min_affected`` customers.
+
+    Usage:
+        detector = SurgeDetector(factor=4.0)
+        await scraper.scrape_points(coarse_points, detector)
+        dense = detector.extra_points(hours=[0, 6, 12, 18])
+
+    Attributes:
+        factor: Multiple of the regional median that counts as a surge
+        min_affected: Minimum affected customers for a surge
+        pad_days: Neighbouring days densified around each surge day
+        dense_hours: Hours sampled on surge days
+    """
+
+    def __init__(
+        self,
+        factor: float = 4.0,
+        min_affected: int = 20000,
+        pad_days: int = 1,
+        dense_hours: Optional[Iterable[int]] = None,
+    ):
+        """Initialize the detector.
+
+        Args:
+            factor: Multiple of the regional median that counts as a surge
+            min_affected: Minimum affected customers for a surge (avoids
+                flagging tiny regions on noise)
+            pad_days: Neighbouring days densified around each surge day
+                (storms spill over midnight)
+            dense_hours: Hours sampled on surge days (default: all 24)
+        """
+        self.factor = factor
+        self.min_affected = min_affected
+        self.pad_days = pad_days
+        self.dense_hours = sorted(dense_hours) if dense_hours else ALL_HOURS
+
+        # (día, región) -> máximo de afectados entre las horas muestreadas
+        self._peaks: Dict[Tuple[date, str], int] = defaultdict(int)
+        self._days: Set[date] = set()
+
+    def add(self, point: Point, result: dict) -> None:
+        """Sink interface: fold one point result into the daily peaks."""
+        if not result.get("success", True):
+            return
+        day = date(point[0], point[1], point[2])
+        self._days.add(day)
+
+        by_region: Dict[str, int] = defaultdict(int)
+        for record in result.get("data") or []:
+            region = str(record.get("NOMBRE_REGION") or "DESCONOCIDO").strip().upper()
+            try:
+                by_region[region] += int(record.get("CLIENTES_AFECTADOS") or 0)
+            except (TypeError, ValueError):
+                continue
+
+        for region, affected in by_region.items():
+            key = (day, region)
+            if affected > self._peaks[key]:
+                self._peaks[key] = affected
+
+    def close(self):
+        """Sink interface (nothing to flush)."""
+
+    def baselines(self) -> Dict[str, float]:
+        """Median daily peak per region over every observed day.
+
+        Days a region had no outage count as zero.
+        """
+        per_region: Dict[str, List[int]] = defaultdict(list)
+        for (_, region), peak in self._peaks.items():
+            per_region[region].append(peak)
+
+        total_days = len(self._days)
+        baselines = {}
+        for region, peaks in per_region.items():
+            peaks = peaks + [0] * (total_days - len(peaks))
+            baselines[region] = statistics.median(peaks)
+        return baselines
+
+    def surges(self) -> Dict[date, Dict[str, int]]:
+        """Surge days with the peak of every region that triggered them."""
+        baselines = self.baselines()
+        surges: Dict[date, Dict[str, int]] = defaultdict(dict)
+        for (day, region), peak in self._peaks.items():
+            threshold = max(self.factor * baselines[region], self.min_affected)
+            if peak >= threshold:
+                surges[day][region] = peak
+        return dict(sorted(surges.items()))
+
+    def extra_points(self, hours: Iterable[int]) -> List[Point]:
+        """Dense points to add on (and around) surge days.
+
+        Args:
+            hours: Hours already sampled by the coarse pass
+
+        Returns:
+            Points of ``dense_hours`` not in ``hours``, in calendar order,
+            restricted to days the coarse pass covered
+        """
+        sampled = set(hours)
+        days = set()
+        for day in self.surges():
+            for offset in range(-self.pad_days, self.pad_days + 1):
+                neighbour = day + timedelta(days=offset)
+                if neighbour in self._days:
+                    days.add(neighbour)
+
+        return [
+            (d.year, d.month, d.day, hour)
+            for d in sorted(days)
+            for hour in self.dense_hours
+            if hour not in sampled
+        ]
@@ -1,11 +1,16 @@
 import hashlib
-import unicodedata
 from datetime import datetime
 import logging
 
 import pandas as pd
+import polars as pl
 
+from core.duration import parse_actualizado_hace
+from core.hash_key import content_hash
 from core.logger import logger
+from core.normalization import NORMALIZER
+
+GROUP_KEYS = ("NOMBRE_REGION", "NOMBRE_COMUNA", "NOMBRE_EMPRESA", "FECHA_INT_STR")
 
 
 class SecDataTransformer:
@@ -29,12 +34,48 @@ class SecDataTransformer:
         Returns:
             str: Texto normalizado
         """
-        # Quitar acentos
-        text_nfd = unicodedata.normalize("NFD", text)
-        text_ascii = text_nfd.encode("ASCII", "ignore").decode("ASCII")
+        return NORMALIZER.normalize(text)
+
+    def _normalize_values(self, values: list) -> list:
+        """Normaliza una columna completa vía la caché de internado del proceso.
+
+        Cada texto distinto se normaliza una sola vez por proceso, no por batch.
 
-        # Mayúsculas y quitar espacios extra
-        return text_ascii.upper().strip()
+        Args:
+            values (list): Valores crudos de la columna
+
+        Returns:
+            list: Textos normalizados, en el mismo orden
+        """
+        intern = NORMALIZER.intern
+        return [intern(v)[0] for v in values]
+
+    def _parse_incident_date(self, fecha_str: str, dt_server, referencia_hoy) -> tuple:
+        """Parsea FECHA_INT_STR; si falla usa la hora del servidor del batch.
+
+        Args:
+            fecha_str (str): Fecha del incidente (dd/mm/YYYY)
+            dt_server (datetime): Hora del servidor del batch
+            referencia_hoy (date): Fecha de referencia para la antigüedad
+
+        Returns:
+            tuple: (fecha, hora, días de antigüedad, "YYYYmmdd_HHMM" del hash)
+        """
+        try:
+            dt_incidente = datetime.strptime(fecha_str, "%d/%m/%Y")
+            fecha_incidente_date = dt_incidente.date()
+            dias_antiguedad = (referencia_hoy - fecha_incidente_date).days
+        except Exception:
+            # Fallback al tiempo del servidor del batch
+            fecha_incidente_date = dt_server.date()
+            dt_incidente = dt_server
+            dias_antiguedad = 0
+
+        hora_incidente = dt_incidente.time()
+        clave = (
+            f"{fecha_incidente_date.strftime('%Y%m%d')}_{hora_incidente.strftime('%H%M')}"
+        )
+        return fecha_incidente_date, hora_incidente, dias_antiguedad, clave
 
     def _parse_server_time(self, raw):
         """Intenta parsear la hora del servidor (lista o str), cae en local con aviso."""
@@ -73,9 +114,54 @@ class SecDataTransformer:
         unique_str = f"{comuna}_{empresa}_{fecha_str}_{hora_str}_{afectados}"
         return hashlib.md5(unique_str.encode()).hexdigest()
 
+    def _group_polars(self, raw_data: list):
+        """Agrupa con Polars; None si los datos no son limpios.
+
+        El camino rápido solo acepta claves y ACTUALIZADO_HACE de texto y
+        CLIENTES_AFECTADOS entero, todos sin nulos: ahí Polars y pandas
+        producen exactamente los mismos grupos y en el mismo orden.
+        """
+        columnas = GROUP_KEYS + ("CLIENTES_AFECTADOS", "ACTUALIZADO_HACE")
+        try:
+            df = pl.DataFrame({c: [r.get(c) for r in raw_data] for c in columnas})
+        except Exception:
+            return None
+
+        limpio = (
+            all(df.schema[c] == pl.String for c in GROUP_KEYS + ("ACTUALIZADO_HACE",))
+            and df.schema["CLIENTES_AFECTADOS"].is_integer()
+            and not any(df.null_count().row(0))
+        )
+        if not limpio:
+            return None
+
+        grouped = (
+            df.group_by(list(GROUP_KEYS))
+            .agg(
+                pl.col("CLIENTES_AFECTADOS").sum(),
+                pl.col("ACTUALIZADO_HACE").first(),
+            )
+            .sort(list(GROUP_KEYS))
+        )
+        return {c: grouped[c].to_list() for c in columnas}
+
+    def _group_pandas(self, raw_data: list) -> dict:
+        """Agrupa con pandas (cualquier tipo de dato, nulos incluidos)."""
+        df = pd.DataFrame(raw_data)
+
+        df_grouped = (
+            df.groupby(list(GROUP_KEYS))
+            .agg({"CLIENTES_AFECTADOS": "sum", "ACTUALIZADO_HACE": "first"})
+            .reset_index()
+        )
+        return {c: df_grouped[c].tolist() for c in df_grouped.columns}
+
     def transform(self, raw_data: list, server_time_raw: any = None) -> list:
         """Procesa los datos crudos capturados para su almacenamiento.
 
+        Todo el procesamiento es por columna: cada región, comuna, empresa y
+        fecha distinta se normaliza o parsea una sola vez.
+
         Args:
             raw_data (list): Lista de diccionarios con datos provenientes de la API.
             server_time_raw (any, optional): Datos de hora del servidor (lista o str).
@@ -88,63 +174,76 @@ class SecDataTransformer:
 
         # 1. Preparar referencias de tiempo
         timestamp_actual, referencia_hoy = self._parse_server_time(server_time_raw)
+        dt_server = datetime.strptime(timestamp_actual, "%Y-%m-%d %H:%M:%S")
 
-        # 2. Convertir a DataFrame para agrupar
-        df = pd.DataFrame(raw_data)
+        # 2. Agrupar y sumar (Polars si los datos son limpios, si no pandas)
+        grouped = self._group_polars(raw_data) or self._group_pandas(raw_data)
+        if not grouped["NOMBRE_REGION"]:
+            return []
 
-        # Agrupar y sumar
-        df_grouped = (
-            df.groupby(
-                ["NOMBRE_REGION", "NOMBRE_COMUNA", "NOMBRE_EMPRESA", "FECHA_INT_STR"]
-            )
-            .agg({"CLIENTES_AFECTADOS": "sum", "ACTUALIZADO_HACE": "first"})
-            .reset_index()
-        )
+        # 3. Textos y fechas: un cálculo por valor distinto
+        regiones = self._normalize_values(grouped["NOMBRE_REGION"])
+        comunas = self._normalize_values(grouped["NOMBRE_COMUNA"])
+        empresas = self._normalize_values(grouped["NOMBRE_EMPRESA"])
+
+        fechas = [str(v).strip() for v in grouped["FECHA_INT_STR"]]
+        fechas_unicas = {
+            fecha: self._parse_incident_date(fecha, dt_server, referencia_hoy)
+            for fecha in set(fechas)
+        }
+        tiempos = [fechas_unicas[fecha] for fecha in fechas]
+        afectados = [int(v) for v in grouped["CLIENTES_AFECTADOS"]]
+
+        # 4. IDs: mismo hash que _create_robust_id (SANTIAGO_ENEL_20231025_1430_500)
+        #    más su clave compacta de 64 bits (HASH_KEY)
+        ids = [
+            content_hash(f"{c}_{e}_{t[3]}_{a}")
+            for c, e, t, a in zip(comunas, empresas, tiempos, afectados)
+        ]
+
+        # 5. ACTUALIZADO_HACE: texto tal cual + minutos (parseo vectorizado)
+        haces = [str(v).strip() for v in grouped["ACTUALIZADO_HACE"]]
+        minutos = parse_actualizado_hace(haces)
 
         registros_procesados = []
-
-        for _, row in df_grouped.iterrows():
-            region = self._normalize_text(str(row["NOMBRE_REGION"]))
-            comuna = self._normalize_text(str(row["NOMBRE_COMUNA"]))
-            empresa = self._normalize_text(str(row["NOMBRE_EMPRESA"]))
-
-            fecha_str = str(row["FECHA_INT_STR"]).strip()
-            afectados = int(row["CLIENTES_AFECTADOS"])
-
-            # Objetos de tiempo para la DB
-            try:
-                dt_incidente = datetime.strptime(fecha_str, "%d/%m/%Y")
-                fecha_incidente_date = dt_incidente.date()
-                dias_antiguedad = (referencia_hoy - fecha_incidente_date).days
-            except:
-                # Fallback al tiempo del servidor del batch
-                dt_server = datetime.strptime(timestamp_actual, "%Y-%m-%d %H:%M:%S")
-                fecha_incidente_date = dt_server.date()
-                dt_incidente = dt_server
-                dias_antiguedad = 0
-
-            hora_incidente = dt_incidente.time()
-
-            # Generamos ID basado en contenido para deduplicar automáticamente
-            corte_id = self._create_robust_id(
-                comuna, empresa, fecha_incidente_date, hora_incidente, afectados
-            )
-
+        filas = zip(
+            ids,
+            fechas,
+            tiempos,
+            regiones,
+            comunas,
+            empresas,
+            afectados,
+            haces,
+            minutos,
+        )
+        for (
+            corte_id,
+            fecha_str,
+            tiempo,
+            region,
+            comuna,
+            empresa,
+            clientes,
+            hace,
+            hace_min,
+        ) in filas:
+            fecha_incidente_date, hora_incidente, dias_antiguedad, _ = tiempo
             registros_procesados.append(
                 {
-                    "ID_UNICO": corte_id,
-                    "TIMESTAMP_SERVER": datetime.strptime(
-                        timestamp_actual, "%Y-%m-%d %H:%M:%S"
-                    ),
+                    "ID_UNICO": corte_id[0],
+                    "HASH_KEY": corte_id[1],
+                    "TIMESTAMP_SERVER": dt_server,
                     "FECHA_STR": fecha_str,
                     "FECHA_DT": fecha_incidente_date,
                     "HORA_INT": hora_incidente,
                     "REGION": region,
                     "COMUNA": comuna,
                     "EMPRESA": empresa,
-                    "CLIENTES_AFECTADOS": afectados,
+                    "CLIENTES_AFECTADOS": clientes,
                     "DIAS_ANTIGUEDAD": dias_antiguedad,
-                    "ACTUALIZADO_HACE": str(row["ACTUALIZADO_HACE"]).strip(),
+                    "ACTUALIZADO_HACE": hace,
+                    "ACTUALIZADO_HACE_MIN": hace_min,
                 }
             )
 
@@ -0,0 +1,107 @@
+"""Process-pool transform stage for the historical ETL.
+
+``SecDataTransformer.transform`` is pure Python/pandas/Polars CPU work, so
+running it in ``ThreadPoolExecutor`` threads keeps it on one core whatever
+``max_workers`` says. ``TransformPool`` runs it in worker processes
+instead. Each worker returns the transformed batch as a Polars/Arrow IPC
+buffer (one column per field, no per-row dict keys), which is much cheaper
+to ship back than a pickled list of dicts. The parent keeps the database
+writes: it decodes the buffer with ``ipc_to_records`` and hands the rows
+to the repository from its writer threads.
+"""
+
+import io
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import polars as pl
+
+logger = logging.getLogger(__name__)
+
+# Columnas y tipos de un registro transformado (SecDataTransformer.transform)
+RECORD_SCHEMA = {
+    "ID_UNICO": pl.String,
+    "HASH_KEY": pl.Int64,
+    "TIMESTAMP_SERVER": pl.Datetime("us"),
+    "FECHA_STR": pl.String,
+    "FECHA_DT": pl.Date,
+    "HORA_INT": pl.Time,
+    "REGION": pl.String,
+    "COMUNA": pl.String,
+    "EMPRESA": pl.String,
+    "CLIENTES_AFECTADOS": pl.Int64,
+    "DIAS_ANTIGUEDAD": pl.Int64,
+    "ACTUALIZADO_HACE": pl.String,
+    "ACTUALIZADO_HACE_MIN": pl.Int64,
+}
+
+# Transformer del proceso worker (uno por proceso, creado en el initializer)
+_transformer = None
+
+
+def records_to_ipc(records: List[Dict[str, Any]]) -> bytes:
+    """Encode transformed records as an Arrow IPC buffer."""
+    buffer = io.BytesIO()
+    pl.DataFrame(records, schema=RECORD_SCHEMA).write_ipc(buffer)
+    return buffer.getvalue()
+
+
+def ipc_to_records(payload: bytes) -> List[Dict[str, Any]]:
+    """Decode an Arrow IPC buffer back into transformed records."""
+    return pl.read_ipc(io.BytesIO(payload)).to_dicts()
+
+
+def _init_worker():
+    global _transformer
+    from core.tranformer import SecDataTransformer
+
+    _transformer = SecDataTransformer()
+
+
+def transform_to_ipc(raw_data: list, hora_server: Optional[str]) -> bytes:
+    """Worker task: transform one raw batch and encode it as IPC."""
+    records = _transformer.transform(raw_data, server_time_raw=hora_server)
+    return records_to_ipc(records)
+
+
+class TransformPool:
+    """Worker processes running ``SecDataTransformer.transform``.
+
+    Usage:
+        with TransformPool(processes=4) as pool:
+            future = pool.submit(raw_data, hora_server)
+            records = ipc_to_records(future.result())
+
+    Attributes:
+        processes: Number of worker processes
+    """
+
+    def __init__(self, processes: int):
+        """Initialize the pool.
+
+        Args:
+            processes: Number of worker processes
+        """
+        self.processes = processes
+        # spawn: mismo arranque limpio que el backfill por shards
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def submit(self, raw_data: list, hora_server: Optional[str]) -> Future:
+        """Queue one raw batch; the future resolves to IPC bytes."""
+        return self._executor.submit(transform_to_ipc, raw_data, hora_server)
+
+    def close(self):
+        """Wait for queued batches and stop the workers."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,43 @@
+-- Clave compacta de 64 bits para fact_interrupciones (modo DB_COMPACT_KEYS=1)
+--
+-- hash_key = primeros 8 bytes del MD5 de hash_id, como BIGINT con signo
+-- (mismo valor que core.hash_key en Python, hash_key_sql y hash_key_expr en
+-- Polars). Un índice único de 8 bytes en vez de un VARCHAR de 33: varias
+-- veces más pequeño y probes de ON CONFLICT más baratos.
+--
+-- Despliegue del modo compacto:
+--   1. Detener los writers (ETL, loop casi en tiempo real).
+--   2. psql -f db/migrations/001_compact_hash_key.sql
+--      (CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción)
+--   3. Volver a levantar los writers con DB_COMPACT_KEYS=1.
+-- Después de esta migración la tabla ya no tiene restricción única sobre
+-- hash_id: un writer sin DB_COMPACT_KEYS=1 falla en ON CONFLICT (hash_id).
+
+ALTER TABLE fact_interrupciones ADD COLUMN IF NOT EXISTS hash_key BIGINT;
+
+-- 1. Backfill de filas existentes. Misma regla que core.hash_key: solo un
+--    MD5 hex de 32 caracteres en minúscula se usa tal cual; cualquier otro
+--    ID (legados, de prueba) se hashea primero.
+UPDATE fact_interrupciones
+SET hash_key = CASE
+    WHEN hash_id ~ '^[0-9a-f]{32}$' THEN ('x' || left(hash_id, 16))::bit(64)::bigint
+    ELSE ('x' || left(md5(hash_id), 16))::bit(64)::bigint
+END
+WHERE hash_key IS NULL;
+
+-- Colisiones (deberían ser 0; si no, revisar antes de crear el índice):
+-- SELECT hash_key, COUNT(*) FROM fact_interrupciones
+-- GROUP BY hash_key HAVING COUNT(*) > 1;
+
+-- 2. Índice único sin bloquear escrituras
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_fact_hash_key
+    ON fact_interrupciones (hash_key);
+
+ALTER TABLE fact_interrupciones
+    ADD CONSTRAINT fact_interrupciones_hash_key_key UNIQUE USING INDEX ux_fact_hash_key;
+ALTER TABLE fact_interrupciones ALTER COLUMN hash_key SET NOT NULL;
+
+-- 3. hash_key reemplaza a hash_id como clave de deduplicación: sin este paso
+--    cada insert mantiene dos índices únicos y el modo compacto es más lento.
+ALTER TABLE fact_interrupciones
+    DROP CONSTRAINT IF EXISTS fact_interrupciones_hash_id_key;
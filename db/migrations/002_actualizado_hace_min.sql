@@ -0,0 +1,111 @@
+-- ACTUALIZADO_HACE ("2 Dias 3 Horas 15 Minutos") como minutos enteros
+--
+-- Mismas reglas que core.duration.parse_actualizado_hace: componentes
+-- ausentes valen 0; texto sin ningún componente, o con cualquier otra cosa
+-- alrededor ("5 Horas basura"), da NULL.
+--
+-- Sirve para las dos bases: el esquema estrella (db/schema.sql) y Supabase
+-- (db/schema_interrupciones.sql). Cada parte se aplica solo si su tabla
+-- existe.
+--
+-- Uso: psql -f db/migrations/002_actualizado_hace_min.sql
+
+CREATE OR REPLACE FUNCTION parse_actualizado_hace(p_text TEXT)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN m[1] IS NOT NULL OR m[2] IS NOT NULL OR m[3] IS NOT NULL THEN
+        COALESCE(m[1]::INTEGER, 0) * 1440
+        + COALESCE(m[2]::INTEGER, 0) * 60
+        + COALESCE(m[3]::INTEGER, 0)
+    END
+    FROM regexp_match(
+        p_text,
+        '^\s*(?:(\d+)\s*d[ií]as?)?\s*(?:(\d+)\s*horas?)?\s*(?:(\d+)\s*min(?:utos?)?)?\s*$',
+        'i'
+    ) AS r(m)
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Esquema estrella (db/schema.sql)
+DO $mig$
+BEGIN
+    IF to_regclass('fact_interrupciones') IS NOT NULL THEN
+        ALTER TABLE fact_interrupciones
+            ADD COLUMN IF NOT EXISTS actualizado_hace_min INTEGER;
+
+        UPDATE fact_interrupciones
+        SET actualizado_hace_min = parse_actualizado_hace(actualizado_hace)
+        WHERE actualizado_hace_min IS NULL AND actualizado_hace IS NOT NULL;
+    END IF;
+END
+$mig$;
+
+-- Esquema Supabase (db/schema_interrupciones.sql): columna, backfill y la
+-- función de carga en batch, que desde aquí también llena la columna
+DO $mig$
+BEGIN
+    IF to_regclass('interrupciones') IS NULL THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE interrupciones ADD COLUMN IF NOT EXISTS actualizado_hace_min INTEGER;
+
+    UPDATE interrupciones
+    SET actualizado_hace_min = parse_actualizado_hace(actualizado_hace)
+    WHERE actualizado_hace_min IS NULL AND actualizado_hace IS NOT NULL;
+
+    EXECUTE $ddl$
+CREATE OR REPLACE FUNCTION insert_interrupciones_batch(
+    p_data JSONB
+) RETURNS INTEGER AS $$
+DECLARE
+    v_inserted INTEGER := 0;
+    v_record JSONB;
+BEGIN
+    FOR v_record IN SELECT * FROM jsonb_array_elements(p_data)
+    LOOP
+        INSERT INTO interrupciones (
+            dia_int,
+            mes_int,
+            anho_int,
+            hora_interrupcion,
+            fecha_interrupcion,
+            region,
+            comuna,
+            empresa,
+            clientes_afectados,
+            actualizado_hace,
+            actualizado_hace_min,
+            fecha_int_str
+        ) VALUES (
+            (v_record->>'DIA_INT')::INTEGER,
+            (v_record->>'MES_INT')::INTEGER,
+            (v_record->>'ANHO_INT')::INTEGER,
+            (v_record->>'HORA')::INTEGER,
+            make_date(
+                (v_record->>'ANHO_INT')::INTEGER,
+                (v_record->>'MES_INT')::INTEGER,
+                (v_record->>'DIA_INT')::INTEGER
+            ),
+            v_record->>'NOMBRE_REGION',
+            v_record->>'NOMBRE_COMUNA',
+            v_record->>'NOMBRE_EMPRESA',
+            (v_record->>'CLIENTES_AFECTADOS')::INTEGER,
+            v_record->>'ACTUALIZADO_HACE',
+            parse_actualizado_hace(v_record->>'ACTUALIZADO_HACE'),
+            v_record->>'FECHA_INT_STR'
+        )
+        ON CONFLICT (fecha_interrupcion, hora_interrupcion, region, comuna, empresa)
+        DO UPDATE SET
+            clientes_afectados = EXCLUDED.clientes_afectados,
+            actualizado_hace = EXCLUDED.actualizado_hace,
+            actualizado_hace_min = EXCLUDED.actualizado_hace_min,
+            scraped_at = NOW();
+        
+        v_inserted := v_inserted + 1;
+    END LOOP;
+    
+    RETURN v_inserted;
+END;
+$$ LANGUAGE plpgsql;
+    $ddl$;
+END
+$mig$;
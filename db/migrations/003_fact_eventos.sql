@@ -0,0 +1,28 @@
+-- fact_eventos: un registro por corte (cadena de snapshots), ver
+-- core/event_consolidator.py. Los eventos abiertos se re-escriben
+-- (abierto = TRUE) hasta que cierran.
+--
+-- Uso: psql -f db/migrations/003_fact_eventos.sql
+
+CREATE TABLE IF NOT EXISTS fact_eventos(
+    id_evento BIGINT PRIMARY KEY,
+    id_geografia INT NOT NULL,
+    id_empresa INT NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    primer_snapshot TIMESTAMP NOT NULL,
+    ultimo_snapshot TIMESTAMP NOT NULL,
+    n_snapshots INT NOT NULL,
+    clientes_inicial INT NOT NULL,
+    clientes_max INT NOT NULL,
+    clientes_final INT NOT NULL,
+    clientes_hora DOUBLE PRECISION NOT NULL,
+    duracion_min INT NOT NULL,
+    abierto BOOLEAN NOT NULL DEFAULT FALSE,
+
+    FOREIGN KEY (id_geografia) REFERENCES dim_geografia(id_geografia),
+    FOREIGN KEY (id_empresa) REFERENCES dim_empresa(id_empresa)
+);
+
+CREATE INDEX IF NOT EXISTS idx_eventos_inicio ON fact_eventos(inicio DESC);
+CREATE INDEX IF NOT EXISTS idx_eventos_geografia ON fact_eventos(id_geografia);
+CREATE INDEX IF NOT EXISTS idx_eventos_empresa ON fact_eventos(id_empresa);
@@ -31,7 +31,9 @@ CREATE TABLE fact_interrupciones(
     id_geografia INT NOT NULL,
     id_empresa INT NOT NULL,
     clientes_afectados INT NOT NULL,
+    actualizado_hace_min INT, -- ACTUALIZADO_HACE en minutos (ver db/migrations/002)
     hash_id VARCHAR(128) NOT NULL UNIQUE,
+    hash_key BIGINT, -- primeros 8 bytes del MD5; clave única en modo compacto (db/migrations/001)
     created_at TIMESTAMPTZ DEFAULT NOW(),
 
     FOREIGN KEY (id_tiempo) REFERENCES dim_tiempo(id_tiempo),
@@ -42,4 +44,28 @@ CREATE TABLE fact_interrupciones(
 CREATE INDEX idx_tiempo ON fact_interrupciones(id_tiempo DESC);
 CREATE INDEX idx_geografia ON fact_interrupciones(id_geografia);
 CREATE INDEX idx_empresa ON fact_interrupciones(id_empresa);
-CREATE INDEX inx_created_at ON fact_interrupciones(created_at DESC);
\ No newline at end of file
+CREATE INDEX inx_created_at ON fact_interrupciones(created_at DESC);
+
+-- Eventos: cadenas de snapshots del mismo corte (core/event_consolidator.py)
+CREATE TABLE fact_eventos(
+    id_evento BIGINT PRIMARY KEY,
+    id_geografia INT NOT NULL,
+    id_empresa INT NOT NULL,
+    inicio TIMESTAMP NOT NULL,
+    primer_snapshot TIMESTAMP NOT NULL,
+    ultimo_snapshot TIMESTAMP NOT NULL,
+    n_snapshots INT NOT NULL,
+    clientes_inicial INT NOT NULL,
+    clientes_max INT NOT NULL,
+    clientes_final INT NOT NULL,
+    clientes_hora DOUBLE PRECISION NOT NULL,
+    duracion_min INT NOT NULL,
+    abierto BOOLEAN NOT NULL DEFAULT FALSE,
+
+    FOREIGN KEY (id_geografia) REFERENCES dim_geografia(id_geografia),
+    FOREIGN KEY (id_empresa) REFERENCES dim_empresa(id_empresa)
+);
+
+CREATE INDEX idx_eventos_inicio ON fact_eventos(inicio DESC);
+CREATE INDEX idx_eventos_geografia ON fact_eventos(id_geografia);
+CREATE INDEX idx_eventos_empresa ON fact_eventos(id_empresa);
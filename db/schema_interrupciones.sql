@@ -24,6 +24,7 @@ CREATE TABLE IF NOT EXISTS interrupciones (
     
     -- Metadata
     actualizado_hace VARCHAR(200),
+    actualizado_hace_min INTEGER,
     fecha_int_str VARCHAR(50),
     
     -- Timestamp de scraping
@@ -79,6 +80,22 @@ FROM interrupciones
 GROUP BY anho_int, mes_int, region
 ORDER BY anho_int DESC, mes_int DESC, total_interrupciones DESC;
 
+-- ACTUALIZADO_HACE ("2 Dias 3 Horas 15 Minutos") en minutos
+-- (mismas reglas que core.duration.parse_actualizado_hace)
+CREATE OR REPLACE FUNCTION parse_actualizado_hace(p_text TEXT)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN m[1] IS NOT NULL OR m[2] IS NOT NULL OR m[3] IS NOT NULL THEN
+        COALESCE(m[1]::INTEGER, 0) * 1440
+        + COALESCE(m[2]::INTEGER, 0) * 60
+        + COALESCE(m[3]::INTEGER, 0)
+    END
+    FROM regexp_match(
+        p_text,
+        '^\s*(?:(\d+)\s*d[ií]as?)?\s*(?:(\d+)\s*horas?)?\s*(?:(\d+)\s*min(?:utos?)?)?\s*$',
+        'i'
+    ) AS r(m)
+$$ LANGUAGE sql IMMUTABLE;
+
 -- Función para insertar datos en batch
 CREATE OR REPLACE FUNCTION insert_interrupciones_batch(
     p_data JSONB
@@ -100,6 +117,7 @@ BEGIN
             empresa,
             clientes_afectados,
             actualizado_hace,
+            actualizado_hace_min,
             fecha_int_str
         ) VALUES (
             (v_record->>'DIA_INT')::INTEGER,
@@ -116,12 +134,14 @@ BEGIN
             v_record->>'NOMBRE_EMPRESA',
             (v_record->>'CLIENTES_AFECTADOS')::INTEGER,
             v_record->>'ACTUALIZADO_HACE',
+            parse_actualizado_hace(v_record->>'ACTUALIZADO_HACE'),
             v_record->>'FECHA_INT_STR'
         )
         ON CONFLICT (fecha_interrupcion, hora_interrupcion, region, comuna, empresa)
         DO UPDATE SET
             clientes_afectados = EXCLUDED.clientes_afectados,
             actualizado_hace = EXCLUDED.actualizado_hace,
+            actualizado_hace_min = EXCLUDED.actualizado_hace_min,
             scraped_at = NOW();
         
         v_inserted := v_inserted + 1;
@@ -1,34 +1,23 @@
 """Análisis detallado de datos de enero 2017 incluyendo duración de interrupciones."""
 
 import json
+import sys
 from pathlib import Path
 from collections import Counter
-import re
 
+sys.path.append(".")
 
-def parse_duration(duration_str):
-    """Parse 'X Dias Y Horas Z Minutos' to total hours."""
-    if not duration_str:
-        return 0
-
-    days = hours = minutes = 0
+from core.duration import parse_actualizado_hace
 
-    # Extract days
-    day_match = re.search(r"(\d+)\s*Dias?", duration_str)
-    if day_match:
-        days = int(day_match.group(1))
 
-    # Extract hours
-    hour_match = re.search(r"(\d+)\s*Horas?", duration_str)
-    if hour_match:
-        hours = int(hour_match.group(1))
+def parse_duration(duration_str):
+    """Parse 'X Dias Y Horas Z Minutos' to total hours."""
+    return parse_durations([duration_str])[0]
 
-    # Extract minutes
-    min_match = re.search(r"(\d+)\s*Minutos?", duration_str)
-    if min_match:
-        minutes = int(min_match.group(1))
 
-    return days * 24 + hours + minutes / 60
+def parse_durations(duration_strs):
+    """Parse a whole column of 'X Dias Y Horas Z Minutos' to hours (vectorizado)."""
+    return [(m or 0) / 60 for m in parse_actualizado_hace(duration_strs)]
 
 
 def analyze_enero_2017():
@@ -56,31 +45,33 @@ def analyze_enero_2017():
     empresas = []
     regiones = []
 
-    for snapshot in results:
-        for record in snapshot["data"]:
-            empresas.append(record.get("NOMBRE_EMPRESA", "N/A"))
-            regiones.append(record.get("NOMBRE_REGION", "N/A"))
-            clientes = record.get("CLIENTES_AFECTADOS", 0)
-            total_clientes += clientes
-
-            # Analizar duración
-            duration_str = record.get("ACTUALIZADO_HACE", "")
-            duration_hours = parse_duration(duration_str)
-
-            if duration_hours > 0:
-                duraciones.append(duration_hours)
-
-                # Por empresa
-                empresa = record.get("NOMBRE_EMPRESA", "N/A")
-                if empresa not in empresas_duracion:
-                    empresas_duracion[empresa] = []
-                empresas_duracion[empresa].append(duration_hours)
-
-                # Por región
-                region = record.get("NOMBRE_REGION", "N/A")
-                if region not in regiones_duracion:
-                    regiones_duracion[region] = []
-                regiones_duracion[region].append(duration_hours)
+    records = [record for snapshot in results for record in snapshot["data"]]
+
+    # Duración: un solo parseo vectorizado para todo el mes
+    duration_hours_all = parse_durations(
+        [record.get("ACTUALIZADO_HACE", "") for record in records]
+    )
+
+    for record, duration_hours in zip(records, duration_hours_all):
+        empresas.append(record.get("NOMBRE_EMPRESA", "N/A"))
+        regiones.append(record.get("NOMBRE_REGION", "N/A"))
+        clientes = record.get("CLIENTES_AFECTADOS", 0)
+        total_clientes += clientes
+
+        if duration_hours > 0:
+            duraciones.append(duration_hours)
+
+            # Por empresa
+            empresa = record.get("NOMBRE_EMPRESA", "N/A")
+            if empresa not in empresas_duracion:
+                empresas_duracion[empresa] = []
+            empresas_duracion[empresa].append(duration_hours)
+
+            # Por región
+            region = record.get("NOMBRE_REGION", "N/A")
+            if region not in regiones_duracion:
+                regiones_duracion[region] = []
+            regiones_duracion[region].append(duration_hours)
 
     print(f"\n📊 RESUMEN GENERAL")
     print(f"  Total de interrupciones: {total_records:,}")
@@ -1,50 +1,54 @@
+import sys
+
+sys.path.append(".")
+
 import pandas as pd
 import polars as pl
 import os
 from dotenv import load_dotenv
 
+from core.normalization import NORMALIZER
+
+# Palabra clave (texto normalizado) -> nombre_region, en orden de prioridad
+REGION_KEYWORDS = [
+    ("ARICA", "ARICA Y PARINACOTA"),
+    ("TARAPACA", "TARAPACA"),
+    ("ANTOFAGASTA", "ANTOFAGASTA"),
+    ("ATACAMA", "ATACAMA"),
+    ("COQUIMBO", "COQUIMBO"),
+    ("VALPARAISO", "VALPARAISO"),
+    ("METROPOLITANA", "METROPOLITANA"),
+    ("O'HIGGINS", "O'HIGGINS"),
+    ("MAULE", "MAULE"),
+    ("NUBLE", "NUBLE"),
+    ("BIOBIO", "BIOBIO"),
+    ("ARAUCANIA", "LA ARAUCANIA"),
+    ("LOS RIOS", "LOS RIOS"),
+    ("LOS LAGOS", "LOS LAGOS"),
+    ("AYSEN", "AYSEN"),
+    ("MAGALLANES", "MAGALLANES"),
+]
+
 
 class SeiaAnalyzer:
     def __init__(self, excel_path="outputs/Proyectos.xlsx"):
         self.excel_path = excel_path
+        # Código internado del nombre crudo -> región canónica
+        self._region_by_code = {}
 
     def normalize_region_name(self, name):
         if not isinstance(name, str):
             return "DESCONOCIDO"
-        name = name.upper()
-        if "ARICA" in name:
-            return "ARICA Y PARINACOTA"
-        if "TARAPACA" in name:
-            return "TARAPACA"
-        if "ANTOFAGASTA" in name:
-            return "ANTOFAGASTA"
-        if "ATACAMA" in name:
-            return "ATACAMA"
-        if "COQUIMBO" in name:
-            return "COQUIMBO"
-        if "VALPARAISO" in name:
-            return "VALPARAISO"
-        if "METROPOLITANA" in name:
-            return "METROPOLITANA"
-        if "O'HIGGINS" in name:
-            return "O'HIGGINS"
-        if "MAULE" in name:
-            return "MAULE"
-        if "NUBLE" in name or "ÑUBLE" in name:
-            return "NUBLE"
-        if "BIOBIO" in name or "BÍOBÍO" in name:
-            return "BIOBIO"
-        if "ARAUCANIA" in name:
-            return "LA ARAUCANIA"
-        if "LOS RIOS" in name:
-            return "LOS RIOS"
-        if "LOS LAGOS" in name:
-            return "LOS LAGOS"
-        if "AYSEN" in name:
-            return "AYSEN"
-        if "MAGALLANES" in name:
-            return "MAGALLANES"
-        return "OTRO"
+        # Sin acentos vía la caché de internado ("BÍOBÍO" -> "BIOBIO")
+        name, code = NORMALIZER.intern(name)
+        region = self._region_by_code.get(code)
+        if region is None:
+            region = next(
+                (canonica for clave, canonica in REGION_KEYWORDS if clave in name),
+                "OTRO",
+            )
+            self._region_by_code[code] = region
+        return region
 
     def load_and_clean(self):
         print(f"📖 Cargando SEIA desde {self.excel_path}...")
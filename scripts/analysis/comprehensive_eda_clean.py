@@ -1,8 +1,35 @@
 import os
+import sys
+
+sys.path.append(".")
+
 from dotenv import load_dotenv
 import polars as pl
 import hashlib
 
+from core.golden_record import GoldenRecordStore
+from core.hash_key import content_key_expr
+
+GOLDEN_PATH = "outputs/golden_interrupciones.parquet"
+
+# JOIN base del golden record; id_fact es la marca de agua incremental
+BASE_QUERY = """
+    SELECT 
+        f.id_fact AS id_interrupcion,
+        f.hash_id as original_hash,
+        f.clientes_afectados,
+        f.actualizado_hace_min,
+        f.hora_interrupcion as hora_int,
+        t.fecha as fecha_dt,
+        g.nombre_region,
+        g.nombre_comuna,
+        e.nombre_empresa
+    FROM fact_interrupciones f
+    JOIN dim_tiempo t ON f.id_tiempo = t.id_tiempo
+    JOIN dim_geografia g ON f.id_geografia = g.id_geografia
+    JOIN dim_empresa e ON f.id_empresa = e.id_empresa
+"""
+
 
 class ComprehensiveCleaner:
     def __init__(self):
@@ -17,65 +44,101 @@ class ComprehensiveCleaner:
 
     def generate_hash_expr(self):
         # Lógica Polars para replicar el Hash MD5: Comuna + Empresa + Fecha + Hora + Afectados
-        # Nota: En Polars concatenamos strings y hasheamos
-        return (
-            pl.col("nombre_comuna")
-            + "_"
-            + pl.col("nombre_empresa")
-            + "_"
-            + pl.col("fecha_dt").dt.strftime("%Y%m%d")
-            + "_"
-            + pl.col("hora_int").dt.strftime("%H%M")
-            + "_"
-            + pl.col("clientes_afectados").cast(pl.Utf8)
+        # Nota: En Polars concatenamos strings y hasheamos.
+        # Los nulos se rellenan para que, como en unique(), cuenten como un valor más
+        return pl.concat_str(
+            [
+                pl.col("nombre_comuna").fill_null(""),
+                pl.col("nombre_empresa").fill_null(""),
+                pl.col("fecha_dt").dt.strftime("%Y%m%d").fill_null(""),
+                pl.col("hora_int").dt.strftime("%H%M").fill_null(""),
+                pl.col("clientes_afectados").cast(pl.Utf8).fill_null(""),
+            ],
+            separator="_",
         )
 
-    def load_and_clean(self):
+    def load_and_clean(self, store: GoldenRecordStore = None):
+        """Rebuild the golden record from the whole fact table.
+
+        The rebuild goes through the store (reset, then one ``append``) so
+        the next incremental run continues from it instead of exporting a
+        stale store over it.
+        """
+        store = store or GoldenRecordStore()
         print("🚀 Carga masiva desde PostgreSQL...")
 
         # 1. Cargar JOIN completo
-        query = """
-            SELECT 
-                f.id_interrupcion,
-                f.hash_id as original_hash,
-                f.clientes_afectados,
-                f.hora_interrupcion as hora_int,
-                t.fecha as fecha_dt,
-                g.nombre_region,
-                g.nombre_comuna,
-                e.nombre_empresa
-            FROM fact_interrupciones f
-            JOIN dim_tiempo t ON f.id_tiempo = t.id_tiempo
-            JOIN dim_geografia g ON f.id_geografia = g.id_geografia
-            JOIN dim_empresa e ON f.id_empresa = e.id_empresa
-        """
-        df = pl.read_database_uri(query, self.uri, engine="adbc")
+        df = pl.read_database_uri(
+            BASE_QUERY + " ORDER BY f.id_fact", self.uri, engine="adbc"
+        )
         print(f"📦 Registros brutos cargados: {len(df):,}")
 
         # 2. Generar 'Smart Hash' para deduplicación retroactiva
         print("🧹 Generando Hash de Contenido (Deduplicación)...")
 
-        # Concatenar columnas clave
-        # Es más eficiente en Polars crear una columna concatenada y luego usar 'unique'
-        # Si queremos el hash MD5 exacto string-wise es costoso, para dedup basta con agrupar por las columnas clave
-
-        cols_clave = [
-            "nombre_comuna",
-            "nombre_empresa",
-            "fecha_dt",
-            "hora_int",
-            "clientes_afectados",
-        ]
-
-        df_clean = df.unique(subset=cols_clave, keep="first")
+        # La clave de contenido agrupa por comuna, empresa, fecha, hora y
+        # afectados: gana la primera fila por id_fact, igual que en la
+        # carga incremental
+        df = df.with_columns(
+            content_key_expr(self.generate_hash_expr()).alias("golden_key")
+        )
+        store.reset()
+        store.append(df, high_water=df["id_interrupcion"].max())
+        df_clean = store.scan().drop("golden_key").collect()
 
         duplicados = len(df) - len(df_clean)
         print(f"♻️  Duplicados eliminados (mismo evento y magnitud): {duplicados:,}")
         print(f"✨ Registros únicos (Golden Set): {len(df_clean):,}")
 
         # 3. Validación de Calidad
-        print("\n🔍 Validaciones de Calidad:")
+        self.validate(df_clean)
+
+        # 4. Exportar Golden Record
+        store.export(GOLDEN_PATH)
+        print(f"\n💾 Dataset maestro guardado en: {GOLDEN_PATH}")
+
+        return df_clean
 
+    def load_incremental(self, store: GoldenRecordStore = None):
+        """Refresh the golden record reading only fact rows past the high-water mark.
+
+        The first run (no store state) reads everything once; later runs read
+        ``id_fact > high_water`` and drop rows whose content key is already
+        in the store.
+        """
+        store = store or GoldenRecordStore()
+        high_water = store.high_water()
+
+        if high_water is None:
+            print("🚀 Golden record sin estado: carga inicial completa...")
+            query = BASE_QUERY + " ORDER BY f.id_fact"
+        else:
+            print(f"🚀 Carga incremental desde id_fact > {high_water:,}...")
+            query = BASE_QUERY + f" WHERE f.id_fact > {int(high_water)} ORDER BY f.id_fact"
+
+        df = pl.read_database_uri(query, self.uri, engine="adbc")
+        print(f"📦 Registros nuevos en fact_interrupciones: {len(df):,}")
+        if len(df) == 0:
+            print("✅ Golden record al día")
+            return store
+
+        df = df.with_columns(
+            content_key_expr(self.generate_hash_expr()).alias("golden_key")
+        )
+        agregados = store.append(df, high_water=df["id_interrupcion"].max())
+        print(f"♻️  Duplicados eliminados: {len(df) - agregados:,}")
+        print(f"✨ Registros agregados: {agregados:,} (total {len(store):,})")
+
+        if agregados:
+            print("\n🔍 Validaciones de Calidad (registros nuevos):")
+            self.validate(pl.read_parquet(store.parts[-1]).drop("golden_key"))
+
+        store.compact_if_needed()
+        store.export(GOLDEN_PATH)
+        print(f"\n💾 Dataset maestro guardado en: {GOLDEN_PATH}")
+        return store
+
+    def validate(self, df_clean):
         # a) Nulos
         nulls = df_clean.null_count()
         total_nulls = nulls.sum_horizontal()[0]
@@ -99,14 +162,10 @@ class ComprehensiveCleaner:
         else:
             print("✅ Validacion de Magnitud: OK (Sin eventos inverosímiles > 500k)")
 
-        # 4. Exportar Golden Record
-        output_path = "outputs/golden_interrupciones.parquet"
-        df_clean.write_parquet(output_path)
-        print(f"\n💾 Dataset maestro guardado en: {output_path}")
-
-        return df_clean
-
 
 if __name__ == "__main__":
     cleaner = ComprehensiveCleaner()
-    df = cleaner.load_and_clean()
+    if "--full" in sys.argv:
+        df = cleaner.load_and_clean()
+    else:
+        cleaner.load_incremental()
@@ -8,6 +8,7 @@ import plotly.express as px
 import os
 from scripts.analysis.eda_polars import SecDataExplorer
 from scripts.analysis.analyze_seia import SeiaAnalyzer
+from core.reference_data import clientes_lookup
 
 
 def main():
@@ -26,31 +27,8 @@ def main():
         df_sec_raw = explorer.load_data()
 
     # Calcular métricas por región y año
-    # Usamos la misma ponderación que definimos antes
-    ponderacion = {
-        "METROPOLITANA": 2500,
-        "VALPARAISO": 880,
-        "BIOBIO": 720,
-        "MAULE": 440,
-        "LA ARAUCANIA": 430,
-        "O'HIGGINS": 400,
-        "LOS LAGOS": 350,
-        "COQUIMBO": 340,
-        "ANTOFAGASTA": 220,
-        "NUBLE": 210,
-        "LOS RIOS": 170,
-        "TARAPACA": 150,
-        "ATACAMA": 110,
-        "ARICA Y PARINACOTA": 100,
-        "MAGALLANES": 80,
-        "AYSEN": 40,
-    }
-    df_pob = pl.DataFrame(
-        {
-            "nombre_region": list(ponderacion.keys()),
-            "clientes_reg_k": list(ponderacion.values()),
-        }
-    )
+    # Clientes por región (miles) desde GetClientesRegional, con TTL
+    df_pob = clientes_lookup().select("nombre_region", "clientes_reg_k")
 
     df_sec = (
         df_sec_raw.group_by(["nombre_region", "año"])
@@ -1,3 +1,7 @@
+import sys
+
+sys.path.append(".")
+
 import polars as pl
 import os
 from dotenv import load_dotenv
@@ -5,6 +9,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 
+from core.reference_data import clientes_lookup
+
 
 class SecDataExplorer:
     """Explorador de datos de la SEC usando Polars."""
@@ -94,33 +100,8 @@ class SecDataExplorer:
         """Impacto ponderado por cantidad de clientes por región.
         Estimación aproximada de clientes eléctricos por región (CNE/SEC).
         """
-        # Ponderación: Clientes aproximados por región (en miles)
-        ponderacion = {
-            "METROPOLITANA": 2500,
-            "VALPARAISO": 880,
-            "BIOBIO": 720,
-            "MAULE": 440,
-            "LA ARAUCANIA": 430,
-            "O'HIGGINS": 400,
-            "LOS LAGOS": 350,
-            "COQUIMBO": 340,
-            "ANTOFAGASTA": 220,
-            "NUBLE": 210,
-            "LOS RIOS": 170,
-            "TARAPACA": 150,
-            "ATACAMA": 110,
-            "ARICA Y PARINACOTA": 100,
-            "MAGALLANES": 80,
-            "AYSEN": 40,
-        }
-
-        # Convertir a DataFrame de Polars para unir
-        df_pob = pl.DataFrame(
-            {
-                "nombre_region": list(ponderacion.keys()),
-                "clientes_reg_k": list(ponderacion.values()),
-            }
-        )
+        # Clientes por región (miles) desde GetClientesRegional, con TTL
+        df_pob = clientes_lookup().select("nombre_region", "clientes_reg_k")
 
         # Unir y calcular métrica normalizada
         df_norm = (
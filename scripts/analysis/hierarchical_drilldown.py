@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 import plotly.express as px
 
+from core.reference_data import clientes_lookup
+
 
 class SecHierarchicalExplorer:
     """Explorador jerárquico (Region -> Comuna) con soporte de drill-down."""
@@ -97,31 +99,8 @@ class SecHierarchicalExplorer:
             """
             df = pl.read_database_uri(query, self.uri, engine="adbc")
 
-        # Ponderación Regional (Miles de clientes)
-        ponderacion = {
-            "METROPOLITANA": 2500,
-            "VALPARAISO": 880,
-            "BIOBIO": 720,
-            "MAULE": 440,
-            "LA ARAUCANIA": 430,
-            "O'HIGGINS": 400,
-            "LOS LAGOS": 350,
-            "COQUIMBO": 340,
-            "ANTOFAGASTA": 220,
-            "NUBLE": 210,
-            "LOS RIOS": 170,
-            "TARAPACA": 150,
-            "ATACAMA": 110,
-            "ARICA Y PARINACOTA": 100,
-            "MAGALLANES": 80,
-            "AYSEN": 40,
-        }
-        df_pob = pl.DataFrame(
-            {
-                "nombre_region": list(ponderacion.keys()),
-                "clientes_reg_k": list(ponderacion.values()),
-            }
-        )
+        # Clientes por región (miles) desde GetClientesRegional, con TTL
+        df_pob = clientes_lookup().select("nombre_region", "clientes_reg_k")
 
         # Jerarquía profunda
         df = df.with_columns(
@@ -0,0 +1,76 @@
+"""Build fact_eventos - consolidate snapshots into outage events.
+
+Reads the raw point results (bronze archive or partitioned NDJSON dataset),
+links the snapshots of each outage into one event and appends the events
+closed since the last run to ``outputs/fact_eventos``. With ``--db`` the
+new and still-open events are also upserted into PostgreSQL.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(".")
+
+from core.event_consolidator import EventStore, consolidate
+from core.raw_archive import ARCHIVE_INDEX, RawArchive
+from core.scrape_sinks import iter_dataset
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consolida snapshots en eventos")
+    parser.add_argument("--source", default="outputs/bronze")
+    parser.add_argument("--output", default="outputs/fact_eventos")
+    parser.add_argument("--start-year", type=int)
+    parser.add_argument("--end-year", type=int)
+    parser.add_argument(
+        "--finalize", action="store_true", help="Cerrar también los eventos abiertos"
+    )
+    parser.add_argument("--db", action="store_true", help="Upsert en fact_eventos")
+    args = parser.parse_args()
+
+    source = Path(args.source)
+    if not source.exists():
+        print(f"❌ Fuente no encontrada: {source}")
+        return
+
+    store = EventStore(args.output)
+    parts_before = store.part_count()
+
+    if (source / ARCHIVE_INDEX).exists():
+        with RawArchive(source) as archive:
+            stats = consolidate(
+                archive.iter_results(args.start_year, args.end_year),
+                store,
+                finalize=args.finalize,
+            )
+    else:
+        stats = consolidate(
+            iter_dataset(source, args.start_year, args.end_year),
+            store,
+            finalize=args.finalize,
+        )
+
+    print(f"🧩 Snapshots consolidados: {stats['snapshots']:,}")
+    print(f"⏭️  Ya consolidados (omitidos): {stats['skipped']:,}")
+    print(f"✅ Eventos cerrados: {stats['closed']:,} | abiertos: {stats['open']:,}")
+
+    if args.db:
+        from core.postgres_repository import PostgreSQLRepository
+
+        # Solo lo que cambió en esta corrida: partes nuevas + abiertos
+        eventos = store.scan(from_part=parts_before).collect()
+        repo = PostgreSQLRepository()
+        try:
+            print(f"💾 fact_eventos: {repo.save_events(eventos):,} eventos")
+        finally:
+            repo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Simple script that instantiates and runs the HistoricalETLOrchestrator.
 This is the entry point that you execute manually.
 """
 
+import os
 import sys
 import logging
 from pathlib import Path
@@ -21,17 +22,22 @@ logging.basicConfig(
 def main():
     """Main ETL execution."""
 
-    # JSON file path
+    # Partitioned NDJSON dataset (default scraper output) or legacy JSON
+    dataset_dir = "outputs/dataset_completo_2017_2025"
     json_file = "outputs/dataset_completo_2017_2025.json"
+    source = dataset_dir if Path(dataset_dir).is_dir() else json_file
 
     # Check if file exists
-    if not Path(json_file).exists():
-        print(f"❌ File not found: {json_file}")
+    if not Path(source).exists():
+        print(f"❌ Dataset not found: {dataset_dir} (or {json_file})")
         print("💡 Run the async scraper first to generate the data")
         return
 
-    # Instantiate and run orchestrator
-    with HistoricalETLOrchestrator(json_file) as orchestrator:
+    # Instantiate and run orchestrator (transform en procesos, escrituras en threads)
+    transform_processes = max((os.cpu_count() or 2) - 1, 1)
+    with HistoricalETLOrchestrator(
+        source, transform_processes=transform_processes
+    ) as orchestrator:
         orchestrator.load_all()
         # Optional: Load only specific years
         # orchestrator.load_all(start_year=2020, end_year=2025)
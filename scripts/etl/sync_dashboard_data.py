@@ -8,6 +8,7 @@ import polars as pl
 import json
 import os
 from datetime import datetime
+from core.reference_data import clientes_por_region
 from core.supabase_client import get_supabase_client
 from scripts.analysis.analyze_seia import SeiaAnalyzer
 
@@ -24,24 +25,7 @@ class DashboardSyncer:
 
     def generate_market_map_json(self, df):
         print("🗺️ Generando JSON Market Map...")
-        ponderacion = {
-            "METROPOLITANA": 2500,
-            "VALPARAISO": 880,
-            "BIOBIO": 720,
-            "MAULE": 440,
-            "LA ARAUCANIA": 430,
-            "O'HIGGINS": 400,
-            "LOS LAGOS": 350,
-            "COQUIMBO": 340,
-            "ANTOFAGASTA": 220,
-            "NUBLE": 210,
-            "LOS RIOS": 170,
-            "TARAPACA": 150,
-            "ATACAMA": 110,
-            "ARICA Y PARINACOTA": 100,
-            "MAGALLANES": 80,
-            "AYSEN": 40,
-        }
+        clientes = clientes_por_region()
         df_agg = (
             df.with_columns(pl.col("fecha_dt").dt.year().alias("año"))
             .group_by(["nombre_region", "nombre_comuna", "nombre_empresa"])
@@ -53,7 +37,7 @@ class DashboardSyncer:
         records = df_agg.to_dicts()
         for r in records:
             reg = r["nombre_region"]
-            pob = ponderacion.get(reg, 50) * 1000
+            pob = clientes.get(reg, 50_000)
             r["instability_index"] = min(100, (r["total_afectados"] / pob) * 100)
         return records
 
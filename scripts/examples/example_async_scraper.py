@@ -8,7 +8,12 @@ import sys
 
 sys.path.append(".")
 
+from datetime import date
+
 from core.async_historical_scraper import AsyncHistoricalScraper
+from core.scrape_journal import ScrapeJournal
+from core.scrape_planner import ScrapePlanner
+from core.surge_sampler import SurgeDetector
 
 
 async def example_full_dataset():
@@ -53,15 +58,56 @@ async def example_hourly_snapshots():
     await scraper.scrape_all()
 
 
+async def example_fill_gaps():
+    """Example: Scrape only the points missing from the journal and the DB."""
+    from core.postgres_repository import PostgreSQLRepository
+
+    start, end = date(2017, 1, 1), date(2025, 12, 31)
+    journal = ScrapeJournal("outputs/scrape_journal.sqlite")
+    planner = ScrapePlanner(journal=journal)
+
+    repo = PostgreSQLRepository()
+    # Solo fuentes por punto consultado; los días con hechos sobre-cubren
+    planner.add_snapshots(repo.get_snapshot_points(start, end))
+    repo.close()
+
+    scraper = AsyncHistoricalScraper(
+        start_year=start.year,
+        end_year=end.year,
+        max_concurrent=50,
+        journal=journal,
+        planner=planner,
+        dataset_name="dataset_gaps.json",
+    )
+
+    await scraper.scrape_all()
+
+
+async def example_surge_sampling():
+    """Example: 4 snapshots per day, hourly only around outage surges."""
+    scraper = AsyncHistoricalScraper(
+        start_year=2017,
+        end_year=2025,
+        max_concurrent=50,
+        hours=[0, 6, 12, 18],
+        surge=SurgeDetector(factor=4.0, min_affected=20000, pad_days=1),
+        dataset_name="dataset_surge_2017_2025.json",
+    )
+
+    await scraper.scrape_all()
+
+
 if __name__ == "__main__":
     print("Ejemplos de uso de AsyncHistoricalScraper\n")
     print("1. Dataset completo (2017-2025)")
     print("2. Un solo año (2024)")
     print("3. Años recientes (2023-2025)")
     print("4. Snapshots por hora (2025)")
+    print("5. Rellenar solo los huecos (2017-2025)")
+    print("6. Muestreo adaptativo en tormentas (2017-2025)")
     print()
 
-    choice = input("Selecciona un ejemplo (1-4): ")
+    choice = input("Selecciona un ejemplo (1-6): ")
 
     if choice == "1":
         asyncio.run(example_full_dataset())
@@ -71,5 +117,9 @@ if __name__ == "__main__":
         asyncio.run(example_recent_years())
     elif choice == "4":
         asyncio.run(example_hourly_snapshots())
+    elif choice == "5":
+        asyncio.run(example_fill_gaps())
+    elif choice == "6":
+        asyncio.run(example_surge_sampling())
     else:
         print("Opción inválida")
@@ -0,0 +1,36 @@
+"""Backfill completo 2017-2025 repartido entre todos los núcleos.
+
+Cada worker es un proceso con su propio Chromium y event loop; los meses
+se reparten a través del journal compartido en ``outputs/``, así que se
+puede interrumpir y relanzar sin repetir trabajo.
+"""
+
+import os
+import sys
+
+sys.path.append(".")
+from core.sharded_backfill import ShardedBackfill
+
+
+def backfill_full_dataset(
+    start_year=2017, end_year=2025, workers=None, max_concurrent=64
+):
+    """Lanza el backfill por shards.
+
+    Genera ``outputs/dataset_completo_2017_2025/`` (mismo formato que
+    ``scripts/scrape_completo_2017_2025.py``).
+    """
+    backfill = ShardedBackfill(
+        start_year=start_year,
+        end_year=end_year,
+        workers=workers,
+        max_concurrent=max_concurrent,
+        hours=[0, 6, 12, 18],
+        dataset_name=f"dataset_completo_{start_year}_{end_year}.json",
+    )
+    return backfill.run()
+
+
+if __name__ == "__main__":
+    print(f"🚀 Backfill 2017-2025 con {os.cpu_count()} workers...\n")
+    backfill_full_dataset()
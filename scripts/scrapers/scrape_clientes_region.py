@@ -2,74 +2,30 @@
 
 Endpoint: GetClientesRegional
 Payload: {"region": "nombre_region"}
+
+Las regiones se consultan en paralelo sobre un cliente HTTP con pool de
+conexiones (``core.reference_data``) y se guardan como snapshot fechado en
+``data/processed/clientes_region.parquet``.
 """
 
-import requests
+import asyncio
 import json
-from pathlib import Path
+import sys
 import time
+from pathlib import Path
+
+sys.path.append(".")
+
+import polars as pl
+
+from core.reference_data import (
+    REGIONES_SEC,
+    ClientesRegionalStore,
+    fetch_clientes_regionales,
+)
 
 # Regiones de Chile (según SEC)
-REGIONES = [
-    "Region de Arica y Parinacota",
-    "Region de Tarapaca",
-    "Region de Antofagasta",
-    "Region de Atacama",
-    "Region de Coquimbo",
-    "Region de Valparaiso",
-    "Region Metropolitana de Santiago",
-    "Region del Libertador General Bernardo O'Higgins",
-    "Region del Maule",
-    "Region del Biobio",
-    "Region de La Araucania",
-    "Region de Los Rios",
-    "Region de Los Lagos",
-    "Region de Aysen del General Carlos Ibanez del Campo",
-    "Region de Magallanes y de la Antartica Chilena",
-    "Region de Nuble",
-]
-
-
-def scrape_clientes_region(region_nombre):
-    """Obtiene total de clientes para una región."""
-
-    url = "https://apps.sec.cl/INTONLINEv1/ClientesAfectados/GetClientesRegional"
-
-    payload = {"region": region_nombre}
-
-    headers = {
-        "Content-Type": "application/json",
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-    }
-
-    try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-
-        # El API devuelve una lista, tomar el primer elemento
-        if isinstance(data, list) and len(data) > 0:
-            item = data[0]
-        else:
-            item = data
-
-        return {
-            "region": region_nombre,
-            "clientes": item.get("CLIENTES"),
-            "region_id": item.get("REGION_ID"),
-            "success": True,
-        }
-
-    except Exception as e:
-        print(f"  ❌ Error en {region_nombre}: {e}")
-        return {
-            "region": region_nombre,
-            "clientes": None,
-            "region_id": None,
-            "success": False,
-            "error": str(e),
-        }
+REGIONES = list(REGIONES_SEC)
 
 
 def scrape_todas_regiones():
@@ -80,22 +36,15 @@ def scrape_todas_regiones():
     print("=" * 70)
     print()
 
-    resultados = []
-
-    for i, region in enumerate(REGIONES, 1):
-        print(f"📍 {i}/{len(REGIONES)}: {region}...", end=" ")
-
-        resultado = scrape_clientes_region(region)
-        resultados.append(resultado)
+    resultados = asyncio.run(fetch_clientes_regionales(REGIONES))
 
+    for i, resultado in enumerate(resultados, 1):
+        print(f"📍 {i}/{len(REGIONES)}: {resultado['region']}...", end=" ")
         if resultado["success"]:
             clientes = int(resultado["clientes"]) if resultado["clientes"] else 0
             print(f"✅ {clientes:,} clientes")
         else:
-            print(f"❌ Error")
-
-        # Pausa para no saturar
-        time.sleep(0.5)
+            print(f"❌ Error: {resultado['error']}")
 
     print()
     print("=" * 70)
@@ -111,6 +60,11 @@ def scrape_todas_regiones():
     print(f"📊 Total clientes nacional: {total_clientes:,}")
     print()
 
+    # Serie de tiempo fechada (lo que consumen los análisis)
+    store = ClientesRegionalStore()
+    guardadas = store.append(resultados)
+    print(f"💾 Snapshot de {guardadas} regiones en: {store.path}")
+
     # Guardar resultados
     output_dir = Path("data/processed")
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -135,16 +89,19 @@ def scrape_todas_regiones():
     print(f"💾 Guardado en: {output_file}")
 
     # Guardar también en CSV para fácil uso
-    import pandas as pd
-
-    df = pd.DataFrame(resultados)
-    df_exitosos = df[df["success"] == True].copy()
-    df_exitosos["clientes"] = df_exitosos["clientes"].astype(int)
-
     csv_file = output_dir / "clientes_por_region.csv"
-    df_exitosos[["region", "region_id", "clientes"]].to_csv(
-        csv_file, index=False, encoding="utf-8"
-    )
+    pl.DataFrame(
+        [
+            {
+                "region": r["region"],
+                "region_id": None if r["region_id"] is None else str(r["region_id"]),
+                "clientes": int(r["clientes"]),
+            }
+            for r in resultados
+            if r["success"] and r["clientes"] is not None
+        ],
+        schema={"region": pl.String, "region_id": pl.String, "clientes": pl.Int64},
+    ).write_csv(csv_file)
     print(f"💾 CSV guardado en: {csv_file}")
 
     return resultados
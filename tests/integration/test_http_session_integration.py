@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.http_fetcher import ChallengeDetected, SECHttpSession
+
+CORTES = [
+    {
+        "NOMBRE_REGION": "METROPOLITANA",
+        "NOMBRE_COMUNA": "SANTIAGO",
+        "NOMBRE_EMPRESA": "ENEL",
+        "CLIENTES_AFECTADOS": 100,
+        "FECHA_INT_STR": "18/01/2024",
+        "ACTUALIZADO_HACE": "0 Dias 1 Horas 5 Minutos",
+    }
+]
+
+
+class FakeSECHandler(BaseHTTPRequestHandler):
+    """Imita GetPorFecha y GetHoraServer; exige la cookie de sesión."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        raw = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server.connections.add(self.client_address)
+        server.requests.append((self.path, body, dict(self.headers)))
+
+        if server.challenge or "cf_clearance=ok" not in self.headers.get("Cookie", ""):
+            self._send(403, "<html><title>Just a moment...</title></html>", "text/html")
+        elif self.path.endswith("/GetPorFecha"):
+            self._send(200, json.dumps(CORTES), "application/json; charset=utf-8")
+        elif self.path.endswith("/GetHoraServer"):
+            self._send(200, json.dumps([{"FECHA": "20/01/2024 10:00"}]), "application/json")
+        else:
+            self._send(404, "not found", "text/plain")
+
+
+@pytest.fixture
+def fake_sec():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSECHandler)
+    server.challenge = False
+    server.connections = set()
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _session(server):
+    host, port = server.server_address
+    cookies = [{"name": "cf_clearance", "value": "ok", "domain": host, "path": "/"}]
+    return SECHttpSession(
+        cookies,
+        "Mozilla/5.0 (Test)",
+        base_url=f"http://{host}:{port}/INTONLINEv1/ClientesAfectados",
+    )
+
+
+def test_http_session_reutiliza_cookies_y_conexion(fake_sec):
+    """TEST: GetPorFecha directo con cookies de Playwright y keep-alive"""
+
+    async def run():
+        http = _session(fake_sec)
+        try:
+            results = []
+            for dia in range(1, 6):
+                payload = {"anho": 2024, "mes": 1, "dia": dia, "hora": 0}
+                results.append(await http.fetch_por_fecha(payload))
+            hora = await http.fetch_hora_server()
+        finally:
+            await http.close()
+        return results, hora
+
+    results, hora = asyncio.run(run())
+
+    assert all(r == CORTES for r in results)
+    assert hora == [{"FECHA": "20/01/2024 10:00"}]
+    # 6 requests secuenciales sobre una sola conexión keep-alive
+    assert len(fake_sec.requests) == 6
+    assert len(fake_sec.connections) == 1
+
+    path, body, headers = fake_sec.requests[0]
+    assert json.loads(body) == {"anho": 2024, "mes": 1, "dia": 1, "hora": 0}
+    assert headers["User-Agent"] == "Mozilla/5.0 (Test)"
+
+
+def test_http_session_detecta_desafio(fake_sec):
+    """TEST: Un desafío de Cloudflare se reporta como ChallengeDetected"""
+    fake_sec.challenge = True
+
+    async def run():
+        http = _session(fake_sec)
+        try:
+            await http.fetch_por_fecha({"anho": 2024, "mes": 1, "dia": 1, "hora": 0})
+        finally:
+            await http.close()
+
+    with pytest.raises(ChallengeDetected):
+        asyncio.run(run())
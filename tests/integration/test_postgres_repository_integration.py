@@ -1,5 +1,6 @@
 import pytest
 from datetime import date, time, datetime
+from core.normalization import NORMALIZER
 from core.postgres_repository import PostgreSQLRepository
 
 
@@ -27,7 +28,7 @@ class TestPostgreSQLRepositoryIntegration:
 
         # 2. Obtener de nuevo (debe venir de cache)
         # Verificamos que la cache tenga la llave
-        assert f"{region}|{comuna}" in repo._geo_cache
+        assert (NORMALIZER.code(region), NORMALIZER.code(comuna)) in repo._geo_cache
         id2 = repo.get_or_create_geografia(region, comuna)
         assert id1 == id2
 
@@ -42,7 +43,7 @@ class TestPostgreSQLRepositoryIntegration:
 
         id1 = repo.get_or_create_empresa(empresa)
         assert id1 > 0
-        assert empresa in repo._emp_cache
+        assert NORMALIZER.code(empresa) in repo._emp_cache
 
         id2 = repo.get_or_create_empresa(empresa)
         assert id1 == id2
@@ -85,9 +86,10 @@ class TestPostgreSQLRepositoryIntegration:
         # Guardar batch
         res = repo.save_records(records)
 
-        # execute_values con ON CONFLICT DO NOTHING reporta len(records) procesados en mi impl
-        # (aunque en SQL solo se inserte 1)
-        assert res["insertados"] == 2
+        # El duplicado del lote se descarta antes de enviarlo: los conteos
+        # son los reales (0 insertados si el hash ya existía de otra corrida)
+        assert res["insertados"] + res["duplicados"] == 2
+        assert res["duplicados"] >= 1
 
         # Verificar en DB que solo hay 1
         with repo.conn.cursor() as cur:
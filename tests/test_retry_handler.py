@@ -78,3 +78,109 @@ def test_backoff_strategies():
     handler_exp = RetryHandler(strategy=RetryStrategy.EXPONENTIAL, base_delay=2.0)
     # Simple check de que incremente
     assert handler_exp.calculate_delay(2) > handler_exp.calculate_delay(1)
+
+
+def test_async_retry_no_bloquea_el_loop():
+    """Verifica que una corrutina se reintente con asyncio.sleep."""
+    import asyncio
+
+    from core.retry_handler import RetryHandler
+
+    handler = RetryHandler(max_attempts=3, base_delay=0.05, logger=logger)
+    calls = {"n": 0}
+    ticks = []
+
+    @handler
+    async def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise ConnectionError("caída")
+        return "ok"
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.02)
+
+    async def run():
+        result, _ = await asyncio.gather(flaky(), ticker())
+        return result
+
+    assert asyncio.run(run()) == "ok"
+    assert len(ticks) == 5
+    metrics = handler.metrics.snapshot()
+    assert metrics["attempts"] == 3
+    assert metrics["retries"] == 2
+    assert metrics["successes"] == 1
+    assert metrics["wait_seconds"] > 0
+
+
+def test_full_jitter_dentro_del_rango():
+    """Verifica que el jitter quede entre 0 y el delay de la estrategia."""
+    from core.retry_handler import RetryHandler
+
+    handler = RetryHandler(base_delay=2.0, max_delay=60.0, jitter=True)
+    delays = [handler.calculate_delay(3) for _ in range(200)]
+
+    assert all(0 <= d <= 16.0 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_reglas_por_excepcion():
+    """Verifica que cada clase de excepción aplique su propia regla."""
+    from core.retry_handler import RetryHandler, RetryRule
+
+    handler = RetryHandler(
+        max_attempts=5,
+        base_delay=0.0,
+        rules={
+            ValueError: RetryRule(retry=False),
+            TimeoutError: RetryRule(max_attempts=2, base_delay=7.0),
+        },
+        logger=logger,
+    )
+    calls = {"value": 0, "timeout": 0}
+
+    @handler
+    def bad_value():
+        calls["value"] += 1
+        raise ValueError("no reintentar")
+
+    @handler
+    def slow():
+        calls["timeout"] += 1
+        raise TimeoutError("lento")
+
+    with pytest.raises(ValueError):
+        bad_value()
+    assert calls["value"] == 1
+
+    assert handler.calculate_delay(0, TimeoutError()) == 7.0
+    handler.rules[TimeoutError].base_delay = 0.0
+    with pytest.raises(TimeoutError):
+        slow()
+    assert calls["timeout"] == 2
+
+
+def test_presupuesto_compartido_corta_reintentos():
+    """Verifica que el presupuesto global limite los reintentos del run."""
+    from core.retry_handler import RetryBudget, RetryHandler
+
+    budget = RetryBudget(ratio=0.0, min_retries=2)
+    handler = RetryHandler(
+        max_attempts=10, base_delay=0.0, budget=budget, logger=logger
+    )
+
+    @handler
+    def always_fails():
+        raise ConnectionError("caída")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            always_fails()
+
+    metrics = handler.metrics.snapshot()
+    assert metrics["retries"] == 2
+    assert metrics["budget_exhausted"] == 2
+    assert metrics["failures"] == 2
+    assert budget.remaining == 0
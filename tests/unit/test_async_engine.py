@@ -0,0 +1,265 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from core.async_engine import AsyncSECEngine
+from core.sec_fetch import FETCH_HORA_SERVER_SCRIPT
+
+HORA_SERVER = [{"FECHA": "20/01/2024 10:00"}]
+
+
+class FakePage:
+    """Página falsa que registra cuántos fetches tiene en vuelo."""
+
+    def __init__(self, tracker, result=None):
+        self.tracker = tracker
+        self.result = result or {"data": [{"X": 1}], "horaServer": None, "error": None}
+        self.calls = 0
+        self.clock_calls = 0
+        self.context = MagicMock()
+        self.context.close = AsyncMock()
+
+    async def evaluate(self, script, payload):
+        if script == FETCH_HORA_SERVER_SCRIPT:
+            self.clock_calls += 1
+            return {"horaServer": HORA_SERVER, "error": None}
+        self.calls += 1
+        self.tracker["in_flight"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["in_flight"])
+        await asyncio.sleep(0.01)
+        self.tracker["in_flight"] -= 1
+        return self.result
+
+
+def _engine_with_pages(pages, max_concurrent):
+    engine = AsyncSECEngine(
+        num_pages=len(pages), max_concurrent=max_concurrent, attempts=1
+    )
+    engine._pages = list(pages)
+    engine._page_locks = [asyncio.Lock() for _ in pages]
+    return engine
+
+
+def test_semaforo_limita_fetches_en_vuelo():
+    """✅ Un solo semáforo acota la concurrencia total entre páginas"""
+    tracker = {"in_flight": 0, "peak": 0}
+    pages = [FakePage(tracker), FakePage(tracker)]
+
+    async def run():
+        engine = _engine_with_pages(pages, max_concurrent=3)
+        return await asyncio.gather(
+            *(engine.scrape_point(2017, 1, d, 0, d) for d in range(1, 11))
+        )
+
+    results = asyncio.run(run())
+
+    assert all(r["success"] for r in results)
+    assert tracker["peak"] <= 3
+    # GetHoraServer se consulta una sola vez por sesión
+    assert pages[0].clock_calls + pages[1].clock_calls == 1
+    assert all(r["hora_server_scraping"] is not None for r in results)
+    # Los fetches se reparten entre ambas páginas
+    assert pages[0].calls == 5 and pages[1].calls == 5
+
+
+def test_error_http_se_reporta_sin_excepcion():
+    """✅ Un error HTTP devuelve success=False con el detalle"""
+    tracker = {"in_flight": 0, "peak": 0}
+    page = FakePage(tracker, result={"data": None, "error": "HTTP 500"})
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=1)
+        return await engine.scrape_point(2017, 1, 1, 6)
+
+    result = asyncio.run(run())
+
+    assert result["success"] is False
+    assert result["error"] == "HTTP 500"
+    assert result["fecha_consultada"] == "2017-01-01 06:00"
+
+
+class FakeBatchPage(FakePage):
+    """Página falsa que responde al script por lotes."""
+
+    async def evaluate(self, script, arg):
+        if script == FETCH_HORA_SERVER_SCRIPT:
+            return {"horaServer": HORA_SERVER, "error": None}
+        self.calls += 1
+        self.tracker["last_concurrency"] = arg["concurrency"]
+        return [
+            {"data": [], "horaServer": None, "error": "HTTP 500"}
+            if p["dia"] == 2
+            else {"data": [{"DIA": p["dia"]}], "horaServer": None, "error": None}
+            for p in arg["payloads"]
+        ]
+
+
+def test_lote_un_solo_evaluate_y_reintento_individual():
+    """✅ Un lote usa un evaluate y reintenta solo los puntos fallidos"""
+    tracker = {"in_flight": 0, "peak": 0}
+    page = FakeBatchPage(tracker)
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=4)
+        engine.scrape_point = AsyncMock(
+            return_value={"success": True, "data": ["retry"], "point_num": 0}
+        )
+        results = await engine.scrape_batch([(2017, 1, d, 0) for d in range(1, 6)])
+        return engine, results
+
+    engine, results = asyncio.run(run())
+
+    assert page.calls == 1
+    assert tracker["last_concurrency"] == 4
+    assert [r["data"] for r in results][:3] == [[{"DIA": 1}], ["retry"], [{"DIA": 3}]]
+    engine.scrape_point.assert_awaited_once_with(2017, 1, 2, 0)
+    # Los permisos del semáforo se devuelven al terminar el lote
+    assert engine.semaphore._value == 4
+
+
+def test_modo_http_vuelve_al_navegador_ante_desafio():
+    """✅ Un desafío en modo HTTP cae al navegador y renueva la sesión"""
+    from core.http_fetcher import ChallengeDetected
+
+    tracker = {"in_flight": 0, "peak": 0}
+    page = FakePage(tracker)
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=2)
+        stale = MagicMock()
+        stale.fetch_por_fecha = AsyncMock(side_effect=ChallengeDetected("403"))
+        stale.fetch_hora_server = AsyncMock(return_value=HORA_SERVER)
+        stale.close = AsyncMock()
+        engine.http = stale
+        engine._recycle_page = AsyncMock()
+        fresh = MagicMock()
+        with patch(
+            "core.async_engine.SECHttpSession.from_page", AsyncMock(return_value=fresh)
+        ):
+            result = await engine.scrape_point(2017, 1, 1, 0)
+        return engine, stale, fresh, result
+
+    engine, stale, fresh, result = asyncio.run(run())
+
+    assert result["success"] is True
+    assert page.calls == 1  # el punto se resolvió en el navegador
+    stale.close.assert_awaited_once()
+    engine._recycle_page.assert_awaited_once()
+    assert engine.http is fresh
+
+
+def test_sesion_http_retirada_se_cierra_tras_requests_en_vuelo():
+    """✅ La sesión vieja se cierra recién cuando termina su último request"""
+    from core.http_fetcher import ChallengeDetected
+
+    page = FakePage({"in_flight": 0, "peak": 0})
+    eventos = []
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=4)
+        liberar = asyncio.Event()
+
+        async def fetch(payload):
+            if payload["dia"] == 1:
+                raise ChallengeDetected("403")
+            await liberar.wait()
+            eventos.append("lento_ok")
+            return [{"X": 2}]
+
+        async def close():
+            eventos.append("close")
+
+        stale = MagicMock()
+        stale.fetch_por_fecha = fetch
+        stale.close = close
+        engine.http = stale
+        engine._recycle_page = AsyncMock()
+
+        with patch(
+            "core.async_engine.SECHttpSession.from_page",
+            AsyncMock(side_effect=RuntimeError("sin navegador")),
+        ):
+            lento = asyncio.create_task(engine._fetch_one({"dia": 2}))
+            await asyncio.sleep(0)
+            desafio = await engine._fetch_one({"dia": 1})
+            assert eventos == []  # el request lento sigue usando la sesión
+            liberar.set()
+            return desafio, await lento
+
+    desafio, lento = asyncio.run(run())
+
+    assert desafio == page.result  # resuelto en el navegador
+    assert lento == {"data": [{"X": 2}], "error": None}
+    assert eventos == ["lento_ok", "close"]
+
+
+class TimeoutPage(FakePage):
+    """Página falsa cuyo fetch vence siempre el plazo."""
+
+    async def evaluate(self, script, arg):
+        if script == FETCH_HORA_SERVER_SCRIPT:
+            return {"horaServer": HORA_SERVER, "error": None}
+        self.calls += 1
+        raise asyncio.TimeoutError()
+
+
+def test_lote_con_timeout_reintenta_y_no_queda_done(tmp_path):
+    """✅ Un timeout del lote (str vacío) marca los puntos como fallidos"""
+    from core.scrape_journal import ScrapeJournal
+
+    page = TimeoutPage({"in_flight": 0, "peak": 0})
+    points = [(2017, 1, d, 0) for d in range(1, 6)]
+    timeouts = []
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=2)
+        engine.batch_concurrency = 2
+        engine._recycle_page = AsyncMock()
+        evaluate = engine._evaluate
+
+        async def spy(script, arg, timeout=None):
+            timeouts.append(timeout)
+            return await evaluate(script, arg, timeout)
+
+        engine._evaluate = spy
+        return await engine.scrape_batch(points)
+
+    results = asyncio.run(run())
+
+    assert [r["success"] for r in results] == [False] * 5
+    assert {r["error"] for r in results} == {"TimeoutError"}
+    # 1 evaluate del lote + 1 reintento individual por punto
+    assert page.calls == 1 + len(points)
+    # 5 puntos con 2 workers: 3 rondas de fetch_timeout
+    assert 3 * 60.0 in timeouts
+
+    journal = ScrapeJournal(tmp_path / "journal.sqlite")
+    for point, result in zip(points, results):
+        journal.record(point, result)
+    assert journal.pending(points) == points
+
+
+def test_sesion_rechazada_se_borra_del_disco(tmp_path):
+    """✅ Un 403 en un fetch descarta la sesión guardada para el próximo inicio"""
+    from core.session_store import SessionStore
+
+    store = SessionStore(tmp_path / "s.json")
+    store.save({"cookies": [], "origins": []}, "UA")
+    page = FakePage(
+        {"in_flight": 0, "peak": 0},
+        result={"data": None, "horaServer": None, "error": "HTTP 403"},
+    )
+
+    async def run():
+        engine = _engine_with_pages([page], max_concurrent=2)
+        engine.session_store = store
+        return await engine.scrape_point(2017, 1, 1, 0)
+
+    result = asyncio.run(run())
+
+    assert result["success"] is False
+    assert not store.path.exists()
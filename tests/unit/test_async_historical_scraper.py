@@ -0,0 +1,83 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import json
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.scrape_sinks import YearCheckpointSink
+
+
+class FakeEngine:
+    """Motor falso: el 1 de enero es lento, el resto responde al instante."""
+
+    num_pages = 1
+
+    def __init__(self):
+        self.events = []
+
+    async def scrape_batch(self, points):
+        results = []
+        for year, month, day, hour in points:
+            self.events.append(("start", month, day))
+            if (month, day) == (1, 1):
+                await asyncio.sleep(0.05)
+            else:
+                await asyncio.sleep(0)
+            self.events.append(("end", month, day))
+            results.append(
+                {
+                    "success": True,
+                    "fecha_consultada": f"{year}-{month:02d}-{day:02d} {hour:02d}:00",
+                    "data": [{"X": 1}],
+                }
+            )
+        return results
+
+    async def close(self):
+        pass
+
+
+def _scraper(tmp_path, engine, output_format="ndjson"):
+    return AsyncHistoricalScraper(
+        start_year=2017,
+        end_year=2017,
+        max_concurrent=4,
+        hours=[0],
+        output_dir=str(tmp_path),
+        engine=engine,
+        batch_size=1,
+        output_format=output_format,
+    )
+
+
+def test_cola_continua_sin_barrera_mensual(tmp_path):
+    """✅ Febrero avanza aunque un punto de enero siga en vuelo"""
+    engine = FakeEngine()
+    scraper = _scraper(tmp_path, engine)
+    points = [(2017, 1, d, 0) for d in range(1, 4)] + [
+        (2017, 2, d, 0) for d in range(1, 4)
+    ]
+    sink = YearCheckpointSink(tmp_path, {2017: len(points)})
+
+    asyncio.run(scraper.scrape_points(points, sink))
+
+    slow_end = engine.events.index(("end", 1, 1))
+    feb_start = engine.events.index(("start", 2, 1))
+    assert feb_start < slow_end
+    assert sink.year_data(2017)["metadata"]["total_points"] == 6
+
+
+def test_checkpoint_se_escribe_al_completar_el_anio(tmp_path):
+    """✅ El checkpoint anual se escribe en orden de calendario"""
+    scraper = _scraper(tmp_path, FakeEngine(), output_format="json")
+
+    year_data = asyncio.run(scraper.scrape_year(2017, 1))
+
+    checkpoint = json.loads((tmp_path / "checkpoint_2017.json").read_text("utf-8"))
+    assert checkpoint["metadata"]["total_points"] == 365
+    assert year_data["metadata"]["successful"] == 365
+    fechas = [r["fecha_consultada"] for r in checkpoint["data"]]
+    assert fechas == sorted(fechas)
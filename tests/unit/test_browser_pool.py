@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.browser_pool import BrowserPool
+
+
+@pytest.fixture
+def fake_playwright():
+    """Simula sync_playwright(): cada new_context devuelve un contexto nuevo."""
+    with patch("core.browser_pool.sync_playwright") as mock_sp:
+        browser = mock_sp.return_value.start.return_value.chromium.launch.return_value
+        browser.new_context.side_effect = lambda **kwargs: MagicMock()
+        yield browser
+
+
+@pytest.fixture
+def pool(fake_playwright):
+    return BrowserPool(
+        size=1, max_requests_per_context=3, home_delay=0, app_delay=0
+    )
+
+
+def _set_result(pool, result):
+    pool.acquire().page.evaluate.return_value = result
+
+
+def test_contexto_se_reutiliza_entre_fetches(pool, fake_playwright):
+    """✅ Un mismo contexto sirve varios payloads sin relanzar el navegador"""
+    _set_result(pool, {"data": [], "error": None})
+
+    pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+    pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 6})
+
+    assert fake_playwright.new_context.call_count == 1
+    assert pool.stats["fetches"] == 2
+
+
+def test_recicla_tras_n_requests(pool, fake_playwright):
+    """✅ El contexto se recicla al llegar a max_requests_per_context"""
+    _set_result(pool, {"data": [], "error": None})
+    first = pool._slots[0]
+    first.requests_served = 3
+
+    ctx = pool.acquire()
+
+    assert ctx is not first
+    first.context.close.assert_called_once()
+    assert pool.stats["contexts_recycled"] == 1
+
+
+def test_recicla_tras_error(pool, fake_playwright):
+    """✅ Un fetch con error descarta el contexto"""
+    _set_result(pool, {"data": None, "error": "HTTP 403"})
+    first = pool._slots[0]
+
+    result = pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+
+    assert result["error"] == "HTTP 403"
+    assert pool._slots[0] is None
+    first.context.close.assert_called_once()
+
+
+def test_recicla_tras_excepcion(pool, fake_playwright):
+    """✅ Una excepción de Playwright descarta el contexto y se propaga"""
+    first = pool.acquire()
+    first.page.evaluate.side_effect = RuntimeError("Target closed")
+
+    with pytest.raises(RuntimeError):
+        pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+
+    assert pool._slots[0] is None
+
+
+def test_close_libera_navegador(pool, fake_playwright):
+    """✅ close() cierra contextos y navegador"""
+    ctx = pool.acquire()
+    pool.close()
+
+    ctx.context.close.assert_called_once()
+    fake_playwright.close.assert_called_once()
+
+
+def test_lote_cuenta_cada_payload_una_vez(pool, fake_playwright):
+    """✅ Un lote suma sus payloads al contador; uno vacío no toca nada"""
+    ctx = pool.acquire()
+    ctx.page.evaluate.side_effect = lambda script, *arg: (
+        [{"data": [], "error": None} for _ in arg[0]["payloads"]]
+        if arg
+        else {"horaServer": None, "error": None}
+    )
+    llamadas = ctx.page.evaluate.call_count
+
+    assert pool.fetch_batch([]) == []
+    assert ctx.requests_served == 0
+    assert ctx.page.evaluate.call_count == llamadas
+
+    pool.fetch_batch([{"anho": 2017, "mes": 1, "dia": d, "hora": 0} for d in (1, 2)])
+    assert ctx.requests_served == 2
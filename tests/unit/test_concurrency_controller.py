@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+
+import pytest
+
+from core.concurrency_controller import AdaptiveConcurrencyController
+
+
+@pytest.fixture
+def controller():
+    return AdaptiveConcurrencyController(
+        initial=10, min_limit=2, max_limit=16, target_p95=5.0, window=10
+    )
+
+
+def test_aumento_aditivo_si_sec_esta_sana(controller):
+    """✅ Una ventana sana sube el límite de forma aditiva"""
+    for _ in range(10):
+        decision = controller.record(1.0)
+
+    assert decision is not None
+    assert controller.limit == 12
+    assert decision.reason == "SEC sana"
+
+
+def test_baja_multiplicativa_por_errores(controller):
+    """✅ Errores HTTP sobre el umbral reducen el límite a la mitad"""
+    for i in range(10):
+        controller.record(1.0, ok=i > 2, http_error=i <= 2)
+
+    assert controller.limit == 5
+    assert controller.decisions[-1].error_rate == pytest.approx(0.3)
+
+
+def test_baja_por_latencia_p95(controller):
+    """✅ Un p95 sobre el objetivo reduce el límite aunque no haya errores"""
+    for i in range(10):
+        controller.record(20.0 if i >= 8 else 1.0)
+
+    assert controller.limit == 5
+    assert "p95" in controller.decisions[-1].reason
+
+
+def test_respeta_limites_min_y_max(controller):
+    """✅ El límite nunca sale de [min_limit, max_limit]"""
+    for _ in range(100):
+        controller.record(1.0)
+    assert controller.limit == 16
+
+    for _ in range(100):
+        controller.record(1.0, timeout=True)
+    assert controller.limit == 2
+
+
+def test_gate_respeta_limite_en_vuelo():
+    """✅ acquire() nunca deja más requests en vuelo que el límite"""
+    controller = AdaptiveConcurrencyController(initial=3, min_limit=1, window=1000)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with controller:
+            peak = max(peak, controller.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(request() for _ in range(12)))
+
+    asyncio.run(run())
+
+    assert peak == 3
+    assert controller.in_flight == 0
+
+
+def test_release_sincrono_despierta_waiters_con_gc():
+    """✅ release() conserva la task de aviso aunque corra el recolector"""
+    import gc
+
+    controller = AdaptiveConcurrencyController(initial=1, min_limit=1, window=1000)
+
+    async def run():
+        await controller.acquire()
+        waiter = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        controller.release()
+        assert len(controller._notify_tasks) == 1
+        gc.collect()
+        await asyncio.wait_for(waiter, timeout=1)
+        controller.release()
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert controller.in_flight == 0
+    assert not controller._notify_tasks
@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import polars as pl
+
+from core.duration import actualizado_minutes_expr, parse_actualizado_hace
+from core.tranformer import SecDataTransformer
+
+
+def test_parse_actualizado_hace_formatos():
+    """✅ Días, horas y minutos a minutos; sin componentes da None"""
+    valores = [
+        "2 Dias 0 Horas 0 Minutos",
+        "0 Dias 0 Horas 17 Minutos ",
+        "1 Dia 2 Horas 3 Minutos",
+        "1 Horas",
+        "5 min",
+        "",
+        "sin dato",
+        None,
+        42,
+    ]
+    assert parse_actualizado_hace(valores) == [
+        2880,
+        17,
+        1563,
+        60,
+        5,
+        None,
+        None,
+        None,
+        None,
+    ]
+    assert parse_actualizado_hace([]) == []
+
+
+def test_actualizado_minutes_expr_en_lazyframe():
+    """✅ La expresión se puede usar directamente sobre un LazyFrame"""
+    lf = pl.LazyFrame({"hace": ["3 Dias 1 Horas 0 Minutos", None]})
+    out = lf.select(actualizado_minutes_expr(pl.col("hace")).alias("min")).collect()
+    assert out["min"].to_list() == [4380, None]
+
+
+def test_transformer_emite_minutos():
+    """✅ El transformer agrega ACTUALIZADO_HACE_MIN junto al texto original"""
+    raw = [
+        {
+            "NOMBRE_REGION": "Biobio",
+            "NOMBRE_COMUNA": "Concepcion",
+            "NOMBRE_EMPRESA": "CGE",
+            "CLIENTES_AFECTADOS": 10,
+            "FECHA_INT_STR": "25/10/2023 14:30",
+            "ACTUALIZADO_HACE": " 1 Dias 1 Horas 1 Minutos ",
+        },
+        {
+            "NOMBRE_REGION": "Biobio",
+            "NOMBRE_COMUNA": "Talcahuano",
+            "NOMBRE_EMPRESA": "CGE",
+            "CLIENTES_AFECTADOS": 5,
+            "FECHA_INT_STR": "25/10/2023 14:30",
+            "ACTUALIZADO_HACE": None,
+        },
+    ]
+    records = SecDataTransformer().transform(raw, "25/10/2023 15:00")
+    por_comuna = {r["COMUNA"]: r for r in records}
+
+    assert por_comuna["CONCEPCION"]["ACTUALIZADO_HACE"] == "1 Dias 1 Horas 1 Minutos"
+    assert por_comuna["CONCEPCION"]["ACTUALIZADO_HACE_MIN"] == 1501
+    assert por_comuna["TALCAHUANO"]["ACTUALIZADO_HACE_MIN"] is None
+
+
+def test_texto_con_basura_no_se_parsea():
+    """✅ La regex está anclada: nada fuera de los componentes es aceptado"""
+    from core.data_quality_check import DataQualityChecker
+
+    basura = ["5 Horas basura", "3 minimal", "x 2 Dias", "2 Dias 1 Horas 5 Min extra"]
+    assert parse_actualizado_hace(basura) == [None] * len(basura)
+    assert parse_actualizado_hace(["1 min", "1 Minuto", " 2 Horas 15 Minutos "]) == [
+        1,
+        1,
+        135,
+    ]
+
+    fila = {"ACTUALIZADO_HACE": "5 Horas basura", "clientes_afectados": 10}
+    fila["ACTUALIZADO_HACE_MIN"] = parse_actualizado_hace([fila["ACTUALIZADO_HACE"]])[0]
+    valido, error = DataQualityChecker.validate_row(fila)
+    assert not valido and "formato inválido" in error
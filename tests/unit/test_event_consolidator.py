@@ -0,0 +1,149 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date, datetime, time, timedelta
+
+import polars as pl
+import pytest
+
+from core.event_consolidator import EventConsolidator, EventStore, consolidate
+
+
+def _record(ts, comuna, clientes, inicio=(date(2023, 10, 25), time(5, 30))):
+    return {
+        "TIMESTAMP_SERVER": ts,
+        "FECHA_DT": inicio[0],
+        "HORA_INT": inicio[1],
+        "REGION": "BIOBIO",
+        "COMUNA": comuna,
+        "EMPRESA": "CGE",
+        "CLIENTES_AFECTADOS": clientes,
+    }
+
+
+def _batch(day, hour, cortes, hora_server="17/10/2026 03:00"):
+    """Resultado crudo de un punto: cortes = [(comuna, clientes)].
+
+    Por defecto todos los puntos se scrapean en el mismo instante del
+    servidor, como en un backfill.
+    """
+    return {
+        "fecha_consultada": f"2023-10-{day:02d} {hour:02d}:00",
+        "hora_server_scraping": hora_server,
+        "data": [
+            {
+                "NOMBRE_REGION": "Biobío",
+                "NOMBRE_COMUNA": comuna,
+                "NOMBRE_EMPRESA": "CGE",
+                "CLIENTES_AFECTADOS": clientes,
+                "FECHA_INT_STR": "25/10/2023",
+                "ACTUALIZADO_HACE": "0 Dias 1 Horas 0 Minutos",
+            }
+            for comuna, clientes in cortes
+        ],
+    }
+
+
+def test_snapshots_consecutivos_forman_un_evento():
+    """✅ Pico, primer/último snapshot y clientes-hora por escalones"""
+    c = EventConsolidator(max_gap=timedelta(hours=6))
+    t0 = datetime(2023, 10, 25, 6)
+
+    assert c.add_snapshot([_record(t0, "CONCEPCION", 100), _record(t0, "LOTA", 5)]) == []
+    assert c.add_snapshot([_record(t0 + timedelta(hours=6), "CONCEPCION", 300)]) == []
+    # LOTA lleva 12h sin aparecer: se cierra
+    cerrados = c.add_snapshot([_record(t0 + timedelta(hours=12), "CONCEPCION", 200)])
+    assert [e["comuna"] for e in cerrados] == ["LOTA"]
+    assert cerrados[0]["n_snapshots"] == 1
+    assert cerrados[0]["duracion_min"] == 30
+
+    (evento,) = c.flush()
+    assert evento["n_snapshots"] == 3
+    assert (evento["clientes_inicial"], evento["clientes_max"]) == (100, 300)
+    assert evento["clientes_final"] == 200
+    assert evento["clientes_hora"] == 100 * 6 + 300 * 6
+    assert evento["duracion_min"] == 12 * 60 + 30
+    assert len(c) == 0
+
+
+def test_consolidate_incremental_igual_a_una_corrida_completa(tmp_path):
+    """✅ Dos corridas incrementales dan los mismos eventos que una sola"""
+    batches = [
+        _batch(25, 6, [("Concepción", 100), ("Lota", 5)]),
+        _batch(25, 12, [("Concepción", 300)]),
+        _batch(26, 0, [("Concepción", 50)]),
+        _batch(27, 6, [("Tomé", 10)]),
+        _batch(28, 12, [("Tomé", 20)]),
+    ]
+    gap = timedelta(hours=12)
+
+    completo = EventStore(tmp_path / "completo")
+    consolidate(batches, completo, max_gap=gap, finalize=True)
+
+    incremental = EventStore(tmp_path / "incremental")
+    primera = consolidate(batches[:3], incremental, max_gap=gap)
+    assert primera["open"] > 0
+    segunda = consolidate(batches, incremental, max_gap=gap, finalize=True)
+    assert segunda["skipped"] == 3
+    assert segunda["snapshots"] == 2
+
+    def eventos(store):
+        return store.scan().collect().drop("abierto").sort("id_evento")
+
+    assert eventos(incremental).equals(eventos(completo))
+    por_comuna = {e["comuna"]: e for e in eventos(completo).to_dicts()}
+    assert por_comuna["CONCEPCION"]["n_snapshots"] == 3
+    assert por_comuna["CONCEPCION"]["clientes_max"] == 300
+    # Tomé reaparece 30h después (> max_gap): dos eventos con ids distintos
+    tome = eventos(completo).filter(pl.col("comuna") == "TOME")
+    assert tome.height == 2
+    assert tome["id_evento"].n_unique() == 2
+
+
+def test_tiempo_de_snapshot_es_fecha_consultada_no_hora_del_servidor(tmp_path):
+    """✅ Snapshots, duración y watermark usan el punto consultado"""
+    store = EventStore(tmp_path / "ev")
+    # El servidor va al revés que los puntos: un backfill que baja la historia
+    batches = [
+        _batch(25, 6, [("Lota", 10)], hora_server="17/10/2026 05:00"),
+        _batch(25, 12, [("Lota", 30)], hora_server="17/10/2026 04:00"),
+    ]
+    consolidate(batches, store)
+
+    (evento,) = store.scan().collect().to_dicts()
+    assert evento["primer_snapshot"] == datetime(2023, 10, 25, 6)
+    assert evento["ultimo_snapshot"] == datetime(2023, 10, 25, 12)
+    assert evento["n_snapshots"] == 2
+    assert evento["clientes_hora"] == 10 * 6
+    assert store.watermark() == datetime(2023, 10, 25, 12)
+
+    # Un punto posterior scrapeado antes en el servidor no se omite
+    siguiente = _batch(25, 18, [("Lota", 5)], hora_server="16/10/2026 00:00")
+    stats = consolidate(batches + [siguiente], store)
+    assert (stats["skipped"], stats["snapshots"]) == (2, 1)
+
+
+def test_store_con_tiempo_de_servidor_pide_reconstruir(tmp_path):
+    """✅ Un store antiguo (watermark en TIMESTAMP_SERVER) no se reanuda"""
+    store = EventStore(tmp_path / "ev")
+    store.root.mkdir()
+    (store.root / "_state.json").write_text('{"watermark": "2026-10-17T03:00:00"}')
+
+    with pytest.raises(ValueError):
+        store.load_consolidator()
+
+
+def test_parte_huerfana_se_descarta_al_reanudar(tmp_path):
+    """✅ Una parte escrita sin guardar el estado no duplica eventos"""
+    store = EventStore(tmp_path / "ev")
+    consolidate([_batch(25, 6, [("Lota", 5)])], store, finalize=True)
+    assert store.part_count() == 1
+
+    # Corrida que murió entre escribir la parte y guardar el estado
+    store.append(store.scan().collect().drop("abierto").to_dicts())
+    assert store.part_count() == 2
+
+    store.load_consolidator()
+    assert store.part_count() == 1
@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import polars as pl
+
+from core.golden_record import GoldenRecordStore
+from core.hash_key import content_hash, content_key_expr
+
+
+def _facts(ids, clientes):
+    """Filas de fact_interrupciones ya unidas a sus dimensiones."""
+    return pl.DataFrame(
+        {
+            "id_interrupcion": ids,
+            "nombre_comuna": ["LOTA"] * len(ids),
+            "clientes_afectados": clientes,
+        }
+    ).with_columns(
+        golden_key=content_key_expr(
+            pl.concat_str(
+                [pl.col("nombre_comuna"), pl.col("clientes_afectados").cast(pl.Utf8)],
+                separator="_",
+            )
+        )
+    )
+
+
+def test_content_key_expr_igual_a_content_hash():
+    """✅ La clave de contenido en Polars coincide con content_hash"""
+    s = pl.Series(["LOTA_CGE_20231025_0530_100", None])
+    keys = pl.select(content_key_expr(pl.lit(s))).to_series().to_list()
+    assert keys == [content_hash("LOTA_CGE_20231025_0530_100")[1], None]
+
+
+def test_append_incremental_deduplica_contra_lo_persistido(tmp_path):
+    """✅ Solo se agregan claves nuevas y la marca de agua persiste"""
+    store = GoldenRecordStore(tmp_path / "golden")
+    assert store.high_water() is None
+
+    assert store.append(_facts([1, 2, 3], [10, 20, 10]), high_water=3) == 2
+    assert store.append(_facts([4, 5], [20, 30]), high_water=5) == 1
+    vacio = _facts([], []).cast({"id_interrupcion": pl.Int64})
+    assert store.append(vacio, high_water=None) == 0
+
+    reabierto = GoldenRecordStore(tmp_path / "golden")
+    assert reabierto.high_water() == 5
+    assert len(reabierto) == 3
+    golden = reabierto.scan().collect()
+    assert golden["id_interrupcion"].to_list() == [1, 2, 5]
+    assert reabierto.append(_facts([6], [30]), high_water=6) == 0
+
+
+def test_compactacion_y_partes_huerfanas(tmp_path):
+    """✅ La compactación une las partes y descarta archivos fuera del estado"""
+    store = GoldenRecordStore(tmp_path / "golden", max_parts=2)
+    for k in range(3):
+        store.append(_facts([k], [k]), high_water=k)
+    # Parte escrita por una corrida que murió antes de guardar el estado
+    _facts([99], [99]).write_parquet(tmp_path / "golden" / "part-09999.parquet")
+
+    assert store.compact_if_needed()
+    assert len(store.parts) == 1
+    assert sorted(p.name for p in (tmp_path / "golden").glob("part-*")) == [
+        store.parts[0].name
+    ]
+
+    out = store.export(tmp_path / "golden_interrupciones.parquet")
+    golden = pl.read_parquet(out)
+    assert "golden_key" not in golden.columns
+    assert golden["id_interrupcion"].to_list() == [0, 1, 2]
+
+
+def test_reset_deja_el_store_listo_para_reconstruir(tmp_path):
+    """✅ Tras reset, la reconstrucción completa es lo que exporta el store"""
+    store = GoldenRecordStore(tmp_path / "golden")
+    store.append(_facts([1, 2], [10, 20]), high_water=2)
+
+    store.reset()
+    assert store.high_water() is None and len(store) == 0
+    assert list((tmp_path / "golden").glob("part-*")) == []
+
+    store.append(_facts([1, 2, 3], [10, 10, 30]), high_water=3)
+    reabierto = GoldenRecordStore(tmp_path / "golden")
+    assert reabierto.high_water() == 3
+    out = reabierto.export(tmp_path / "golden_interrupciones.parquet")
+    assert pl.read_parquet(out)["id_interrupcion"].to_list() == [1, 3]
@@ -0,0 +1,81 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import hashlib
+
+import polars as pl
+
+from core.hash_key import (
+    content_hash,
+    hash_key,
+    hash_key_expr,
+    hash_key_sql,
+    record_hash_key,
+)
+from core.tranformer import SecDataTransformer
+
+
+def test_hash_key_es_prefijo_de_64_bits_del_md5():
+    """✅ hash_key = primeros 8 bytes del MD5, con signo (como el cast de Postgres)"""
+    hash_id, key = content_hash("SANTIAGO_ENEL_20231025_1430_500")
+
+    assert hash_id == hashlib.md5(b"SANTIAGO_ENEL_20231025_1430_500").hexdigest()
+    assert key == hash_key(hash_id)
+    assert -(2**63) <= key < 2**63
+    # ('x' || 'ffffffffffffffff')::bit(64)::bigint = -1
+    assert hash_key("f" * 32) == -1
+    assert hash_key("7fffffffffffffff" + "0" * 16) == 2**63 - 1
+
+
+def test_hash_key_expr_reproduce_python():
+    """✅ La expresión Polars da la misma clave que Python para cualquier digest"""
+    digests = [hashlib.md5(str(i).encode()).hexdigest() for i in range(500)]
+    digests += ["0" * 32, "f" * 32, "8" + "0" * 31]
+
+    df = pl.DataFrame({"hash_id": digests}).with_columns(
+        hash_key_expr(pl.col("hash_id")).alias("hash_key")
+    )
+
+    assert df["hash_key"].dtype == pl.Int64
+    assert df["hash_key"].to_list() == [hash_key(d) for d in digests]
+
+
+def test_transformer_y_record_hash_key():
+    """✅ El transformer emite HASH_KEY coherente con ID_UNICO"""
+    raw = [
+        {
+            "NOMBRE_REGION": "Metropolitana",
+            "NOMBRE_COMUNA": "Santiago",
+            "NOMBRE_EMPRESA": "Enel",
+            "CLIENTES_AFECTADOS": 500,
+            "FECHA_INT_STR": "25/10/2023 14:30",
+            "ACTUALIZADO_HACE": "1 Horas",
+        }
+    ]
+    record = SecDataTransformer().transform(raw, "25/10/2023 15:00")[0]
+
+    assert record["HASH_KEY"] == hash_key(record["ID_UNICO"])
+    assert record_hash_key(record) == record["HASH_KEY"]
+    assert record_hash_key({"ID_UNICO": record["ID_UNICO"]}) == record["HASH_KEY"]
+    # IDs que no son MD5 hex se hashean primero
+    assert record_hash_key({"ID_UNICO": "test_hash_1"}) == content_hash("test_hash_1")[1]
+
+
+def test_ids_que_no_son_md5_se_hashean_igual_en_python_polars_y_sql():
+    """✅ Una sola regla: MD5 hex en minúscula tal cual, lo demás pasa por md5()"""
+    md5 = content_hash("SANTIAGO_ENEL_20231025_1430_500")[0]
+    ids = ["test_hash_1", "abcd", md5.upper(), md5 + "0", md5, None]
+
+    esperado = [content_hash(i)[1] for i in ids[:4]] + [hash_key(md5), None]
+    assert [hash_key(i) for i in ids[:5]] == esperado[:5]
+
+    df = pl.DataFrame({"hash_id": ids}).with_columns(
+        hash_key_expr(pl.col("hash_id")).alias("hash_key")
+    )
+    assert df["hash_key"].to_list() == esperado
+
+    sql = hash_key_sql("f.hash_id")
+    assert "f.hash_id ~ '^[0-9a-f]{32}$'" in sql
+    assert "md5(f.hash_id)" in sql
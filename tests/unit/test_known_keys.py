@@ -0,0 +1,162 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import threading
+
+import numpy as np
+import polars as pl
+
+from core.async_postgres_repository import AsyncPostgreSQLRepository
+from core.hash_key import record_hash_key
+from core.known_keys import KnownKeys
+from core.postgres_repository import PostgreSQLRepository
+from core.tranformer import SecDataTransformer
+
+
+def _records(n, offset=0):
+    raw = [
+        {
+            "NOMBRE_REGION": "Biobío",
+            "NOMBRE_COMUNA": f"Comuna {offset + i}",
+            "NOMBRE_EMPRESA": "CGE",
+            "CLIENTES_AFECTADOS": offset + i,
+            "FECHA_INT_STR": "25/10/2023",
+            "ACTUALIZADO_HACE": "0 Dias 1 Horas 0 Minutos",
+        }
+        for i in range(n)
+    ]
+    return SecDataTransformer().transform(raw, "25/10/2023 15:00")
+
+
+def _repo(seed_keys):
+    """Repositorio sin conexión: la tabla son las claves sembradas."""
+    repo = PostgreSQLRepository.__new__(PostgreSQLRepository)
+    repo.compact_keys = True
+    repo.use_known_keys = True
+    repo.known_keys = None
+    repo._known_lock = threading.Lock()
+    repo.load_known_keys = lambda: KnownKeys(seed_keys)
+    repo.get_or_create_geografia = lambda r, c: 1
+    repo.get_or_create_empresa = lambda e: 1
+    repo.get_id_tiempo = lambda f: 1
+    repo.enviados = []
+
+    def insert_rows(rows, keys, omitidos=0):
+        repo.enviados.extend(rows)
+        repo.known_keys.add(keys)
+        return {"insertados": len(rows), "duplicados": omitidos}
+
+    repo._insert_rows = insert_rows
+    return repo
+
+
+def test_known_keys_mascara_y_merge():
+    """✅ Marca nuevas solo las claves desconocidas y primeras del lote"""
+    known = KnownKeys([5, -3, 5], merge_every=2)
+    assert len(known) == 2 and 5 in known and 7 not in known
+
+    mask = known.new_mask([7, 5, 7, -9, -3])
+    assert mask.tolist() == [True, False, False, True, False]
+
+    known.add([7, -9, 100])  # supera merge_every: pasa al arreglo principal
+    assert len(known) == 5
+    assert known.new_mask([7, -9, 100, 101]).tolist() == [False, False, False, True]
+    assert KnownKeys.from_chunks([]).new_mask(np.array([1])).tolist() == [True]
+
+
+def test_save_records_omite_claves_conocidas():
+    """✅ Las filas ya cargadas no viajan a la base y cuentan como duplicados"""
+    viejos = _records(10)
+    repo = _repo([record_hash_key(r) for r in viejos[:6]])
+
+    nuevos = _records(4, offset=100)
+    result = repo.save_records(viejos + nuevos)
+    assert result == {"insertados": 8, "duplicados": 6}
+    assert len(repo.enviados) == 8
+
+    # Segunda corrida idéntica: nada sale hacia Postgres
+    assert repo.save_records(viejos + nuevos) == {"insertados": 0, "duplicados": 14}
+    assert len(repo.enviados) == 8
+
+
+def test_save_frame_omite_claves_conocidas():
+    """✅ save_frame aplica el mismo filtro sobre la columna HASH_KEY"""
+    records = _records(10)
+    repo = _repo([record_hash_key(r) for r in records[:3]])
+    frame = pl.DataFrame(records)
+
+    assert repo.save_frame(frame) == {"insertados": 7, "duplicados": 3}
+    assert sorted(row[-1] for row in repo.enviados) == sorted(
+        record_hash_key(r) for r in records[3:]
+    )
+
+
+def test_repositorio_async_omite_claves_conocidas():
+    """✅ El repositorio async descarta claves conocidas y cuenta los conflictos"""
+    records = _records(6)
+    repo = AsyncPostgreSQLRepository.__new__(AsyncPostgreSQLRepository)
+    repo.compact_keys = True
+    repo.use_known_keys = True
+    repo.known_keys = None
+
+    async def load_known_keys():
+        return KnownKeys([record_hash_key(records[0])])
+
+    async def dim(*args):
+        return 1
+
+    enviados = []
+    # Otra carga concurrente ya insertó records[1]: KnownKeys no lo sabe
+    tabla = {record_hash_key(records[1])}
+
+    class Conn:
+        def transaction(self):
+            return Ctx(None)
+
+        async def execute(self, query):
+            self.stage = []
+
+        async def copy_records_to_table(self, table, records, columns):
+            assert columns[-1] == "hash_key"
+            self.stage.extend(records)
+            enviados.extend(records)
+
+        async def fetch(self, query):
+            assert "ON CONFLICT (hash_key) DO NOTHING RETURNING" in query
+            nuevas = [row for row in self.stage if row[-1] not in tabla]
+            tabla.update(row[-1] for row in nuevas)
+            return [(1,)] * len(nuevas)
+
+    class Ctx:
+        def __init__(self, value):
+            self.value = value
+
+        async def __aenter__(self):
+            return self.value
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class Pool:
+        def acquire(self):
+            return Ctx(Conn())
+
+    repo.load_known_keys = load_known_keys
+    repo.get_or_create_geografia = repo.get_or_create_empresa = dim
+    repo.get_id_tiempo = dim
+    repo.pool = Pool()
+
+    async def run():
+        repo._known_lock = asyncio.Lock()
+        primera = await repo.save_records(records)
+        segunda = await repo.save_records(records)
+        return primera, segunda
+
+    primera, segunda = asyncio.run(run())
+    # records[1] viaja, pero ON CONFLICT lo descarta: cuenta como duplicado
+    assert primera == {"insertados": 4, "duplicados": 2}
+    assert segunda == {"insertados": 0, "duplicados": 6}
+    assert len(enviados) == 5
@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from unittest.mock import MagicMock, patch
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from config import URL_SEC_APP, URL_SEC_HOME
+from core.browser_pool import BrowserPool
+from core.lean_navigation import has_valid_session, should_block, warm_page
+
+SESSION = [{"name": "ASP.NET_SessionId", "domain": "apps.sec.cl", "expires": -1}]
+
+
+class FakeContext:
+    """Contexto falso que guarda las cookies agregadas."""
+
+    def __init__(self):
+        self._cookies = []
+        self.page = MagicMock()
+        self.route = MagicMock()
+        self.close = MagicMock()
+
+    def new_page(self):
+        return self.page
+
+    def add_cookies(self, cookies):
+        self._cookies.extend(cookies)
+
+    def cookies(self):
+        return list(self._cookies)
+
+
+def test_bloquea_recursos_pesados_y_analitica():
+    """✅ Imágenes, fuentes, CSS y analítica se bloquean; XHR y scripts no"""
+    assert should_block("image", "https://www.sec.cl/logo.png")
+    assert should_block("stylesheet", "https://www.sec.cl/site.css")
+    assert should_block("script", "https://www.googletagmanager.com/gtm.js")
+    assert not should_block("xhr", "https://apps.sec.cl/INTONLINEv1/GetPorFecha")
+    assert not should_block("script", "https://apps.sec.cl/INTONLINEv1/app.js")
+
+
+def test_sesion_valida_solo_con_cookie_sec_vigente():
+    """✅ Solo cookies sec.cl no expiradas cuentan como sesión"""
+    assert has_valid_session(SESSION)
+    assert not has_valid_session([{"domain": "sec.cl", "expires": 100}], now=200)
+    assert not has_valid_session([{"domain": "google.com", "expires": -1}])
+
+
+def test_warm_page_cae_a_sonda_dom_sin_hora_server():
+    """✅ Si GetHoraServer no llega, se usa la sonda DOM en vez de dormir"""
+    page = MagicMock()
+    page.expect_response.return_value.__exit__.side_effect = PlaywrightTimeoutError(
+        "timeout"
+    )
+
+    assert warm_page(page, skip_home=True) is False
+    page.goto.assert_called_once()
+    page.wait_for_load_state.assert_called_once()
+
+
+def test_pool_reutiliza_sesion_y_salta_home():
+    """✅ Un contexto nuevo hereda la sesión viva y va directo a la app"""
+    contexts = []
+
+    def new_context(**kwargs):
+        ctx = FakeContext()
+        ctx.user_agent = kwargs["user_agent"]
+        contexts.append(ctx)
+        return ctx
+
+    with patch("core.browser_pool.sync_playwright") as mock_sp:
+        browser = mock_sp.return_value.start.return_value.chromium.launch.return_value
+        browser.new_context.side_effect = new_context
+        pool = BrowserPool(size=2)
+
+        first = pool.acquire()
+        first.context.add_cookies(SESSION)
+        second = pool.acquire()
+
+    first_urls = [c.args[0] for c in contexts[0].page.goto.call_args_list]
+    second_urls = [c.args[0] for c in contexts[1].page.goto.call_args_list]
+    assert first_urls == [URL_SEC_HOME, URL_SEC_APP]
+    assert second_urls == [URL_SEC_APP]
+    assert second.user_agent == first.user_agent
+    contexts[1].route.assert_called_once()
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+
+from unittest.mock import MagicMock
+
+from core.normalization import NormalizationCache, normalize_text
+from core.postgres_repository import PostgreSQLRepository
+from core.tranformer import SecDataTransformer
+
+
+def test_intern_normaliza_y_asigna_codigos_estables():
+    """✅ Variantes del mismo nombre comparten texto normalizado y código"""
+    cache = NormalizationCache()
+
+    nombre, code = cache.intern("Ñuñoa ")
+    assert nombre == "NUNOA" == normalize_text("Ñuñoa ")
+    assert cache.code("nuñoa") == code
+    assert cache.code("NUNOA") == code
+    assert cache.value(code) == "NUNOA"
+
+    otro = cache.code("Biobío")
+    assert otro != code
+    assert cache.encode(["Biobío", "Ñuñoa", "BIOBIO"]) == [otro, code, otro]
+    assert cache.decode([code, otro]) == ["NUNOA", "BIOBIO"]
+    assert len(cache) == 2
+
+
+def test_intern_concurrente_no_duplica_codigos():
+    """✅ Varios hilos internando los mismos nombres obtienen un único código"""
+    cache = NormalizationCache()
+    nombres = [f"Comuna {i % 50}" for i in range(2000)]
+    resultados = []
+
+    def worker():
+        resultados.append(cache.encode(nombres))
+
+    hilos = [threading.Thread(target=worker) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(cache) == 50
+    assert all(r == resultados[0] for r in resultados)
+
+
+def test_transformer_usa_cache_compartida():
+    """✅ El transformer normaliza igual que antes (acentos, mayúsculas, espacios)"""
+    transformer = SecDataTransformer()
+    assert transformer._normalize_values(["Región del Biobío ", "los ríos", 13]) == [
+        "REGION DEL BIOBIO",
+        "LOS RIOS",
+        "13",
+    ]
+
+
+def test_repositorio_guarda_nombres_tal_cual():
+    """✅ El repositorio no renombra dimensiones: normalizar es del transformer"""
+    repo = PostgreSQLRepository.__new__(PostgreSQLRepository)
+    repo._geo_cache, repo._emp_cache = {}, {}
+    repo.conn = MagicMock()
+    cur = repo.conn.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (7,)
+
+    assert repo.get_or_create_geografia("Biobío", "Ñuñoa") == 7
+    assert repo.get_or_create_empresa("Enel Distribución") == 7
+
+    params = [c.args[1] for c in cur.execute.call_args_list]
+    assert params == [("Biobío", "Ñuñoa"), ("Enel Distribución",)]
+    # Solo la variante exacta pega en caché
+    assert repo.get_or_create_geografia("Biobío", "Ñuñoa") == 7
+    assert cur.execute.call_count == 2
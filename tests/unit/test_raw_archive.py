@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.raw_archive import RawArchive
+from core.scrape_journal import ScrapeJournal
+
+DATA = [{"REGION": "Biobío", "CLIENTES_AFECTADOS": 12}]
+
+
+def test_respuestas_identicas_comparten_blob(tmp_path):
+    """✅ Dos horas con la misma respuesta se guardan en un solo blob"""
+    with RawArchive(tmp_path / "bronze", compression="gzip") as archive:
+        h1 = archive.put("2017-01-01 00:00", DATA, {"success": True})
+        h2 = archive.put("2017-01-01 06:00", list(DATA), {"success": True})
+        h3 = archive.put("2017-01-01 12:00", [], {"success": True})
+
+        stats = archive.stats()
+
+    assert h1 == h2 != h3
+    assert stats["responses"] == 3
+    assert stats["blobs"] == 2
+    assert len(list((tmp_path / "bronze" / "blobs").rglob("*.json.gz"))) == 2
+
+
+def test_get_reconstruye_resultado(tmp_path):
+    """✅ get devuelve los metadatos del punto junto al cuerpo crudo"""
+    with RawArchive(tmp_path, compression="gzip") as archive:
+        archive.put(
+            "2017-01-01 00:00",
+            DATA,
+            {"success": True, "hora_server_scraping": "01/01/2017 00:05", "data": []},
+        )
+
+        result = archive.get("2017-01-01 00:00")
+
+        assert result["data"] == DATA
+        assert result["hora_server_scraping"] == "01/01/2017 00:05"
+        assert archive.get("2017-01-01 06:00") is None
+
+
+def test_iter_results_filtra_por_anio_en_orden(tmp_path):
+    """✅ iter_results recorre el archivo cronológicamente y filtra años"""
+    with RawArchive(tmp_path, compression="gzip") as archive:
+        archive.put("2018-03-01 00:00", DATA)
+        archive.put("2017-05-01 00:00", DATA)
+        archive.put("2019-01-01 00:00", DATA)
+
+        fechas = [r["fecha_consultada"] for r in archive.iter_results(2017, 2018)]
+
+    assert fechas == ["2017-05-01 00:00", "2018-03-01 00:00"]
+
+
+def test_journal_con_archivo_restaura_desde_bronze(tmp_path):
+    """✅ El journal guarda el payload en el archivo y lo recupera"""
+    archive = RawArchive(tmp_path / "bronze", compression="gzip")
+    with ScrapeJournal(tmp_path / "journal.sqlite", archive=archive) as journal:
+        journal.record((2017, 1, 1, 0), {"success": True, "data": DATA})
+        journal.record((2017, 1, 1, 6), {"success": True, "data": DATA})
+
+        restored = journal.load_many([(2017, 1, 1, 0), (2017, 1, 1, 6)])
+
+    assert restored[(2017, 1, 1, 6)]["data"] == DATA
+    assert archive.stats()["blobs"] == 1
+    assert not list((tmp_path / "raw").glob("*.jsonl"))
+    archive.close()
@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import json
+from datetime import date
+
+import httpx
+
+from core.reference_data import (
+    FALLBACK_CLIENTES_K,
+    ClientesRegionalStore,
+    fetch_clientes_regionales,
+)
+
+
+def _mock_client():
+    def handler(request):
+        region = json.loads(request.content)["region"]
+        if "Maule" in region:
+            return httpx.Response(500)
+        return httpx.Response(200, json=[{"CLIENTES": "1000", "REGION_ID": 13}])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_fetch_consulta_todas_las_regiones_con_un_cliente():
+    """✅ Las regiones se consultan con un solo cliente y los errores se aíslan"""
+
+    async def run():
+        async with _mock_client() as client:
+            return await fetch_clientes_regionales(
+                ["Region del Biobio", "Region del Maule"], client=client
+            )
+
+    ok, error = asyncio.run(run())
+
+    assert ok == {
+        "region": "Region del Biobio",
+        "clientes": "1000",
+        "region_id": 13,
+        "success": True,
+    }
+    assert error["success"] is False
+
+
+def test_store_guarda_serie_fechada_y_ttl(tmp_path):
+    """✅ Cada refresco agrega un snapshot fechado y el TTL se respeta"""
+    store = ClientesRegionalStore(tmp_path / "clientes.parquet", ttl_days=30)
+    assert store.is_stale()
+
+    result = {"region": "Region del Biobio", "region_id": 8, "success": True}
+    store.append([{**result, "clientes": "700000"}], fecha=date(2026, 1, 1))
+    store.append([{**result, "clientes": "710000"}], fecha=date(2026, 3, 1))
+
+    assert store.history().height == 2
+    assert not store.is_stale(today=date(2026, 3, 15))
+    assert store.is_stale(today=date(2026, 4, 1))
+
+
+def test_lookup_usa_ultimo_valor_y_respaldo(tmp_path):
+    """✅ El lookup toma el último snapshot y completa con el respaldo"""
+    store = ClientesRegionalStore(tmp_path / "clientes.parquet")
+    result = {"region": "Region del Biobio", "region_id": 8, "success": True}
+    store.append([{**result, "clientes": "700000"}], fecha=date(2026, 1, 1))
+    store.append([{**result, "clientes": "710000"}], fecha=date(2026, 3, 1))
+
+    lookup = store.lookup()
+    clientes_k = dict(zip(lookup["nombre_region"], lookup["clientes_reg_k"]))
+
+    assert lookup.height == len(FALLBACK_CLIENTES_K)
+    assert clientes_k["BIOBIO"] == 710
+    assert clientes_k["METROPOLITANA"] == FALLBACK_CLIENTES_K["METROPOLITANA"]
+    as_of = store.lookup(as_of=date(2026, 2, 1))
+    assert as_of.filter(as_of["nombre_region"] == "BIOBIO")["clientes"][0] == 700000
@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.scrape_journal import ScrapeJournal
+from core.scrape_sinks import YearCheckpointSink
+
+
+def _result(point, success=True):
+    year, month, day, hour = point
+    result = {
+        "success": success,
+        "fecha_consultada": f"{year}-{month:02d}-{day:02d} {hour:02d}:00",
+        "data": [{"CLIENTES_AFECTADOS": day}] if success else [],
+    }
+    if not success:
+        result["error"] = "HTTP 500"
+    return result
+
+
+class CountingEngine:
+    """Motor falso que cuenta los puntos pedidos."""
+
+    num_pages = 1
+
+    def __init__(self, fail=()):
+        self.fetched = []
+        self.fail = set(fail)
+
+    async def scrape_batch(self, points):
+        self.fetched.extend(points)
+        return [_result(p, success=p not in self.fail) for p in points]
+
+    async def close(self):
+        pass
+
+
+def test_registra_y_recupera_payload(tmp_path):
+    """✅ Un punto exitoso queda completado y su payload se puede releer"""
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        journal.record((2017, 1, 2, 6), _result((2017, 1, 2, 6)))
+
+        assert journal.is_done((2017, 1, 2, 6))
+        assert journal.load((2017, 1, 2, 6))["data"] == [{"CLIENTES_AFECTADOS": 2}]
+        assert journal.pending([(2017, 1, 2, 6), (2017, 1, 3, 6)]) == [(2017, 1, 3, 6)]
+
+
+def test_punto_fallido_queda_pendiente(tmp_path):
+    """✅ Los puntos fallidos se registran pero se reintentan"""
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        journal.record((2017, 1, 1, 0), _result((2017, 1, 1, 0), success=False))
+
+        assert not journal.is_done((2017, 1, 1, 0))
+        assert journal.summary() == {"failed": 1}
+
+
+def test_reanuda_sin_repetir_puntos(tmp_path):
+    """✅ Tras una caída, solo se piden los puntos que faltan"""
+    points = [(2017, 1, d, 0) for d in range(1, 11)]
+
+    def scraper(engine):
+        return AsyncHistoricalScraper(
+            start_year=2017,
+            end_year=2017,
+            max_concurrent=2,
+            hours=[0],
+            output_dir=str(tmp_path),
+            engine=engine,
+            batch_size=2,
+        )
+
+    first = CountingEngine(fail={(2017, 1, 5, 0)})
+    sink = YearCheckpointSink(tmp_path, {2017: len(points)})
+    asyncio.run(scraper(first).scrape_points(points, sink))
+    assert len(first.fetched) == 10
+
+    second = CountingEngine()
+    sink = YearCheckpointSink(tmp_path, {2017: len(points)})
+    asyncio.run(scraper(second).scrape_points(points, sink))
+
+    assert second.fetched == [(2017, 1, 5, 0)]
+    year_data = sink.year_data(2017)
+    assert year_data["metadata"]["successful"] == 10
+    fechas = [r["fecha_consultada"] for r in year_data["data"]]
+    assert fechas == sorted(fechas)
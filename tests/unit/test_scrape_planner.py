@@ -0,0 +1,149 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from datetime import date, datetime
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.scrape_journal import ScrapeJournal
+from core.scrape_planner import ScrapePlanner, expand_points
+
+
+class RecordingEngine:
+    """Motor falso que registra los puntos pedidos."""
+
+    num_pages = 1
+
+    def __init__(self):
+        self.fetched = []
+
+    async def scrape_batch(self, points):
+        self.fetched.extend(points)
+        return [{"success": True, "data": []} for _ in points]
+
+    async def close(self):
+        pass
+
+
+def test_expande_rango_inclusivo():
+    """✅ El rango incluye ambos extremos y respeta las horas"""
+    points = expand_points(date(2020, 2, 28), date(2020, 3, 1), [12, 0])
+
+    assert points[0] == (2020, 2, 28, 0)
+    assert points[-1] == (2020, 3, 1, 12)
+    assert len(points) == 6  # 2020 es bisiesto
+
+
+def test_plan_descarta_todas_las_fuentes(tmp_path):
+    """✅ Journal, snapshots y días con hechos cuentan como cubiertos"""
+    journal = ScrapeJournal(tmp_path / "journal.sqlite")
+    journal.record((2017, 1, 1, 0), {"success": True, "data": []})
+
+    planner = ScrapePlanner(journal=journal, fact_days=True)
+    planner.add_snapshots([datetime(2017, 1, 1, 12)])
+    planner.add_covered_days([date(2017, 1, 2)])
+
+    missing = planner.plan(expand_points(date(2017, 1, 1), date(2017, 1, 3), [0, 12]))
+
+    assert missing == [(2017, 1, 3, 0), (2017, 1, 3, 12)]
+    assert planner.last_plan == {
+        "requested": 6,
+        "missing": 2,
+        "journal": 1,
+        "snapshots": 1,
+        "fact_interrupciones": 2,
+    }
+    journal.close()
+
+
+def test_dias_con_hechos_no_cubren_sin_opt_in():
+    """✅ Por defecto un día con hechos no se da por scrapeado"""
+    planner = ScrapePlanner()
+    # Un corte iniciado el 1/1 visto al consultar el 2/1 no cubre el 1/1
+    planner.add_covered_days([date(2017, 1, 1)])
+    planner.add_snapshots([datetime(2017, 1, 2, 0)])
+
+    missing = planner.plan(expand_points(date(2017, 1, 1), date(2017, 1, 2), [0]))
+
+    assert missing == [(2017, 1, 1, 0)]
+    assert planner.last_plan.get("fact_interrupciones", 0) == 0
+
+
+def test_scrape_all_solo_pide_faltantes(tmp_path):
+    """✅ Con planner, scrape_all solo scrapea los huecos"""
+    planner = ScrapePlanner(fact_days=True)
+    year = expand_points(date(2017, 1, 1), date(2017, 12, 31), [0])
+    all_days = {date(y, m, d) for y, m, d, _ in year}
+    planner.add_covered_days(all_days - {date(2017, 6, 15)})
+    engine = RecordingEngine()
+    scraper = AsyncHistoricalScraper(
+        start_year=2017,
+        end_year=2017,
+        hours=[0, 12],
+        output_dir=str(tmp_path),
+        engine=engine,
+        planner=planner,
+        dataset_name="gaps.json",
+    )
+
+    result = asyncio.run(scraper.scrape_all())
+
+    assert sorted(engine.fetched) == [(2017, 6, 15, 0), (2017, 6, 15, 12)]
+    assert result["metadata"]["total_points"] == 2
+
+
+class FlakyEngine(RecordingEngine):
+    """Motor falso que falla ciertos puntos la primera vez que se piden."""
+
+    def __init__(self, failing):
+        super().__init__()
+        self.failing = set(failing)
+
+    async def scrape_batch(self, points):
+        self.fetched.extend(points)
+        results = []
+        for point in points:
+            if point in self.failing:
+                self.failing.discard(point)
+                results.append({"success": False, "error": "timeout", "data": None})
+            else:
+                results.append({"success": True, "data": [{"P": list(point)}]})
+        return results
+
+
+def test_relleno_de_huecos_conserva_lo_ya_escrito(tmp_path):
+    """✅ Una pasada con planner no borra los puntos que ya estaban en disco"""
+    from core.scrape_sinks import iter_dataset
+
+    journal = ScrapeJournal(tmp_path / "journal.sqlite")
+    hueco = (2017, 1, 5, 0)
+
+    def scraper(engine, planner=None):
+        return AsyncHistoricalScraper(
+            start_year=2017,
+            end_year=2017,
+            hours=[0],
+            output_dir=str(tmp_path),
+            engine=engine,
+            journal=journal,
+            planner=planner,
+            dataset_name="completo.json",
+        )
+
+    primera = scraper(FlakyEngine([hueco]))
+    asyncio.run(primera.scrape_all())
+    assert len([r for r in iter_dataset(primera.dataset_dir) if r["success"]]) == 364
+
+    engine = FlakyEngine([])
+    segunda = scraper(engine, planner=ScrapePlanner(journal=journal))
+    result = asyncio.run(segunda.scrape_all())
+
+    assert engine.fetched == [hueco]
+    results = list(iter_dataset(segunda.dataset_dir))
+    assert len(results) == 365 and all(r["success"] for r in results)
+    enero = [r for r in results if r["data"][0]["P"][1] == 1]
+    assert len(enero) == 31
+    assert result["years"]["2017"]["total_points"] == 365
+    journal.close()
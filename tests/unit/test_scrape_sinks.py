@@ -0,0 +1,77 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from unittest.mock import MagicMock
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.historical_etl_orchestrator import HistoricalETLOrchestrator
+from core.scrape_sinks import PartitionedNDJSONSink, iter_dataset, iter_partition
+
+
+def _result(point):
+    year, month, day, hour = point
+    return {
+        "success": True,
+        "fecha_consultada": f"{year}-{month:02d}-{day:02d} {hour:02d}:00",
+        "hora_server_scraping": [{"FECHA": f"{day:02d}/{month:02d}/{year} 10:00"}],
+        "data": [{"NOMBRE_REGION": "Región del Maule", "CLIENTES_AFECTADOS": day}],
+    }
+
+
+class InstantEngine:
+    """Motor falso que responde al instante."""
+
+    num_pages = 1
+
+    async def scrape_batch(self, points):
+        return [_result(p) for p in points]
+
+    async def close(self):
+        pass
+
+
+def test_particiona_por_anio_y_mes(tmp_path):
+    """✅ Cada punto cae en su partición year=/month= y se puede releer"""
+    points = [(2017, 12, 31, 0), (2018, 1, 1, 0), (2018, 1, 2, 0)]
+    sink = PartitionedNDJSONSink(tmp_path / "ds", points, compression="gzip")
+
+    assert sink.add(points[0], _result(points[0]))["metadata"]["year"] == 2017
+    assert sink.add(points[1], _result(points[1])) is None
+    year_data = sink.add(points[2], _result(points[2]))
+    sink.close()
+
+    assert year_data["metadata"]["total_records"] == 2
+    partition = tmp_path / "ds" / "year=2018" / "month=01" / "part.ndjson.gz"
+    assert [r["fecha_consultada"] for r in iter_partition(partition)] == [
+        "2018-01-01 00:00",
+        "2018-01-02 00:00",
+    ]
+    assert len(list(iter_dataset(tmp_path / "ds", start_year=2018))) == 2
+
+
+def test_scrape_all_escribe_manifiesto_y_etl_lo_lee(tmp_path):
+    """✅ scrape_all deja particiones + manifiesto que el ETL consume en streaming"""
+    scraper = AsyncHistoricalScraper(
+        start_year=2017,
+        end_year=2017,
+        hours=[0],
+        output_dir=str(tmp_path),
+        engine=InstantEngine(),
+    )
+
+    result = asyncio.run(scraper.scrape_all())
+
+    assert not (tmp_path / "dataset_2017_2017.json").exists()
+    assert len(result["partitions"]) == 12
+    assert result["metadata"]["total_points"] == 365
+
+    orchestrator = HistoricalETLOrchestrator(
+        str(tmp_path / "dataset_2017_2017"), repository=MagicMock()
+    )
+    units = list(orchestrator._iter_work_units(None, None))
+    assert len(units) == 365
+    assert orchestrator._expected_units(None, None) == 365
+    assert units[0][1] == [{"FECHA": "01/01/2017 10:00"}]
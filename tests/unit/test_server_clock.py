@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import datetime, timedelta
+
+from core.sec_fetch import ServerClock
+
+
+def test_clock_sin_sincronizar_requiere_refresh():
+    """✅ Un reloj nuevo pide GetHoraServer y no inventa hora"""
+    clock = ServerClock()
+    assert clock.needs_refresh() is True
+    assert clock.hora_server() is None
+
+
+def test_clock_aplica_offset_local():
+    """✅ La hora derivada conserva el desfase respecto al servidor"""
+    clock = ServerClock()
+    server_dt = datetime.now() + timedelta(hours=3)
+    raw = [{"FECHA": server_dt.strftime("%d/%m/%Y %H:%M")}]
+
+    assert clock.update(raw) is True
+    assert clock.needs_refresh() is False
+
+    derived = datetime.strptime(clock.hora_server()[0]["FECHA"], "%d/%m/%Y %H:%M")
+    assert abs(derived - server_dt) < timedelta(minutes=2)
+
+
+def test_clock_refresca_por_intervalo():
+    """✅ Con intervalo 0 cada punto vuelve a sincronizar"""
+    clock = ServerClock(refresh_interval=0)
+    clock.update("20/01/2026 15:30")
+    assert clock.needs_refresh() is True
+
+
+def test_clock_respuesta_invalida_espera_antes_de_reintentar():
+    """✅ Un fallo no dispara GetHoraServer en cada punto"""
+    clock = ServerClock(retry_after=60)
+    assert clock.update([{"FECHA": "basura"}]) is False
+    assert clock.needs_refresh() is False
+    assert clock.hora_server() is None
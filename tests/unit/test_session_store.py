@@ -0,0 +1,136 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from core.browser_pool import BrowserPool
+from core.session_store import SessionStore
+
+UA = "Mozilla/5.0 (X11; Linux x86_64) Chrome/120.0.0.0"
+
+
+def _state(expires=-1):
+    return {
+        "cookies": [
+            {
+                "name": "cf_clearance",
+                "value": "x",
+                "domain": ".sec.cl",
+                "expires": expires,
+            },
+            {"name": "_ga", "value": "y", "domain": ".google.com", "expires": -1},
+        ],
+        "origins": [],
+    }
+
+
+def test_guarda_y_recupera_estado(tmp_path):
+    """✅ El storage_state y su user agent sobreviven a un reinicio"""
+    SessionStore(tmp_path / "s.json").save(_state(), UA)
+
+    store = SessionStore(tmp_path / "s.json")
+    state = store.load()
+
+    assert state["cookies"][0]["name"] == "cf_clearance"
+    assert store.user_agent == UA
+
+
+def test_estado_expirado_se_descarta(tmp_path):
+    """✅ Un estado más viejo que el TTL no se usa"""
+    path = tmp_path / "s.json"
+    SessionStore(path).save(_state(), UA)
+    saved = json.loads(path.read_text("utf-8"))
+    saved["saved_at"] -= 7200
+    path.write_text(json.dumps(saved), "utf-8")
+
+    assert SessionStore(path, ttl=3600).load() is None
+
+
+def test_sin_cookie_sec_vigente_no_hay_sesion(tmp_path):
+    """✅ Si la cookie de sec.cl expiró, no se siembra el contexto"""
+    store = SessionStore(tmp_path / "s.json")
+    store.save(_state(expires=time.time() - 10), UA)
+
+    assert store.load() is None
+
+
+def test_from_env(tmp_path, monkeypatch):
+    """✅ SEC_SESSION_STATE activa el store para todos los scrapers"""
+    monkeypatch.delenv("SEC_SESSION_STATE", raising=False)
+    assert SessionStore.from_env() is None
+
+    monkeypatch.setenv("SEC_SESSION_STATE", str(tmp_path / "s.json"))
+    monkeypatch.setenv("SEC_SESSION_TTL", "60")
+    store = SessionStore.from_env()
+    assert store.ttl == 60.0
+
+
+def test_pool_siembra_contexto_desde_disco(tmp_path):
+    """✅ El primer contexto del pool nace con la sesión guardada"""
+    store = SessionStore(tmp_path / "s.json")
+    store.save(_state(), UA)
+
+    with patch("core.browser_pool.sync_playwright") as mock_sp:
+        browser = mock_sp.return_value.start.return_value.chromium.launch.return_value
+        context = MagicMock()
+        context.storage_state.return_value = _state()
+        browser.new_context.return_value = context
+        pool = BrowserPool(size=1, session_store=store)
+
+        pool.acquire()
+
+    kwargs = browser.new_context.call_args.kwargs
+    assert kwargs["user_agent"] == UA
+    assert kwargs["storage_state"]["cookies"][0]["name"] == "cf_clearance"
+
+
+def test_pool_descarta_sesion_rechazada(tmp_path):
+    """✅ Un 403 con la sesión restaurada borra el estado guardado"""
+    store = SessionStore(tmp_path / "s.json")
+    store.save(_state(), UA)
+
+    with patch("core.browser_pool.sync_playwright") as mock_sp:
+        browser = mock_sp.return_value.start.return_value.chromium.launch.return_value
+        context = MagicMock()
+        context.storage_state.return_value = _state()
+        browser.new_context.return_value = context
+        context.new_page.return_value.evaluate.side_effect = lambda script, *a: (
+            {"horaServer": None, "error": "HTTP 403"}
+            if not a
+            else {"data": None, "error": "HTTP 403"}
+        )
+        pool = BrowserPool(size=1, session_store=store)
+
+        result = pool.fetch({"anho": 2017, "mes": 1, "dia": 1, "hora": 0})
+
+    assert result["error"] == "HTTP 403"
+    assert not store.path.exists()
+    assert store.load() is None
+
+
+def test_guardado_concurrente_no_comparte_temporal(tmp_path):
+    """✅ Varios workers guardando a la vez no pisan el mismo .tmp"""
+    store = SessionStore(tmp_path / "s.json")
+    errores = []
+
+    def guardar():
+        try:
+            for _ in range(20):
+                SessionStore(store.path).save(_state(), UA)
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=guardar) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    assert store.load() is not None
+    assert list(tmp_path.glob("*.tmp")) == []
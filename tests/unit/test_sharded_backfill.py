@@ -0,0 +1,194 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+import pytest
+
+from core.scrape_journal import ScrapeJournal
+from core.scrape_sinks import MANIFEST_NAME, PartitionedNDJSONSink, iter_dataset
+from core.sharded_backfill import ShardedBackfill, format_progress, shard_id
+
+
+def fake_worker(worker_id, config):
+    """Worker falso: reclama shards y registra resultados sin navegador."""
+    owner = f"fake-{worker_id}"
+    dataset_dir = os.path.join(config["output_dir"], "dataset_2017_2017")
+    with ScrapeJournal(config["journal_path"]) as journal:
+        while True:
+            shard = journal.claim_shard(config["shards"], owner)
+            if shard is None:
+                return
+            points = [tuple(p) for p in config["shards"][shard]]
+            sink = PartitionedNDJSONSink(
+                dataset_dir, points, compression=config["compression"]
+            )
+            for point in points:
+                result = {"success": True, "data": [{"owner": owner}]}
+                journal.record(point, result)
+                sink.add(point, result)
+            sink.close()
+            journal.finish_shard(shard, owner)
+
+
+def test_claim_shard_no_repite_shards(tmp_path):
+    """✅ Dos workers nunca reclaman el mismo shard"""
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        shards = ["2017-01", "2017-02"]
+
+        assert journal.claim_shard(shards, "a") == "2017-01"
+        assert journal.claim_shard(shards, "b") == "2017-02"
+        assert journal.claim_shard(shards, "c") is None
+
+        journal.finish_shard("2017-01", "a")
+        assert journal.unfinished_shards(shards) == ["2017-02"]
+
+
+def test_claim_shard_recupera_lease_vencido(tmp_path):
+    """✅ Un shard de un worker caído se puede reclamar al vencer el lease"""
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        assert journal.claim_shard(["2017-01"], "muerto") == "2017-01"
+        assert journal.claim_shard(["2017-01"], "vivo", lease=0) == "2017-01"
+
+
+def test_format_progress_calcula_eta():
+    """✅ La línea de progreso incluye velocidad y ETA"""
+    line = format_progress(
+        recorded=150, total=1150, baseline=50, elapsed=100, alive=3, workers=4
+    )
+
+    assert "1.00 puntos/s" in line
+    assert "ETA 16.7 min" in line
+    assert "workers 3/4" in line
+
+
+def test_backfill_reparte_meses_entre_procesos(tmp_path):
+    """✅ Los workers cubren cada mes una sola vez y se escribe el manifiesto"""
+    backfill = ShardedBackfill(
+        2017,
+        2017,
+        workers=3,
+        hours=[0],
+        output_dir=str(tmp_path),
+        progress_interval=0.5,
+        worker_target=fake_worker,
+    )
+
+    metadata = backfill.run()
+
+    assert metadata["total_points"] == 365
+    assert metadata["unfinished_shards"] == []
+    results = list(iter_dataset(backfill.dataset_dir))
+    assert len(results) == 365
+    owners_by_month = {}
+    for point, result in zip(backfill._points(), results):
+        owners_by_month.setdefault(shard_id(point), set()).add(
+            result["data"][0]["owner"]
+        )
+    assert all(len(owners) == 1 for owners in owners_by_month.values())
+    with open(backfill.dataset_dir / MANIFEST_NAME, encoding="utf-8") as f:
+        assert json.load(f)["years"]["2017"]["successful"] == 365
+
+
+def restoring_worker(worker_id, config):
+    """Worker falso que, como scrape_points, restaura lo que ya está en el journal."""
+    owner = f"fake-{worker_id}"
+    dataset_dir = os.path.join(config["output_dir"], "dataset_2017_2017")
+    with ScrapeJournal(config["journal_path"]) as journal:
+        while True:
+            shard = journal.claim_shard(config["shards"], owner)
+            if shard is None:
+                return
+            points = [tuple(p) for p in config["shards"][shard]]
+            sink = PartitionedNDJSONSink(
+                dataset_dir, points, compression=config["compression"]
+            )
+            for point in points:
+                result = journal.load(point) if journal.is_done(point) else None
+                if result is None:
+                    result = {"success": True, "data": [{"owner": owner}]}
+                    journal.record(point, result)
+                sink.add(point, result)
+            sink.close()
+            journal.finish_shard(shard, owner)
+
+
+def test_backfill_con_planner_conserva_el_mes_en_disco(tmp_path):
+    """✅ Rellenar un hueco reescribe el mes con los puntos del journal"""
+    from core.scrape_planner import ScrapePlanner
+
+    def backfill(worker, planner=None):
+        return ShardedBackfill(
+            2017,
+            2017,
+            workers=2,
+            hours=[0],
+            output_dir=str(tmp_path),
+            progress_interval=0.5,
+            planner=planner,
+            worker_target=worker,
+        )
+
+    completo = backfill(fake_worker)
+    completo.run()
+    with ScrapeJournal(completo.journal_path) as journal:
+        journal.record((2017, 1, 5, 0), {"success": False, "error": "timeout"})
+        planner = ScrapePlanner(journal=journal)
+        relleno = backfill(restoring_worker, planner=planner)
+        metadata = relleno.run()
+
+    assert metadata["total_points"] == 365
+    results = list(iter_dataset(relleno.dataset_dir))
+    assert len(results) == 365
+    with open(relleno.dataset_dir / MANIFEST_NAME, encoding="utf-8") as f:
+        assert json.load(f)["years"]["2017"]["successful"] == 365
+
+
+def test_lease_se_renueva_y_el_dueno_anterior_no_termina(tmp_path):
+    """✅ Renovar mantiene el claim; quien lo perdió no puede terminar el shard"""
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        assert journal.claim_shard(["2017-01"], "a", lease=60) == "2017-01"
+        assert journal.renew_shard("2017-01", "a")
+        assert journal.claim_shard(["2017-01"], "b", lease=60) is None
+
+        assert journal.claim_shard(["2017-01"], "b", lease=0) == "2017-01"
+        assert not journal.renew_shard("2017-01", "a")
+        assert not journal.finish_shard("2017-01", "a")
+        assert journal.finish_shard("2017-01", "b")
+        assert not journal.renew_shard("2017-01", "b")
+
+
+def test_sink_con_claim_escribe_aparte_y_publica_al_terminar(tmp_path):
+    """✅ Cada claim escribe su propio archivo; solo el dueño vigente lo publica"""
+    from core.sharded_backfill import ClaimedShardSink, ShardLost
+
+    dataset = tmp_path / "dataset"
+    points = [(2017, 1, d, 0) for d in (1, 2)]
+
+    with ScrapeJournal(tmp_path / "journal.sqlite") as journal:
+        journal.claim_shard(["2017-01"], "host:1", lease=60)
+        lento = ClaimedShardSink(
+            dataset, points, journal, "2017-01", "host:1", lease=60, compression="gzip"
+        )
+        lento.add(points[0], {"success": True, "data": [{"w": 1}]})
+
+        # El lease vence y otro worker toma y termina el mes
+        journal.claim_shard(["2017-01"], "host:2", lease=0)
+        rapido = ClaimedShardSink(
+            dataset, points, journal, "2017-01", "host:2", lease=60, compression="gzip"
+        )
+        for point in points:
+            rapido.add(point, {"success": True, "data": [{"w": 2}]})
+        assert list(iter_dataset(dataset)) == []  # aún en staging
+        assert rapido.finish()
+
+        lento.renew_every = 0
+        with pytest.raises(ShardLost):
+            lento.add(points[1], {"success": True, "data": [{"w": 1}]})
+        assert not lento.finish()
+
+    results = list(iter_dataset(dataset))
+    assert [r["data"][0]["w"] for r in results] == [2, 2]
+    assert not list(dataset.glob("year=*/month=*/_claim-*"))
@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+from datetime import date
+
+from core.async_historical_scraper import AsyncHistoricalScraper
+from core.surge_sampler import SurgeDetector
+
+STORM_DAY = 10
+
+
+def _affected(month, day, hour):
+    """Biobío tranquilo salvo la tormenta del 10 de enero a las 12h."""
+    return 150000 if (month, day, hour) == (1, STORM_DAY, 12) else 1000
+
+
+def _result(point):
+    year, month, day, hour = point
+    return {
+        "success": True,
+        "data": [
+            {
+                "NOMBRE_REGION": "Biobío",
+                "CLIENTES_AFECTADOS": _affected(month, day, hour),
+            },
+            {"NOMBRE_REGION": "Maule", "CLIENTES_AFECTADOS": 500},
+        ],
+    }
+
+
+class StormEngine:
+    """Motor falso que devuelve un peak de afectados en un día."""
+
+    num_pages = 1
+
+    def __init__(self):
+        self.fetched = []
+
+    async def scrape_batch(self, points):
+        self.fetched.extend(points)
+        return [_result(p) for p in points]
+
+    async def close(self):
+        pass
+
+
+def test_detecta_dia_con_peak_regional():
+    """✅ Solo el día del peak se marca como surge"""
+    detector = SurgeDetector(factor=4.0, min_affected=20000)
+    for day in range(1, 21):
+        for hour in (0, 12):
+            detector.add((2017, 1, day, hour), _result((2017, 1, day, hour)))
+
+    surges = detector.surges()
+
+    assert list(surges) == [date(2017, 1, STORM_DAY)]
+    assert surges[date(2017, 1, STORM_DAY)] == {"BIOBÍO": 150000}
+
+
+def test_extra_points_densifica_dia_y_vecinos():
+    """✅ Se agregan las horas faltantes del día del peak y sus vecinos"""
+    detector = SurgeDetector(pad_days=1, dense_hours=[0, 6, 12, 18])
+    for day in range(1, 21):
+        for hour in (0, 12):
+            detector.add((2017, 1, day, hour), _result((2017, 1, day, hour)))
+
+    extra = detector.extra_points(hours=[0, 12])
+
+    assert extra == [
+        (2017, 1, day, hour) for day in (9, 10, 11) for hour in (6, 18)
+    ]
+
+
+def test_resultados_fallidos_no_cuentan():
+    """✅ Un punto fallido no aporta peaks"""
+    detector = SurgeDetector()
+    detector.add((2017, 1, 1, 0), {"success": False, "error": "HTTP 500"})
+
+    assert detector.surges() == {}
+
+
+def test_scraper_en_dos_pasadas(tmp_path):
+    """✅ La pasada densa solo pide horas extra en torno a la tormenta"""
+    engine = StormEngine()
+    scraper = AsyncHistoricalScraper(
+        start_year=2017,
+        end_year=2017,
+        max_concurrent=4,
+        hours=[0, 12],
+        output_dir=str(tmp_path),
+        engine=engine,
+        surge=SurgeDetector(pad_days=0),
+    )
+
+    result = asyncio.run(scraper.scrape_all())
+
+    extra = [p for p in engine.fetched if p[3] not in (0, 12)]
+    assert len(engine.fetched) == 365 * 2 + 22
+    assert {p[:3] for p in extra} == {(2017, 1, STORM_DAY)}
+    assert result["metadata"]["surge_days"] == ["2017-01-10"]
+    assert result["years"]["2017"]["total_points"] == 365 * 2 + 22
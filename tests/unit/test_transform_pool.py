@@ -0,0 +1,113 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import json
+from datetime import date
+
+import polars as pl
+
+from core.historical_etl_orchestrator import HistoricalETLOrchestrator
+from core.postgres_repository import PostgreSQLRepository
+from core.tranformer import SecDataTransformer
+from core.transform_pool import RECORD_SCHEMA, ipc_to_records, records_to_ipc
+
+
+def _raw(n, offset=0):
+    return [
+        {
+            "NOMBRE_REGION": f"Región {i % 3}",
+            "NOMBRE_COMUNA": f"Comuna {i % 7}",
+            "NOMBRE_EMPRESA": f"Empresa {i % 2}",
+            "CLIENTES_AFECTADOS": offset + i,
+            "FECHA_INT_STR": "25/10/2023 14:30",
+            "ACTUALIZADO_HACE": f"0 Dias {i % 24} Horas 5 Minutos",
+        }
+        for i in range(n)
+    ]
+
+
+class ListRepository:
+    """Repositorio falso: acumula lo que recibe (sin save_frame)."""
+
+    def __init__(self):
+        self.records = []
+
+    def save_records(self, records):
+        self.records.extend(records)
+        return {"insertados": len(records)}
+
+    def get_record_count(self):
+        return len(self.records)
+
+    def get_database_size(self):
+        return {"size_pretty": "0 kB"}
+
+    def close(self):
+        pass
+
+
+def test_ipc_ida_y_vuelta_conserva_registros():
+    """✅ Registros transformados -> IPC -> registros idénticos"""
+    records = SecDataTransformer().transform(_raw(50), "25/10/2023 15:00")
+    assert ipc_to_records(records_to_ipc(records)) == records
+    assert ipc_to_records(records_to_ipc([])) == []
+
+
+def test_etl_con_pool_de_procesos_igual_que_con_threads(tmp_path):
+    """✅ transform_processes>0 guarda exactamente lo mismo que el modo threads"""
+    batches = [
+        {"hora_server_scraping": "25/10/2023 15:00", "data": _raw(40, offset=k * 100)}
+        for k in range(6)
+    ]
+    json_file = tmp_path / "historico.json"
+    json_file.write_text(
+        json.dumps({"data_by_year": {"2023": {"data": batches}}}), encoding="utf-8"
+    )
+
+    resultados = {}
+    for processes in (0, 2):
+        repo = ListRepository()
+        etl = HistoricalETLOrchestrator(
+            str(json_file), repository=repo, transform_processes=processes
+        )
+        etl.load_all()
+        assert etl.stats["total_inserted"] == 240
+        resultados[processes] = sorted(repo.records, key=lambda r: r["ID_UNICO"])
+
+    assert resultados[0] == resultados[2]
+
+
+def test_save_frame_arma_las_mismas_filas_que_save_records():
+    """✅ save_frame resuelve dimensiones por valor distinto y arma filas idénticas"""
+    repo = PostgreSQLRepository.__new__(PostgreSQLRepository)
+    repo.compact_keys = True
+    repo.use_known_keys = False
+    repo.known_keys = None
+    lookups = []
+    repo.get_or_create_geografia = lambda r, c: lookups.append("geo") or hash((r, c))
+    repo.get_or_create_empresa = lambda e: lookups.append("emp") or hash(e)
+    repo.get_id_tiempo = lambda f: lookups.append("tiempo") or f.toordinal()
+    filas = []
+    repo._insert_rows = lambda rows, keys, omitidos=0: filas.append(rows) or {
+        "insertados": len(rows)
+    }
+
+    records = SecDataTransformer().transform(_raw(60), "25/10/2023 15:00")
+    records[0]["REGION"] = None
+    records[1]["FECHA_DT"] = None
+
+    repo.save_records(records)
+    lookups.clear()
+    frame = pl.read_ipc(io.BytesIO(records_to_ipc(records)))
+    assert frame.schema == pl.Schema(RECORD_SCHEMA)
+    assert repo.save_frame(frame) == {"insertados": len(records)}
+
+    assert filas[0] == filas[1]
+    assert filas[1][1][3] == date.today().toordinal()
+    # 3 regiones (+DESCONOCIDO) x 7 comunas como mucho, 2 empresas, 2 fechas
+    assert lookups.count("emp") == 2
+    assert lookups.count("tiempo") == 2
+    assert lookups.count("geo") <= 22
@@ -95,3 +95,45 @@ def test_fallback_invalid_date(transformer):
     # La fecha del incidente debe ser la del servidor del batch (2026-01-25)
     assert result[0]["FECHA_DT"] == date(2026, 1, 25)
     assert result[0]["DIAS_ANTIGUEDAD"] == 0
+
+
+def _raw_batch():
+    regiones = ["Región del Biobío", "LOS LAGOS", "Metropolitana "]
+    comunas = ["Concepción", "PUERTO MONTT", "Ñuñoa"]
+    fechas = ["19/1/2026", "18/01/2024", "FECHA_BASURA"]
+    return [
+        {
+            "NOMBRE_REGION": regiones[i % 3],
+            "NOMBRE_COMUNA": comunas[(i // 3) % 3],
+            "NOMBRE_EMPRESA": "CGE" if i % 2 else "ENEL",
+            "FECHA_INT_STR": fechas[(i // 2) % 3],
+            "CLIENTES_AFECTADOS": i * 7 + 1,
+            "ACTUALIZADO_HACE": f" {i % 4} Dias 0 Horas ",
+        }
+        for i in range(60)
+    ]
+
+
+def test_camino_polars_identico_a_pandas(transformer, monkeypatch):
+    """El agrupamiento en Polars produce exactamente la salida de pandas."""
+    raw_data = _raw_batch()
+    assert transformer._group_polars(raw_data) is not None
+    rapido = transformer.transform(raw_data, server_time_raw="22/01/2026 12:07")
+
+    monkeypatch.setattr(transformer, "_group_polars", lambda raw: None)
+    pandas_ = transformer.transform(raw_data, server_time_raw="22/01/2026 12:07")
+
+    assert rapido == pandas_
+
+
+def test_datos_con_nulos_usan_pandas(transformer):
+    """Con nulos el camino rápido se descarta y se conserva la semántica de pandas."""
+    raw_data = _raw_batch()
+    raw_data[0]["ACTUALIZADO_HACE"] = None
+    raw_data[1]["NOMBRE_COMUNA"] = None
+
+    assert transformer._group_polars(raw_data) is None
+    result = transformer.transform(raw_data, server_time_raw="22/01/2026 12:07")
+    assert sum(r["CLIENTES_AFECTADOS"] for r in result) == sum(
+        r["CLIENTES_AFECTADOS"] for r in raw_data[:1] + raw_data[2:]
+    )